@@ -1,167 +1,423 @@
 # app.py — Power Routine (Streamlit)
 # Pages: Gerar Plano, Educação, Carregar fotos ou artigos, Feed (photos+articles), Competições, Logs
 import streamlit as st
-import requests
-import time
 import uuid
 import json
+import functools
 import pandas as pd
 from datetime import datetime
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from services.feed import ORDER_HOT, ORDER_LIKES, ORDER_RECENT
+from services.api_client import ApiClient, ApiError
+from services.eventos import EventLog, NIVEIS
+from services.exportacao import exportar_ndjson
+from services.images import BlobStore, process_upload
+from services.mudancas import CURTIDAS, FEED, RANKING
+from services.plano_alimentar import catalogo_padrao, generate_plan
+from services.jobs import JobManager, QUEUED, RUNNING, DONE, FAILED
+from services.plan_items import PlanItems
+from config import Config
+from resources import get_community, get_event_sink, get_metricas, get_repository, record_activity
 
 st.set_page_config(page_title="Power Routine", page_icon="⚡", layout="wide")
+run = get_metricas().iniciar()  # script run timing, labelled with the page once it is known
 
 # ---------- Config ----------
 API_BASE = st.secrets.get("API_BASE", "http://localhost:5000")  # optional remote API
+GALLERY_PAGE_SIZE = 9
+PLANS_PAGE_SIZE = 20  # Histórico de Planos: plans per "load more" page
+BLOBS = BlobStore(Config.BLOB_DIR)  # uploaded images, content-addressed on disk
 
 # ---------- Initialize session state ----------
-if "plans" not in st.session_state:
-    st.session_state["plans"] = []
-
-if "generating" not in st.session_state:
-    st.session_state["generating"] = False
-
+# plans: this user's plans (metadata; items load when a plan is opened). Feed, photos, groups and
+# the ranking are shared by every session through get_community() and persisted by the repository.
+# log: bounded structured event log (ring buffer); see the Logs page
 if "log" not in st.session_state:
-    st.session_state["log"] = []
-
-if "photos" not in st.session_state:
-    # photos: list of {id, uploader, caption, image_bytes, created_at, likes, liked_by, group}
-    st.session_state["photos"] = []
-
-if "groups" not in st.session_state:
-    # groups: name -> {id, members:[], photos:[photo_id], created_at}
-    st.session_state["groups"] = {}
-
-if "feed" not in st.session_state:
-    # feed: list of {id, type:'photo'|'article', author, created_at, likes, liked_by, data: {...}}
-    st.session_state["feed"] = []
+    st.session_state["log"] = EventLog(Config.EVENT_LOG_CAPACITY, sink=get_event_sink())
 
 if "display_name" not in st.session_state:
     st.session_state["display_name"] = f"User-{str(uuid.uuid4())[:6]}"
 
+# resolved once per script run: every get_community() call reads the import counter from SQLite
+community = get_community()
+
 # ---------- Helpers ----------
-def log(msg):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    st.session_state["log"].append(f"[{ts}] {msg}")
+def log(event, template, level="INFO", **fields):
+    # template is formatted with the fields only when someone reads it (Logs page, file sink)
+    st.session_state["log"].add(event, template, nivel=level, **fields)
+
+def rerun(cause):
+    # closes this run's timing (the rerun aborts the script) and counts the cause
+    run.encerrar(rerun=cause)
+    st.rerun()
+
+def live_panel(fn):
+    # panel that re-checks the change bus every LIVE_REFRESH_SECONDS as a fragment run (st.fragment reruns
+    # only the decorated function), not a script run
+    @functools.wraps(fn)
+    def panel(*args):
+        global community
+        ctx = get_script_run_ctx()
+        if ctx is not None and ctx.fragment_ids_this_run:
+            # a fragment run skips the top of the script: resolve the community here, once (an import may
+            # have rebuilt it since the last script run)
+            community = get_community()
+        return fn(*args)
+    return st.fragment(run_every=Config.LIVE_REFRESH_SECONDS or None)(panel)
+
+def rerun_panel(cause):
+    # from a widget inside a live panel: rerun only the panel when possible, else the whole script
+    get_metricas().atual().encerrar(rerun=cause)
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:  # the panel ran inline in a full script run
+        pass
+    run.encerrar()
+    st.rerun()
+
+def changed(panel, topics):
+    # True when a watched bus version advanced since this session last rendered the panel (or on its first
+    # render); the session keeps only the tuple of versions it has seen
+    versions = community.mudancas.versoes(topics)
+    seen = st.session_state.setdefault("seen_versions", {})
+    if seen.get(panel) == versions:
+        return False
+    seen[panel] = versions
+    return True
 
 def get_username():
     return st.session_state.get("display_name") or f"User-{str(uuid.uuid4())[:6]}"
 
-def simulate_generate_plan(target_calories: int, days: int, meals_per_day: int, speed=0.02):
-    total_steps = days * meals_per_day
-    step = 0
-    items = []
-    for day in range(1, days + 1):
-        for meal_idx in range(1, meals_per_day + 1):
-            step += 1
-            time.sleep(speed)
-            item = {
-                "day": day,
-                "meal_name": f"Refeição {meal_idx}",
-                "food_name": f"Alimento ex. {((day-1)*meals_per_day)+meal_idx}",
-                "portion_g": 100,
-                "done": False
-            }
-            items.append(item)
-            pct = int((step / total_steps) * 100)
-            yield {"progress": pct, "current_item": item, "items_so_far": list(items)}
-    yield {"progress": 100, "current_item": None, "items_so_far": list(items)}
+@st.cache_resource
+def get_catalog():
+    # food catalog as NumPy arrays, built once per process
+    return catalogo_padrao()
+
+@st.cache_resource
+def get_job_manager():
+    # one executor per server process, shared by every session
+    return JobManager(max_workers=Config.PLAN_JOBS_MAX_WORKERS)
+
+def clear_plan_job():
+    st.session_state.pop("plan_job", None)
+    if "job" in st.query_params:
+        del st.query_params["job"]
+
+@st.cache_resource
+def get_api_client(base_url):
+    # keep-alive pool + retries, shared by every session (and the job threads)
+    return ApiClient(base_url, connect_timeout=Config.API_CONNECT_TIMEOUT,
+                     read_timeout=Config.API_READ_TIMEOUT, retries=Config.API_RETRIES)
+
+def plan_steps(plan, api, catalogo, cancelled=None):
+    # runs on a job worker thread: no st.* calls here, messages travel in the steps ("notes")
+    # api: ApiClient when the remote API should be tried first, else None
+    # cancelled: the job's cancel check, so the local solve stops mid-way instead of finishing first
+    notes = []
+    if api is not None:
+        # the API streams one NDJSON line per generated day; same step protocol as the local generator
+        received = 0
+        try:
+            api_plan_id = None
+            for msg in api.stream_plan(plan["user_id"], plan["target_calories"], plan["days"], plan["meals_per_day"], plan["objetivo"]):
+                if "plan_id" in msg:
+                    api_plan_id = msg["plan_id"]
+                    continue
+                received += len(msg.get("new_items", []))
+                yield {"progress": msg["progress"], "current_item": msg.get("current_item"), "new_items": msg.get("new_items", []),
+                       "status": "generated_via_api", "api_plan_id": api_plan_id, "notes": notes}
+            return
+        except ApiError as e:
+            if received:
+                raise  # items already streamed into the plan: don't mix in a local plan
+            notes.append(f"API generate failed: {e} — gerando localmente.")
+    for step in generate_plan(plan["target_calories"], plan["days"], plan["meals_per_day"], plan["objetivo"], catalogo=catalogo,
+                              cancelado=cancelled):
+        step["status"] = "generated_local"
+        step["notes"] = notes
+        yield step
+
+def user_plans():
+    # the current user's plan list: the newest PLANS_PAGE_SIZE loaded once per user per session, older
+    # pages appended by load_more_plans()
+    user = get_username()
+    if st.session_state.get("plans_user") != user:
+        st.session_state["plans"] = []
+        st.session_state["plans_user"] = user
+        load_more_plans()
+    return st.session_state["plans"]
+
+def load_more_plans():
+    # next keyset page after the oldest plan loaded; one extra row tells whether another page exists
+    plans = st.session_state["plans"]
+    last = plans[-1] if plans else {}
+    page = get_repository().list_plans(st.session_state["plans_user"], limit=PLANS_PAGE_SIZE + 1,
+                                       before=last.get("created_at"), before_id=last.get("id"))
+    plans.extend(dict(p, items=None) for p in page[:PLANS_PAGE_SIZE])
+    st.session_state["plans_more"] = len(page) > PLANS_PAGE_SIZE
+
+def plan_items(plan):
+    if plan["items"] is None:
+        plan["items"] = PlanItems(get_repository().plan_items(plan["id"]))
+    return plan["items"]
+
+def plan_pct(plan):
+    if plan["items"] is not None:
+        return plan["items"].pct_done() if plan["items"] else plan.get("progress", 0)
+    return int(plan["done_count"] / plan["item_count"] * 100) if plan.get("item_count") else plan.get("progress", 0)
 
 def save_plan(plan):
-    st.session_state["plans"].insert(0, plan)
-    log(f"Plano {plan['id']} salvo (local).")
+    get_repository().save_plan(plan, plan["items"])
+    if plan["user_id"] == get_username():
+        user_plans().insert(0, plan)
+        st.session_state.setdefault("open_plans", set()).add(plan["id"])
+    log("plano.salvo", "Plano {plan_id} salvo.", plan_id=plan["id"])
 
 def add_photo(uploader, caption, image_bytes, group_name=None):
-    pid = str(uuid.uuid4())[:8]
-    photo = {
-        "id": pid,
-        "uploader": uploader,
-        "caption": caption,
-        "image_bytes": image_bytes,
-        "created_at": datetime.now().isoformat(),
-        "likes": 0,
-        "liked_by": [],
-        "group": group_name
-    }
-    st.session_state["photos"].insert(0, photo)
-    if group_name:
-        grp = st.session_state["groups"].get(group_name)
-        if grp:
-            grp["photos"].insert(0, pid)
-    # add to feed
-    feed_item = {
-        "id": f"p-{pid}",
-        "type": "photo",
-        "author": uploader,
-        "created_at": photo["created_at"],
-        "likes": 0,
-        "liked_by": [],
-        "data": {"photo_id": pid}
-    }
-    st.session_state["feed"].insert(0, feed_item)
-    log(f"Foto {pid} adicionada por {uploader}")
+    # decode once, store original + renditions by content hash; the feed keeps only the refs
+    image = process_upload(image_bytes, BLOBS)
+    pid = community.add_photo(uploader, caption, image, group=group_name)
+    record_activity("foto", user=uploader)
+    log("foto.adicionada", "Foto {photo_id} adicionada por {user}", photo_id=pid, user=uploader)
     return pid
 
 def add_article(title, body, author, tags=None):
-    aid = str(uuid.uuid4())[:8]
-    article = {
-        "id": f"a-{aid}",
-        "type": "article",
-        "author": author,
-        "created_at": datetime.now().isoformat(),
-        "likes": 0,
-        "liked_by": [],
-        "data": {"title": title, "body": body, "tags": tags or []}
-    }
-    st.session_state["feed"].insert(0, article)
-    log(f"Artigo '{title}' publicado por {author}")
-    return article["id"]
+    aid = community.add_article(title, body, author, tags=tags)
+    log("artigo.publicado", "Artigo '{title}' publicado por {user}", feed_id=aid, title=title, user=author)
+    return aid
+
+def photo_src(photo, size="feed"):
+    # size: "thumb" (galeria), "feed" (cards) ou "full" (original, só sob demanda)
+    return BLOBS.path(photo["image"][size])
+
+def page_cursor(key, filters):
+    # cursor stack per list; changing the filters goes back to the first page
+    nav = st.session_state.get(key)
+    if not nav or nav["filters"] != filters:
+        nav = st.session_state[key] = {"filters": filters, "stack": [None]}
+    return nav["stack"][-1]
+
+def pager(key, next_cursor):
+    nav = st.session_state[key]
+    c_prev, c_label, c_next = st.columns([1,2,1])
+    if c_prev.button("← Anterior", key=f"{key}_prev", disabled=len(nav["stack"]) == 1):
+        nav["stack"].pop()
+        rerun("paginacao.anterior")
+    c_label.caption(f"Página {len(nav['stack'])}")
+    if c_next.button("Próxima →", key=f"{key}_next", disabled=next_cursor is None):
+        nav["stack"].append(next_cursor)
+        rerun("paginacao.proxima")
 
 def like_feed_item(feed_id, user):
-    # prevent double-like by same user (session-level)
-    for item in st.session_state["feed"]:
-        if item["id"] == feed_id:
-            if user in item.get("liked_by", []):
-                return False
-            item.setdefault("liked_by", []).append(user)
-            item["likes"] = len(item["liked_by"])
-            log(f"{user} curtiu {feed_id} (total {item['likes']})")
-            # if photo, also update photos list
-            if item["type"] == "photo":
-                pid = item["data"]["photo_id"]
-                for p in st.session_state["photos"]:
-                    if p["id"] == pid:
-                        p.setdefault("liked_by", []).append(user)
-                        p["likes"] = len(p.get("liked_by", []))
-                        break
-            return True
-    return False
+    # one like per user per item; photo likes live only on the feed item
+    if not community.like(feed_id, user):
+        return False
+    log("feed.curtida", "{user} curtiu {feed_id} (total {likes})", user=user, feed_id=feed_id,
+        likes=community.feed.get(feed_id)["likes"])
+    return True
 
 def create_group(name, creator):
-    if not name or name.strip() == "":
-        return False
-    if name in st.session_state["groups"]:
+    if not community.create_group(name, creator):
         return False
-    gid = str(uuid.uuid4())[:6]
-    st.session_state["groups"][name] = {"id": gid, "members": [creator], "photos": [], "created_at": datetime.now().isoformat()}
-    log(f"Grupo '{name}' criado por {creator}")
+    log("grupo.criado", "Grupo '{group}' criado por {user}", group=name, user=creator)
     return True
 
 def join_group(name, user):
-    grp = st.session_state["groups"].get(name)
-    if not grp:
+    joined = community.join_group(name, user)
+    if joined is None:
         return False
-    if user not in grp["members"]:
-        grp["members"].append(user)
-        log(f"{user} entrou no grupo '{name}'")
+    if joined:
+        log("grupo.entrada", "{user} entrou no grupo '{group}'", group=name, user=user)
     return True
 
+def render_plan_editor(p):
+    items = p["items"]
+    pid = p["id"]
+    # bumping the version gives the grid a fresh key, dropping stale edits after a commit or bulk action
+    ver_key = f"grid_ver_{pid}"
+    ver = st.session_state.setdefault(ver_key, 0)
+
+    with st.form(key=f"plan_form_{pid}_{ver}"):
+        cols = items.to_columns()
+        df = pd.DataFrame({
+            "Dia": cols["day"],
+            "Refeição": cols["meal_name"],
+            "Alimento": cols["food_name"],
+            "Porção (g)": cols["portion_g"],
+            "kcal": cols["kcal"],
+            "Concluída": cols["done"],
+        })
+        edited = st.data_editor(df, key=f"plan_grid_{pid}_{ver}", hide_index=True, use_container_width=True,
+                                disabled=["Dia", "Refeição", "Alimento", "Porção (g)", "kcal"])
+        if st.form_submit_button("Salvar alterações"):
+            changes = [(i, bool(new)) for i, (old, new) in enumerate(zip(cols["done"], edited["Concluída"].tolist()))
+                       if old != new and items.set_done(i, bool(new))]
+            if changes:
+                get_repository().set_items_done(pid, changes, items.done_count)
+                if any(done for _, done in changes):
+                    record_activity("plano")
+                log("plano.itens", "Plano {plan_id} — {count} item(ns) atualizados", level="DEBUG",
+                    plan_id=pid, count=len(changes))
+            st.session_state[ver_key] = ver + 1
+            rerun("plano.itens")
+
+    # bulk operations: by day and/or meal, or everything
+    b_day, b_meal, b_on, b_off = st.columns([1,2,1,1])
+    sel_day = b_day.selectbox("Dia", options=["Todos"] + items.days(), key=f"bulk_day_{pid}")
+    sel_meal = b_meal.selectbox("Refeição", options=["Todas"] + items.meal_names(), key=f"bulk_meal_{pid}")
+    day = None if sel_day == "Todos" else sel_day
+    meal = None if sel_meal == "Todas" else sel_meal
+    for col, label, value in ((b_on, "Marcar concluído", True), (b_off, "Desmarcar", False)):
+        if col.button(label, key=f"bulk_{value}_{pid}"):
+            if day is None and meal is None:
+                items.mark_all(value)
+                get_repository().set_all_items_done(pid, value, items.done_count)
+                count = len(items)
+            else:
+                idxs = items.set_done_where(day=day, meal_name=meal, value=value)
+                get_repository().set_items_done(pid, [(i, value) for i in idxs], items.done_count)
+                count = len(idxs)
+            if value and count:
+                record_activity("plano")
+            log("plano.itens", "Plano {plan_id} — {count} item(ns) {action} (dia {day}, {meal})", level="DEBUG",
+                plan_id=pid, count=count, action="marcados" if value else "desmarcados", day=sel_day, meal=sel_meal)
+            st.session_state[ver_key] = ver + 1
+            rerun("plano.lote")
+    if st.button("Marcar tudo como concluído", key=f"markall_{pid}"):
+        items.mark_all()
+        get_repository().set_all_items_done(pid, True, items.done_count)
+        record_activity("plano")
+        st.session_state[ver_key] = ver + 1
+        rerun("plano.tudo")
+    st.progress(items.pct_done() / 100)
+    st.write(f"{items.done_count}/{len(items)} itens concluídos — {items.pct_done()}%")
+
+@live_panel
+def render_feed_list(filters):
+    # Feed items + pager. On a refresh tick the store is queried again only when a post or like these filters
+    # can see was published since this session's last render; otherwise the same ids are redrawn
+    panel = get_metricas().iniciar("Feed ▸ lista")
+    query, type_filter, group_filter, sort_by, page_size = filters
+    feed = community.feed
+    feed_cursor = page_cursor("feed_nav", filters)
+    topics = (FEED, CURTIDAS) if group_filter is None else ((FEED, group_filter), (CURTIDAS, group_filter))
+    view = st.session_state.get("feed_view")
+    if changed("feed", topics) or not view or view["key"] != (filters, feed_cursor):
+        if query:
+            # inverted index (BM25), extended with what was published since the last search; by relevance
+            feed_items, next_cursor = feed.search(query, type_=type_filter, group=group_filter,
+                                                  cursor=feed_cursor, limit=page_size)
+        else:
+            # one page through the sorted indexes — O(page size), no sort of the whole feed
+            # (articles have no group, so a group filter keeps photos only)
+            feed_items, next_cursor = feed.page(type_=type_filter, group=group_filter, order=sort_by,
+                                                cursor=feed_cursor, limit=page_size)
+        view = st.session_state["feed_view"] = {"key": (filters, feed_cursor), "next": next_cursor,
+                                                "ids": [it["id"] for it in feed_items]}
+    else:
+        feed_items = [feed.get(feed_id) for feed_id in view["ids"]]
+    next_cursor = view["next"]
+    if query:
+        st.caption("Resultados ordenados por relevância")
+
+    if not feed_items:
+        st.info("Nenhum item encontrado.")
+    else:
+        for it in feed_items:
+            if it["type"] == "photo":
+                photo = feed.photo_of(it)
+                if not photo:
+                    continue
+                full_res = st.session_state.setdefault("full_res", set())
+                size = "full" if photo["id"] in full_res else "feed"
+                st.image(photo_src(photo, size), use_column_width=True, caption=f"{photo['caption']}")
+                st.write(f"Por: {it['author']} • Grupo: {photo.get('group') or '—'} • {it['created_at'][:19]}")
+                cols = st.columns([1,4,1])
+                if cols[0].button("🔍" if size == "feed" else "↩", key=f"full_{photo['id']}", help="Alternar resolução original"):
+                    full_res.symmetric_difference_update({photo["id"]})
+                    rerun_panel("feed.resolucao")
+                cols[1].write(f"Curtidas: {it.get('likes',0)}")
+                if cols[2].button("Curtir ❤️", key=f"feed_like_{it['id']}"):
+                    ok = like_feed_item(it['id'], get_username())
+                    if ok:
+                        st.success("Curtiu!")
+                    else:
+                        st.warning("Você já curtiu.")
+                    rerun_panel("feed.curtida_foto")
+                st.markdown("---")
+            else:  # article
+                st.subheader(it["data"]["title"])
+                st.write(f"Por: {it['author']} • {it['created_at'][:19]}")
+                st.markdown(it["data"]["body"])
+                cols = st.columns([1,4,1])
+                cols[1].write(f"Curtidas: {it.get('likes',0)}")
+                if cols[2].button("Curtir artigo ❤️", key=f"feed_like_{it['id']}"):
+                    ok = like_feed_item(it['id'], get_username())
+                    if ok:
+                        st.success("Você curtiu o artigo.")
+                    else:
+                        st.warning("Você já curtiu.")
+                    rerun_panel("feed.curtida_artigo")
+                st.markdown("---")
+        pager("feed_nav", next_cursor)
+    panel.encerrar()
+
+@live_panel
+def render_ranking(window, top_k):
+    # served from the incrementally maintained ranking, re-read only when the bus says it moved
+    # (likes, photos or members in any group) or the period/top-K/day changed
+    panel = get_metricas().iniciar("Competições ▸ ranking")
+    key = (window, top_k, datetime.now().date().isoformat())
+    view = st.session_state.get("ranking_view")
+    if changed("ranking", (RANKING,)) or not view or view["key"] != key:
+        view = st.session_state["ranking_view"] = {"key": key, "rows": community.leaderboard.top(top_k, window=window)}
+    if view["rows"]:
+        st.table(pd.DataFrame(view["rows"]))
+    elif window and community.groups:
+        st.info("Nenhuma curtida em grupos neste período.")
+    else:
+        st.info("Ainda não há competições ativas.")
+    panel.encerrar()
+
+@st.fragment(run_every=Config.PLAN_JOBS_POLL_SECONDS)
+def render_job_progress(job_id):
+    # polled as a fragment run every PLAN_JOBS_POLL_SECONDS (no sleep on the script thread); once the job
+    # leaves the queue/executor a full run saves the plan and refreshes the history
+    panel = get_metricas().iniciar("Gerar Plano ▸ progresso")
+    jobs = get_job_manager()
+    job = jobs.get(job_id)
+    if job is None or job["status"] not in (QUEUED, RUNNING):
+        panel.encerrar(rerun="geracao.polling")
+        st.rerun()
+    pct = job["progress"]
+    st.progress(pct)
+    current_item = job["current_item"]
+    if job["status"] == QUEUED:
+        st.text(f"Na fila — {jobs.active()} geração(ões) ativas no servidor")
+    elif current_item:
+        st.text(f"Gerando: Dia {current_item['day']} — {current_item['meal_name']} ({pct}%)")
+    else:
+        st.text("Finalizando...")
+    st.markdown(f"**Progresso:** {pct}% — itens gerados: {job['item_count']}")
+    for it in job["recent_items"]:
+        st.write(f"- Dia {it['day']}: {it['meal_name']} — {it['food_name']} ({it['portion_g']} g)")
+    if st.button("Cancelar geração"):
+        jobs.cancel(job_id)
+        log("geracao.cancelada", "Geração {plan_id} cancelada pelo usuário", level="WARNING",
+            plan_id=job["meta"]["id"], job_id=job_id)
+        panel.encerrar(rerun="geracao.cancelada")
+        st.rerun()
+    panel.encerrar()
+
 # ---------- UI: Sidebar ----------
 st.sidebar.title("Power Routine")
 st.sidebar.markdown("**Usuário**")
 disp = st.sidebar.text_input("Nome de Usuário", value=get_username())
 st.session_state["display_name"] = disp
 
-page = st.sidebar.selectbox("Navegar", ["Gerar Plano", "Educação", "Carregar fotos ou artigos", "Feed", "Competições", ])
+page = st.sidebar.selectbox("Navegar", ["Gerar Plano", "Educação", "Carregar fotos ou artigos", "Feed", "Competições", "Logs"])
+run.pagina = page
 st.sidebar.markdown("---")
 
 
@@ -174,6 +430,7 @@ if page == "Gerar Plano":
         target_cal = st.number_input("Calorias alvo", min_value=800, max_value=6000, value=2100, step=50)
         days = st.number_input("Dias do plano", min_value=1, max_value=30, value=7)
         meals = st.number_input("Refeições por dia", min_value=1, max_value=6, value=3)
+        objetivo = st.selectbox("Objetivo", ["Manutenção", "Cutting", "Bulking"])
         user_id = st.text_input("User ID (dev)", value=get_username())
         # <-- ADICIONEI AQUI para evitar NameError
         use_api = st.checkbox("Tentar usar API remota (se disponível)", value=False)
@@ -184,16 +441,17 @@ if page == "Gerar Plano":
         gen_btn = st.button("Gerar Plano Agora", type="primary")
 
 
+    # generation runs in the shared job executor; this script run only submits and polls
+    jobs = get_job_manager()
+    job_id = st.session_state.get("plan_job") or st.query_params.get("job")
+    job = jobs.get(job_id) if job_id else None
+    if job_id and job is None:
+        clear_plan_job()  # expired or from another server process
+
     if gen_btn:
-        if st.session_state["generating"]:
+        if job and job["status"] in (QUEUED, RUNNING):
             st.warning("Já existe uma geração em andamento.")
         else:
-            st.session_state["generating"] = True
-            log(f"Iniciando geração: {target_cal} kcal, {days} dias, {meals} refeição(ões)/dia")
-            placeholder = st.empty()
-            progress_bar = st.progress(0)
-            current_info = st.empty()
-
             plan_id = str(uuid.uuid4())[:8]
             plan = {
                 "id": plan_id,
@@ -201,103 +459,70 @@ if page == "Gerar Plano":
                 "target_calories": target_cal,
                 "days": int(days),
                 "meals_per_day": int(meals),
+                "objetivo": objetivo,
                 "created_at": datetime.now().isoformat(),
                 "status": "generating",
                 "progress": 0,
                 "items": []
             }
-
-            # Try API (if available)
-            if use_api:
-                try:
-                    r = requests.post(f"{API_BASE}/api/mealplans", json={"user_id": user_id, "target_calories": target_cal, "days": days, "meals_per_day": meals}, timeout=10)
-                    r.raise_for_status()
-                    api_resp = r.json()
-                    pid = api_resp.get("plan_id") or api_resp.get("id")
-                    plan["status"] = "generated_via_api"
-                    plan["progress"] = 100
-                    if pid:
-                        try:
-                            r2 = requests.get(f"{API_BASE}/api/mealplans/{pid}/items", timeout=10)
-                            r2.raise_for_status()
-                            plan["items"] = r2.json()
-                        except Exception as e:
-                            log(f"Falha ao buscar itens da API: {e}")
-                    save_plan(plan)
-                    st.session_state["generating"] = False
-                    st.success("Plano gerado via API.")
-                    st.experimental_rerun()
-                except Exception as e:
-                    log(f"API generate failed: {e}")
-                    st.warning("API indisponível — gerando localmente.")
-
-            # local generation
-            try:
-                generator = simulate_generate_plan(target_cal, int(days), int(meals), speed=0.02)
-                for step in generator:
-                    pct = step["progress"]
-                    progress_bar.progress(pct)
-                    current_item = step["current_item"]
-                    if current_item:
-                        current_info.text(f"Gerando: Dia {current_item['day']} — {current_item['meal_name']} ({pct}%)")
-                    else:
-                        current_info.text("Finalizando...")
-
-                    plan["progress"] = pct
-                    plan["items"] = step["items_so_far"]
-                    with placeholder.container():
-                        st.markdown(f"**Progresso:** {pct}% — itens gerados: {len(plan['items'])}")
-                        for it in plan["items"][-3:]:
-                            st.write(f"- Dia {it['day']}: {it['meal_name']} — {it['food_name']} ({it['portion_g']} g)")
-                plan["status"] = "generated_local"
-                plan["progress"] = 100
+            job_id = jobs.submit(plan_steps, plan, get_api_client(API_BASE) if use_api else None, get_catalog(), meta=plan, items=PlanItems(),
+                                 cancel_arg="cancelled")
+            st.session_state["plan_job"] = job_id
+            st.query_params["job"] = job_id  # a browser refresh re-attaches to the job
+            job = jobs.get(job_id)
+            log("geracao.iniciada", "Iniciando geração {plan_id} (job {job_id}): {kcal} kcal ({objetivo}), {days} dias, "
+                "{meals} refeição(ões)/dia", plan_id=plan_id, job_id=job_id, kcal=target_cal, objetivo=objetivo,
+                days=int(days), meals=int(meals))
+
+    if job:
+        plan = job["meta"]
+        if job["status"] in (QUEUED, RUNNING):
+            render_job_progress(job["id"])
+        else:
+            result = job["result"] or {}
+            for note in result.get("notes", []):
+                log("geracao.nota", "{note}", level="WARNING", plan_id=plan["id"], note=note)
+            if job["status"] == DONE:
+                plan.update(status=result.get("status", "generated_local"), progress=100, items=jobs.items(job["id"]))
                 save_plan(plan)
-                st.session_state["generating"] = False
-                log(f"Plano {plan_id} gerado localmente.")
-                st.success(f"Plano gerado — ID {plan_id}")
-                st.experimental_rerun()
-            except Exception as e:
-                st.session_state["generating"] = False
-                log(f"Erro durante geração: {e}")
-                st.error(f"Erro: {e}")
+                st.success(f"Plano gerado — ID {plan['id']}")
+            elif job["status"] == FAILED:
+                log("geracao.erro", "Erro durante geração: {error}", level="ERROR", plan_id=plan["id"],
+                    job_id=job["id"], error=job["error"])
+                st.error(f"Erro: {job['error']}")
+            else:
+                st.info("Geração cancelada.")
+            jobs.release(job["id"])
+            clear_plan_job()
 
     st.markdown("---")
     st.header("Histórico de Planos")
-    if not st.session_state["plans"]:
+    plans = user_plans()
+    if not plans:
         st.info("Nenhum plano gerado ainda.")
     else:
-        for idx, p in enumerate(st.session_state["plans"]):
-            with st.expander(f"Plano {p['id']} — {p['target_calories']} kcal — {p['created_at']}", expanded=(idx==0)):
-                cols = st.columns([3,1,1])
-                cols[0].write(f"**Dias:** {p['days']} • **Ref/dia:** {p['meals_per_day']} • **Status:** {p['status']}")
-                total_items = len(p["items"])
-                done_items = sum(1 for it in p["items"] if it.get("done"))
-                pct_done = int((done_items / total_items) * 100) if total_items else p.get("progress",0)
-                cols[1].metric("Concluído", f"{pct_done}%")
-                if cols[2].button("Exportar JSON", key=f"export_json_{p['id']}"):
-                    j = json.dumps(p, ensure_ascii=False, indent=2)
-                    st.download_button("Download JSON", data=j, file_name=f"plan_{p['id']}.json", mime="application/json")
-                if p["items"]:
-                    for i, it in enumerate(p["items"]):
-                        cols_row = st.columns([1,3,3,2,1])
-                        cols_row[0].write(it["day"])
-                        cols_row[1].write(it["meal_name"])
-                        cols_row[2].write(it["food_name"])
-                        cols_row[3].write(f"{it['portion_g']} g")
-                        new_done = cols_row[4].checkbox("Concluída", value=it.get("done", False), key=f"{p['id']}_done_{i}")
-                        if new_done != it.get("done", False):
-                            p["items"][i]["done"] = new_done
-                            log(f"Plano {p['id']} — item dia {it['day']} {'marcado' if new_done else 'desmarcado'}")
-                            st.experimental_rerun()
-                    if st.button("Marcar tudo como concluído", key=f"markall_{p['id']}"):
-                        for i in range(len(p["items"])):
-                            p["items"][i]["done"] = True
-                        st.experimental_rerun()
-                    total_items = len(p["items"])
-                    done_items = sum(1 for it in p["items"] if it.get("done"))
-                    pct_done = int((done_items / total_items) * 100) if total_items else 0
-                    st.progress(pct_done / 100)
-                    st.write(f"{done_items}/{total_items} itens concluídos — {pct_done}%")
+        # only open plans build item widgets; edits are batched in a form and applied on one submit
+        open_plans = st.session_state.setdefault("open_plans", set())
+        for p in plans:
+            pct_done = plan_pct(p)
+            is_open = p["id"] in open_plans
+            cols = st.columns([4,1,1,1])
+            cols[0].markdown(f"**Plano {p['id']}** — {p['target_calories']} kcal — {p['created_at'][:16]}  \n"
+                             f"**Dias:** {p['days']} • **Ref/dia:** {p['meals_per_day']} • **Status:** {p['status']}")
+            cols[1].metric("Concluído", f"{pct_done}%")
+            if cols[2].button("Fechar" if is_open else "Abrir", key=f"toggle_{p['id']}"):
+                open_plans.symmetric_difference_update({p["id"]})
+                rerun("plano.abrir_fechar")
+            if cols[3].button("Exportar", key=f"export_{p['id']}"):
+                # same .ndjson.gz as the Dados page (importable there), streamed from the repository
+                data = b"".join(exportar_ndjson(get_repository(), secoes=("planos",), planos=[p["id"]]))
+                st.download_button("Download", data=data, file_name=f"plan_{p['id']}.ndjson.gz", mime="application/gzip")
+            if is_open and plan_items(p):
+                render_plan_editor(p)
+            st.markdown("---")
+        if st.session_state.get("plans_more") and st.button("Carregar planos mais antigos"):
+            load_more_plans()
+            rerun("plano.mais_antigos")
 
 # ---------- PAGE: Educação ----------
 elif page == "Educação":
@@ -325,7 +550,7 @@ elif page == "Carregar fotos ou artigos":
     with uploader_col:
         st.subheader("Novo envio")
         caption = st.text_input("Legenda (ex.: Squat 3x10)", value="")
-        choose_group = st.selectbox("Postar em grupo (opcional)", options=[""] + list(st.session_state["groups"].keys()))
+        choose_group = st.selectbox("Postar em grupo (opcional)", options=[""] + community.group_names())
         img_file = st.file_uploader("Selecione imagem (jpg/png)", type=["png","jpg","jpeg"])
         if st.button("Enviar foto"):
             if not img_file:
@@ -335,7 +560,7 @@ elif page == "Carregar fotos ou artigos":
                     img_bytes = img_file.read()
                     pid = add_photo(get_username(), caption, img_bytes, group_name=(choose_group or None))
                     st.success(f"Foto enviada (id {pid})")
-                    st.experimental_rerun()
+                    rerun("foto.enviada")
                 except Exception as e:
                     st.error(f"Falha ao enviar: {e}")
 
@@ -349,11 +574,15 @@ elif page == "Carregar fotos ou artigos":
             else:
                 aid = add_article(a_title.strip(), a_body.strip(), get_username())
                 st.success(f"Artigo publicado (id {aid})")
-                st.experimental_rerun()
+                rerun("artigo.publicado")
 
     with gallery_col:
         st.subheader("Galeria")
-        photos = st.session_state["photos"]
+        feed = community.feed
+        # only the visible page builds image/button widgets
+        gallery_cursor = page_cursor("gallery_nav", ("photo",))
+        page_items, next_cursor = feed.page(type_="photo", cursor=gallery_cursor, limit=GALLERY_PAGE_SIZE)
+        photos = [feed.photo_of(it) for it in page_items]
         if not photos:
             st.info("Nenhuma foto enviada ainda.")
         else:
@@ -361,22 +590,18 @@ elif page == "Carregar fotos ou artigos":
             for i, p in enumerate(photos):
                 col = cols[i % 3]
                 try:
-                    col.image(p["image_bytes"], caption=f"{p['caption']} — por {p['uploader']}", use_column_width=True)
+                    col.image(photo_src(p, "thumb"), caption=f"{p['caption']} — por {p['uploader']}", use_column_width=True)
                 except Exception:
                     col.write(f"{p['caption']} — por {p['uploader']}")
-                col.write(f"Grupo: {p['group'] or '—'} • Likes: {p['likes']}")
+                col.write(f"Grupo: {p['group'] or '—'} • Likes: {feed.photo_likes(p['id'])}")
                 if col.button("Curtir ❤️", key=f"like_{p['id']}"):
-                    # simple like: update both photo and feed item (prevent dup by session)
-                    liked = False
-                    # find feed item
-                    feed_id = f"p-{p['id']}"
-                    if like_feed_item(feed_id, get_username()):
-                        liked = True
-                    if liked:
+                    # photo likes live on its feed item (prevent dup by session)
+                    if like_feed_item(p["feed_id"], get_username()):
                         st.success("Você curtiu esta foto.")
                     else:
                         st.warning("Você já curtiu esta foto.")
-                    st.experimental_rerun()
+                    rerun("galeria.curtida")
+            pager("gallery_nav", next_cursor)
 
 # ---------- PAGE: Feed ----------
 elif page == "Feed":
@@ -386,81 +611,29 @@ elif page == "Feed":
 
     with left:
         st.subheader("Filtros")
-        group_opts = ["Todos"] + list(st.session_state["groups"].keys())
+        query = st.text_input("Buscar", value="", placeholder="título, tags, texto ou legenda").strip()
+        group_opts = ["Todos"] + community.group_names()
         sel_group = st.selectbox("Filtrar por grupo", options=group_opts, index=0)
         sel_type = st.selectbox("Tipo", options=["Todos", "Fotos", "Artigos"], index=0)
-        order = st.selectbox("Ordenar por", options=["Mais recentes", "Mais curtidas"], index=0)
-
-        # build feed list
-        feed_items = []
-        for item in st.session_state["feed"]:
-            if sel_type == "Fotos" and item["type"] != "photo":
-                continue
-            if sel_type == "Artigos" and item["type"] != "article":
-                continue
-            if sel_group != "Todos":
-                if item["type"] == "photo":
-                    pid = item["data"]["photo_id"]
-                    photo = next((p for p in st.session_state["photos"] if p["id"]==pid), None)
-                    if not photo or photo.get("group") != sel_group:
-                        continue
-                else:
-                    # articles don't have group in this model; skip filtering articles by group
-                    continue
-            feed_items.append(item)
-
-        if order == "Mais curtidas":
-            feed_items = sorted(feed_items, key=lambda x: x.get("likes",0), reverse=True)
-        else:
-            feed_items = sorted(feed_items, key=lambda x: x.get("created_at",""), reverse=True)
+        order = st.selectbox("Ordenar por", options=["Mais recentes", "Em alta", "Mais curtidas"], index=0)
+        page_size = st.selectbox("Itens por página", options=[10, 20, 50], index=0)
 
-        if not feed_items:
-            st.info("Nenhum item encontrado.")
-        else:
-            for it in feed_items:
-                if it["type"] == "photo":
-                    pid = it["data"]["photo_id"]
-                    photo = next((p for p in st.session_state["photos"] if p["id"]==pid), None)
-                    if not photo:
-                        continue
-                    st.image(photo["image_bytes"], use_column_width=True, caption=f"{photo['caption']}")
-                    st.write(f"Por: {it['author']} • Grupo: {photo.get('group') or '—'} • {it['created_at'][:19]}")
-                    cols = st.columns([1,4,1])
-                    cols[1].write(f"Curtidas: {it.get('likes',0)}")
-                    if cols[2].button("Curtir ❤️", key=f"feed_like_{it['id']}"):
-                        ok = like_feed_item(it['id'], get_username())
-                        if ok:
-                            st.success("Curtiu!")
-                        else:
-                            st.warning("Você já curtiu.")
-                        st.experimental_rerun()
-                    st.markdown("---")
-                else:  # article
-                    st.subheader(it["data"]["title"])
-                    st.write(f"Por: {it['author']} • {it['created_at'][:19]}")
-                    st.markdown(it["data"]["body"])
-                    cols = st.columns([1,4,1])
-                    cols[1].write(f"Curtidas: {it.get('likes',0)}")
-                    if cols[2].button("Curtir artigo ❤️", key=f"feed_like_{it['id']}"):
-                        ok = like_feed_item(it['id'], get_username())
-                        if ok:
-                            st.success("Você curtiu o artigo.")
-                        else:
-                            st.warning("Você já curtiu.")
-                        st.experimental_rerun()
-                    st.markdown("---")
+        type_filter = {"Fotos": "photo", "Artigos": "article"}.get(sel_type)
+        group_filter = None if sel_group == "Todos" else sel_group
+        sort_by = {"Mais curtidas": ORDER_LIKES, "Em alta": ORDER_HOT}.get(order, ORDER_RECENT)
+        render_feed_list((query, type_filter, group_filter, sort_by, page_size))
 
     with right:
         st.subheader("Atalhos")
         if st.button("Ver minhas fotos"):
             # show only user's photos
-            my_photos = [p for p in st.session_state["photos"] if p["uploader"]==get_username()]
+            my_photos = community.feed.photos(uploader=get_username())
             if not my_photos:
                 st.info("Você ainda não enviou fotos.")
             else:
                 for p in my_photos:
-                    st.image(p["image_bytes"], use_column_width=True, caption=p["caption"])
-                    st.write(f"Curtidas: {p.get('likes',0)} • Grupo: {p.get('group') or '—'}")
+                    st.image(photo_src(p, "thumb"), use_column_width=True, caption=p["caption"])
+                    st.write(f"Curtidas: {community.feed.photo_likes(p['id'])} • Grupo: {p.get('group') or '—'}")
 
 # ---------- PAGE: Competições ----------
 elif page == "Competições":
@@ -476,7 +649,7 @@ elif page == "Competições":
                 st.success(f"Grupo '{new_group}' criado.")
             else:
                 st.error("Falha ao criar (nome inválido ou já existe).")
-        join_name = st.selectbox("Entrar em grupo", options=[""] + list(st.session_state["groups"].keys()))
+        join_name = st.selectbox("Entrar em grupo", options=[""] + community.group_names())
         if st.button("Entrar no grupo"):
             if join_name:
                 join_group(join_name, get_username())
@@ -486,14 +659,57 @@ elif page == "Competições":
 
     with right:
         st.subheader("Ranking")
-        leaderboard = []
-        for gname, g in st.session_state["groups"].items():
-            total_likes = sum(next((p["likes"] for p in st.session_state["photos"] if p["id"]==pid), 0) for pid in g["photos"])
-            leaderboard.append({"group": gname, "likes": total_likes, "members": len(g["members"]), "photos": len(g["photos"])})
-        if leaderboard:
-            df = pd.DataFrame(sorted(leaderboard, key=lambda x: x["likes"], reverse=True))
-            st.table(df)
-        else:
-            st.info("Ainda não há competições ativas.")
-
-
+        period = st.radio("Período", options=["Geral", "Esta semana", "Hoje"], horizontal=True)
+        top_k = st.number_input("Mostrar top", min_value=1, max_value=500, value=20, step=5)
+        window = {"Esta semana": "semana", "Hoje": "dia"}.get(period)
+        render_ranking(window, int(top_k))
+
+
+
+# ---------- PAGE: Logs ----------
+elif page == "Logs":
+    st.title("Logs da sessão")
+    events = st.session_state["log"]
+    st.caption(f"{len(events)} evento(s) — mantidos os últimos {events.capacidade}")
+    f_level, f_event, f_size = st.columns([1,2,1])
+    min_level = f_level.selectbox("Nível mínimo", options=list(NIVEIS), index=1)
+    event_filter = f_event.selectbox("Evento", options=["Todos"] + events.tipos())
+    page_size = f_size.selectbox("Por página", options=[25, 50, 100], index=1)
+    event_type = None if event_filter == "Todos" else event_filter
+    log_cursor = page_cursor("log_nav", (min_level, event_type, page_size))
+    rows, next_cursor = events.consultar(nivel_min=min_level, tipo=event_type, antes=log_cursor, limite=page_size)
+    if not rows:
+        st.info("Nenhum evento com esses filtros.")
+    else:
+        st.dataframe(pd.DataFrame({
+            "Hora": [datetime.fromtimestamp(ev.ts).strftime("%Y-%m-%d %H:%M:%S") for ev in rows],
+            "Nível": [ev.nivel for ev in rows],
+            "Evento": [ev.tipo for ev in rows],
+            "Mensagem": [ev.texto for ev in rows],
+            "Campos": [json.dumps(ev.campos, ensure_ascii=False, default=str) for ev in rows],
+        }), hide_index=True, use_container_width=True)
+        pager("log_nav", next_cursor)
+    if st.button("Limpar log"):
+        events.limpar()
+        st.session_state.pop("log_nav", None)
+        rerun("log.limpar")
+
+# ---------- Debug: instrumentation panel (METRICS_ENABLED) ----------
+metrics = get_metricas()
+if metrics.habilitado:
+    sizes = metrics.amostrar_sessao(st.session_state)
+    snap = metrics.snapshot()
+    with st.sidebar.expander("⏱ Debug — desempenho"):
+        st.caption("Tempo por execução do script (processo inteiro)")
+        st.dataframe(pd.DataFrame([
+            {"Página": p, "Execuções": sum(h["buckets"]), "Média (ms)": round(h["sum"] / sum(h["buckets"]) * 1000, 1)}
+            for p, h in snap["page_runs"].items()
+        ]), hide_index=True, use_container_width=True)
+        if snap["reruns"]:
+            st.caption("Reruns por causa")
+            st.dataframe(pd.DataFrame(snap["reruns"], columns=["Página", "Causa", "N"]).sort_values("N", ascending=False),
+                         hide_index=True, use_container_width=True)
+        st.caption("session_state desta sessão (estimado)")
+        st.dataframe(pd.DataFrame(sorted(sizes.items(), key=lambda kv: -kv[1]), columns=["Chave", "Bytes"]),
+                     hide_index=True, use_container_width=True)
+run.encerrar()
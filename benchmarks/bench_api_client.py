@@ -0,0 +1,128 @@
+# benchmarks/bench_api_client.py — latência do cliente da API remota contra um servidor local substituto
+# Uso: python -m benchmarks.bench_api_client
+# O servidor imita /api/mealplans (POST) e /api/mealplans/<id>/items (GET) com atraso fixo por requisição;
+# compara chamadas avulsas (conexão nova a cada uma, como o app fazia) com a sessão em pool, também com 503 ocasionais.
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from services.api_client import ApiClient, ApiError
+
+DELAY_S = 0.02        # "processamento" do servidor por requisição
+PLANS = 50
+ITEMS_PER_PLAN = 42   # 7 dias × 3 refeições × 2 alimentos
+FLAKY_EVERY = 5       # no cenário instável, 1 em cada N GETs responde 503 na primeira tentativa
+
+ITEMS = [{"day": 1 + i // 6, "meal_name": f"Refeição {1 + i % 3}", "food_name": "Arroz", "portion_g": 100,
+          "kcal": 128.0, "protein_g": 2.5, "carbs_g": 28.1, "fats_g": 0.2, "done": False}
+         for i in range(ITEMS_PER_PLAN)]
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # cabeçalho e corpo num só write e sem Nagle, como um servidor de produção; sem isso a conexão
+    # reaproveitada esbarra no ACK atrasado (~40 ms) e a comparação mede o TCP, não o cliente
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+    flaky = False
+    counter = 0
+    lock = threading.Lock()
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(DELAY_S)
+        self._send(201, {"plan_id": 1})
+
+    def do_GET(self):
+        time.sleep(DELAY_S)
+        cls = type(self)
+        with cls.lock:
+            cls.counter += 1
+            fail = cls.flaky and cls.counter % FLAKY_EVERY == 0
+        if fail:
+            self._send(503, {"error": "indisponível"})
+        else:
+            self._send(200, ITEMS)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def timed(fn, n):
+    lat = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        lat.append((time.perf_counter() - t0) * 1000)
+    return lat
+
+
+def report(label, lat, total_ms=None):
+    lat = sorted(lat)
+    p95 = lat[int(len(lat) * 0.95) - 1]
+    total = total_ms if total_ms is not None else sum(lat)
+    print(f"{label:<34} | {statistics.median(lat):>8.1f} | {p95:>8.1f} | {total:>9.0f}")
+
+
+def legacy_create_and_fetch(base):
+    # implementação anterior do app: requests.post/get avulsos, timeout fixo de 10 s, sem retentativa
+    r = requests.post(f"{base}/api/mealplans", json={"user_id": "u", "target_calories": 2000, "days": 7,
+                                                      "meals_per_day": 3}, timeout=10)
+    r.raise_for_status()
+    pid = r.json()["plan_id"]
+    r2 = requests.get(f"{base}/api/mealplans/{pid}/items", timeout=10)
+    r2.raise_for_status()
+    return r2.json()
+
+
+def main():
+    server, base = serve()
+    client = ApiClient(base)
+    print(f"servidor substituto: {base} (atraso {DELAY_S * 1000:.0f} ms por requisição), {PLANS} planos")
+    print(f"{'cenário':<34} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'total (ms)':>9}")
+
+    report("legado: POST+GET avulsos", timed(lambda i: legacy_create_and_fetch(base), PLANS))
+
+    def pooled(i):
+        client.get_items(client.create_plan("u", 2000, 7, 3))
+    report("pool: POST+GET na sessão", timed(pooled, PLANS))
+
+    report("legado: GET itens sequencial", timed(lambda i: requests.get(f"{base}/api/mealplans/{i}/items", timeout=10).json(), PLANS))
+    report("pool: GET itens sequencial", timed(lambda i: client.get_items(i), PLANS))
+
+    StandIn.flaky = True
+    failed = []
+
+    def flaky_get(i):
+        try:
+            assert len(client.get_items(i)) == ITEMS_PER_PLAN
+        except ApiError:
+            failed.append(i)
+    report(f"instável 1/{FLAKY_EVERY} 503: GET itens", timed(flaky_get, PLANS))
+    print(f"  falhas após retentativas: {len(failed)} de {PLANS}")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
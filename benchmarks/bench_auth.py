@@ -0,0 +1,119 @@
+# benchmarks/bench_auth.py — latência de um endpoint sem autenticação durante uma rajada de logins
+# Uso: python -m benchmarks.bench_auth
+# Sobe o app Flask completo (SQLite temporário) num servidor werkzeug com threads e mede o p50/p99 de
+# GET /api/foods/search enquanto STORM_THREADS clientes fazem login sem parar; compara o hash na thread
+# da requisição (AUTH_HASH_WORKERS=0, como antes) com o pool de processos.
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import jwt
+import requests
+from werkzeug.serving import make_server
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_auth.db"))
+
+from config import Config  # noqa: E402
+from flask_app import create_app  # noqa: E402
+from models import db  # noqa: E402
+from services.auth import TokenService  # noqa: E402
+
+PROBES = 300
+STORM_THREADS = 16
+WORKER_MODES = [0, 2]
+EMAIL, PASSWORD = "bench@example.com", "senha-secreta"
+
+
+def serve(app):
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def probe(base, n):
+    session = requests.Session()
+    lat = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        session.get(f"{base}/api/foods/search", params={"q": "arroz", "limit": 20}, timeout=30).raise_for_status()
+        lat.append((time.perf_counter() - t0) * 1000)
+    return lat
+
+
+def storm(base, stop, counts):
+    session = requests.Session()
+    while not stop.is_set():
+        r = session.post(f"{base}/api/auth/login", json={"email": EMAIL, "password": PASSWORD}, timeout=30)
+        counts[r.status_code] = counts.get(r.status_code, 0) + 1
+
+
+def pct(lat, p):
+    lat = sorted(lat)
+    return lat[min(len(lat) - 1, int(len(lat) * p))]
+
+
+def run(workers):
+    Config.AUTH_HASH_WORKERS = workers
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    server, base = serve(app)
+    requests.post(f"{base}/api/auth/register", json={"name": "Bench", "email": EMAIL, "password": PASSWORD},
+                  timeout=30).raise_for_status()
+    # aquece: primeiro login sobe os processos do pool
+    requests.post(f"{base}/api/auth/login", json={"email": EMAIL, "password": PASSWORD}, timeout=60).raise_for_status()
+
+    idle = probe(base, PROBES)
+    stop, counts = threading.Event(), {}
+    threads = [threading.Thread(target=storm, args=(base, stop, counts)) for _ in range(STORM_THREADS)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(0.5)
+    loaded = probe(base, PROBES)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    server.shutdown()
+    app.extensions["power_routine_auth"]["hasher"].shutdown()
+
+    label = "na requisição" if workers == 0 else f"pool ({workers} proc.)"
+    logins = counts.get(200, 0)
+    print(f"{label:<16} | {statistics.median(idle):>9.2f} | {pct(idle, 0.99):>9.2f} | "
+          f"{statistics.median(loaded):>9.2f} | {pct(loaded, 0.99):>9.2f} | {logins / elapsed:>9.1f} | "
+          f"{counts.get(503, 0):>5}")
+
+
+def bench_tokens(n=20_000):
+    # verificação de token: decode a cada chamada (antes) x LRU de claims
+    service = TokenService("x" * 32)
+    token = service.issue(1, name="Bench")
+    t0 = time.perf_counter()
+    for _ in range(n):
+        jwt.decode(token, service.secret, algorithms=[service.algorithm])
+    decode_us = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    for _ in range(n):
+        service.verify(token)
+    cached_us = (time.perf_counter() - t0) / n * 1e6
+    print(f"verificação de JWT: decode {decode_us:.2f} us, cache {cached_us:.2f} us")
+
+
+def main():
+    print(f"pbkdf2_sha256 rounds={Config.PASSWORD_HASH_ROUNDS}, {STORM_THREADS} clientes de login, "
+          f"{PROBES} GET /api/foods/search por medição, {os.cpu_count()} CPUs")
+    print(f"{'hash':<16} | {'p50 ocioso':>9} | {'p99 ocioso':>9} | {'p50 rajada':>9} | {'p99 rajada':>9} | "
+          f"{'logins/s':>9} | {'503':>5}")
+    for workers in WORKER_MODES:
+        run(workers)
+    bench_tokens()
+
+
+if __name__ == "__main__":
+    main()
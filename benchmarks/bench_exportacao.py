@@ -0,0 +1,109 @@
+# benchmarks/bench_exportacao.py — vazão e memória da exportação/importação em massa (services/exportacao.py)
+# Uso: python -m benchmarks.bench_exportacao [--escala 1.0] [--pasta DIR]
+# Na escala 1 os dados sintéticos (feed com curtidas e grupos + planos com itens, benchmarks/sintetico.py)
+# dão ~300 MB de NDJSON. Mede: exportar para .ndjson.gz, importar num banco vazio e reimportar o mesmo arquivo
+# (tudo duplicado: só deduplicação). A geração roda num processo filho, então o pico de RSS deste processo
+# mostra quanto a exportação/importação acrescenta — deve ficar constante ao mudar a escala.
+import argparse
+import gzip
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import popular_comunidade, popular_planos
+from services.exportacao import exportar_ndjson, gravar, importar_ndjson, registros_ndjson
+from services.progresso import HistoricoPeso
+from services.repository import Repository
+
+MB = 1024 * 1024
+
+
+def _popular(path, escala):
+    popular_comunidade(path, n_itens=int(300_000 * escala), n_fotos=int(30_000 * escala),
+                       n_grupos=max(1, int(1_000 * escala)), n_usuarios=max(1, int(20_000 * escala)))
+    # em lotes: popular_planos monta todas as linhas em memória
+    for lote in range(max(1, int(20 * escala))):
+        popular_planos(path, f"user-{lote:03d}", n_planos=200, itens_por_plano=180, seed=lote,
+                       primeiro_id=lote * 200)
+
+
+def _pico_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KiB
+
+
+def _medir_arquivo(path):
+    # -> (bytes de NDJSON, registros) descomprimindo em blocos
+    total = linhas = 0
+    with gzip.open(path, "rb") as f:
+        while bloco := f.read(MB):
+            total += len(bloco)
+            linhas += bloco.count(b"\n")
+    return total, linhas
+
+
+def _linha(nome, segundos, mb, registros, pico):
+    print(f"{nome:<12} | {segundos:7.2f} s | {mb / segundos:8.1f} MB/s | {registros / segundos:10,.0f} reg/s | "
+          f"+{pico:6.1f} MB")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench_exportacao")
+    ap.add_argument("--escala", type=float, default=1.0, help="1.0 ≈ 300 MB de NDJSON")
+    ap.add_argument("--pasta", default=None, help="onde criar os bancos e o arquivo (padrão: temporária)")
+    args = ap.parse_args(argv)
+
+    pasta = tempfile.mkdtemp(prefix="export-", dir=args.pasta)
+    try:
+        origem = Repository(os.path.join(pasta, "origem.db"))
+        historico = HistoricoPeso(os.path.join(pasta, "progresso.csv"))
+        historico.registrar_lote((f"{2020 + d // 365}-{d // 31 % 12 + 1:02d}-{d % 28 + 1:02d}", 80 - d * 0.01)
+                                 for d in range(int(2_000 * args.escala)))
+        t0 = time.perf_counter()
+        filho = multiprocessing.Process(target=_popular, args=(origem.path, args.escala))
+        filho.start()
+        filho.join()
+        if filho.exitcode:
+            return filho.exitcode
+        print(f"dados sintéticos gerados em {time.perf_counter() - t0:.1f} s")
+
+        arquivo = os.path.join(pasta, "export.ndjson.gz")
+        base = _pico_mb()
+        t0 = time.perf_counter()
+        gz = gravar(exportar_ndjson(origem, progresso_path=historico.path), arquivo)
+        exportar = time.perf_counter() - t0
+        pico_export = _pico_mb() - base
+        total, linhas = _medir_arquivo(arquivo)
+        n = linhas - 1  # sem o cabeçalho
+        texto_mb = total / MB
+        print(f"arquivo: {texto_mb:,.1f} MB de NDJSON, {gz / MB:,.1f} MB em gzip ({n:,} registros)")
+        print(f"{'etapa':<12} | {'tempo':>9} | {'NDJSON':>13} | {'registros':>14} | pico RSS")
+        _linha("exportar", exportar, texto_mb, n, pico_export)
+
+        destino = Repository(os.path.join(pasta, "destino.db"))
+        hist_destino = HistoricoPeso(os.path.join(pasta, "progresso-destino.csv"))
+        for nome in ("importar", "reimportar"):
+            base = _pico_mb()
+            t0 = time.perf_counter()
+            stats = importar_ndjson(destino, arquivo, historico=hist_destino)
+            gasto = time.perf_counter() - t0
+            _linha(nome, gasto, texto_mb, n, _pico_mb() - base)
+            inseridos = sum(s["inseridos"] for s in stats.values())
+            lidos = sum(s["lidos"] for s in stats.values())
+            print(f"{'':<12}   {inseridos:,} inseridos de {lidos:,} lidos")
+
+        # conferência: o arquivo de uma exportação do destino tem os mesmos registros
+        conferido = sum(1 for _ in registros_ndjson(destino, progresso_path=hist_destino.path)) - 1
+        print("conferência:", "ok" if conferido == n else f"{conferido:,} registros no destino, esperado {n:,}")
+        origem.close()
+        destino.close()
+        return 0 if conferido == n else 1
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
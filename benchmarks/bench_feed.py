@@ -0,0 +1,89 @@
+# benchmarks/bench_feed.py — latência de curtir/filtrar/paginar no FeedStore conforme o feed cresce
+# Uso: python -m benchmarks.bench_feed
+import random
+import time
+
+from services.feed import FeedStore, ORDER_LIKES
+
+SIZES = [1_000, 10_000, 100_000]
+GROUP_SIZE = 100   # nº de grupos cresce com o feed: cada grupo fica com ~75 fotos
+AUTHOR_SIZE = 100  # idem para autores: ~100 itens por autor
+OPS = 2_000
+PAGE_SIZE = 20
+
+
+def build(n):
+    store = FeedStore()
+    n_groups = max(1, n // GROUP_SIZE)
+    n_authors = max(1, n // AUTHOR_SIZE)
+    ids = []
+    for i in range(n):
+        if i % 4 == 0:
+            ids.append(store.add_article(f"Artigo {i}", "corpo", f"autor{i % n_authors}"))
+        else:
+            pid = store.add_photo(f"autor{i % n_authors}", f"legenda {i}", {}, group=f"g{i % n_groups}")
+            ids.append(f"p-{pid}")
+    return store, ids, n_groups, n_authors
+
+
+def legacy_like(feed, photos, feed_id, user):
+    # implementação anterior de app.like_feed_item: varre feed e photos
+    for item in feed:
+        if item["id"] == feed_id:
+            if user in item["liked_by"]:
+                return False
+            item["liked_by"].append(user)
+            item["likes"] = len(item["liked_by"])
+            if item["type"] == "photo":
+                for p in photos:
+                    if p["id"] == item["data"]["photo_id"]:
+                        p["liked_by"].append(user)
+                        p["likes"] = len(p["liked_by"])
+                        break
+            return True
+    return False
+
+
+def per_op_us(fn, args):
+    t0 = time.perf_counter()
+    for a in args:
+        fn(*a)
+    return (time.perf_counter() - t0) / len(args) * 1e6
+
+
+def main():
+    rnd = random.Random(42)
+    print(f"{'itens':>8} | {'like (us)':>10} | {'filtro grupo (us)':>18} | {'filtro autor (us)':>18} | "
+          f"{'página recentes (us)':>20} | {'página curtidas (us)':>20} | {'like legado (us)':>17}")
+    for n in SIZES:
+        store, ids, n_groups, n_authors = build(n)
+        like_args = [(rnd.choice(ids), f"u{rnd.randrange(10_000)}") for _ in range(OPS)]
+        group_args = [(None, f"g{rnd.randrange(n_groups)}") for _ in range(OPS // 10)]
+        author_args = [(None, None, f"autor{rnd.randrange(n_authors)}") for _ in range(OPS // 10)]
+
+        like_us = per_op_us(store.like, like_args)
+        group_us = per_op_us(store.filter, group_args)
+        author_us = per_op_us(store.filter, author_args)
+
+        # 10ª página (cursor já avançado) das duas ordenações, sem filtro
+        cursors = {}
+        for order in ("recent", ORDER_LIKES):
+            cursor = None
+            for _ in range(9):
+                _, cursor = store.page(order=order, cursor=cursor, limit=PAGE_SIZE)
+            cursors[order] = cursor
+        recent_us = per_op_us(lambda: store.page(cursor=cursors["recent"], limit=PAGE_SIZE), [()] * OPS)
+        likes_us = per_op_us(lambda: store.page(order=ORDER_LIKES, cursor=cursors[ORDER_LIKES], limit=PAGE_SIZE), [()] * OPS)
+
+        # mesmo volume de dados no formato antigo (listas), só para comparação
+        legacy_feed = [dict(store.get(fid), liked_by=[]) for fid in reversed(ids)]
+        legacy_photos = [dict(p, likes=0, liked_by=[]) for p in store.photos()]
+        legacy_args = [(legacy_feed, legacy_photos) + a for a in like_args[:50]]
+        legacy_us = per_op_us(legacy_like, legacy_args)
+
+        print(f"{n:>8} | {like_us:>10.2f} | {group_us:>18.2f} | {author_us:>18.2f} | "
+              f"{recent_us:>20.2f} | {likes_us:>20.2f} | {legacy_us:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
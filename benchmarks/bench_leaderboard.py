@@ -0,0 +1,73 @@
+# benchmarks/bench_leaderboard.py — custo de uma curtida + leitura do top-K no ranking incremental
+# comparado à agregação antiga da página Competições (grupos × fotos do grupo × todas as fotos)
+# Uso: python -m benchmarks.bench_leaderboard
+import random
+import time
+from datetime import datetime, timedelta
+
+from services.leaderboard import Leaderboard
+
+GROUP_COUNTS = [100, 500, 2_000]
+PHOTOS_PER_GROUP = 20
+OPS = 5_000
+TOP_K = 20
+LEGACY_MAX_GROUPS = 500  # acima disso a versão antiga leva dezenas de segundos
+
+
+def legacy_ranking(groups, photos):
+    leaderboard = []
+    for gname, g in groups.items():
+        total_likes = sum(next((p["likes"] for p in photos if p["id"] == pid), 0) for pid in g["photos"])
+        leaderboard.append({"group": gname, "likes": total_likes, "members": len(g["members"]), "photos": len(g["photos"])})
+    return sorted(leaderboard, key=lambda x: x["likes"], reverse=True)
+
+
+def main():
+    rnd = random.Random(7)
+    start = datetime(2026, 10, 1)
+    print(f"{'grupos':>7} | {'curtida (us)':>12} | {'top-{} (us)'.format(TOP_K):>11} | {'top semana (us)':>15} | {'legado (ms)':>11}")
+    for n_groups in GROUP_COUNTS:
+        lb = Leaderboard()
+        names = [f"g{i}" for i in range(n_groups)]
+        for name in names:
+            lb.add_member(name)
+            for _ in range(PHOTOS_PER_GROUP):
+                lb.add_photo(name)
+        events = [(rnd.choice(names), start + timedelta(minutes=i)) for i in range(OPS)]
+
+        t0 = time.perf_counter()
+        for name, when in events:
+            lb.add_like(name, when)
+        like_us = (time.perf_counter() - t0) / OPS * 1e6
+
+        now = events[-1][1]
+        t0 = time.perf_counter()
+        for _ in range(1_000):
+            lb.top(TOP_K)
+        top_us = (time.perf_counter() - t0) / 1_000 * 1e6
+        t0 = time.perf_counter()
+        for _ in range(1_000):
+            lb.top(TOP_K, window="semana", now=now)
+        week_us = (time.perf_counter() - t0) / 1_000 * 1e6
+
+        if n_groups > LEGACY_MAX_GROUPS:
+            print(f"{n_groups:>7} | {like_us:>12.2f} | {top_us:>11.2f} | {week_us:>15.2f} | {'—':>11}")
+            continue
+        # mesmo estado no formato antigo, uma leitura só (é quadrática)
+        photos, groups = [], {}
+        for name in names:
+            pids = []
+            for j in range(PHOTOS_PER_GROUP):
+                pid = f"{name}-{j}"
+                photos.append({"id": pid, "likes": rnd.randrange(5)})
+                pids.append(pid)
+            groups[name] = {"members": ["x"], "photos": pids}
+        t0 = time.perf_counter()
+        legacy_ranking(groups, photos)
+        legacy_ms = (time.perf_counter() - t0) * 1e3
+
+        print(f"{n_groups:>7} | {like_us:>12.2f} | {top_us:>11.2f} | {week_us:>15.2f} | {legacy_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
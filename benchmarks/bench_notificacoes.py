@@ -0,0 +1,58 @@
+# benchmarks/bench_notificacoes.py — varredura de inatividade (RN-015) com centenas de milhares de usuários
+# Uso: python -m benchmarks.bench_notificacoes
+# Simula uma semana de varreduras a cada hora com atividade contínua de parte da base e compara o custo
+# por varredura do índice (heap) com a varredura completa de todos os usuários.
+import random
+import time
+
+from services.notificacoes import DIA_SECONDS, MotorNotificacoes
+
+SIZES = [100_000, 500_000]
+HORAS = 24 * 7
+ATIVIDADES_POR_HORA = 20_000
+
+
+def varredura_completa(ultima, alertados, agora, limite):
+    # alternativa ingênua: olhar todo mundo a cada varredura
+    corte = agora - limite
+    return [u for u, t in ultima.items() if t <= corte and u not in alertados]
+
+
+def main():
+    rnd = random.Random(42)
+    print(f"{'usuários':>9} | {'registrar (us)':>14} | {'1ª varredura (ms)':>17} | {'varrer p50 (ms)':>15} | "
+          f"{'varrer máx (ms)':>15} | {'completa (ms)':>13} | {'alertas/h':>9}")
+    for n in SIZES:
+        agora = 100 * DIA_SECONDS
+        motor = MotorNotificacoes()
+        users = [f"u{i}" for i in range(n)]
+        # última atividade espalhada pelos últimos 30 dias
+        t0 = time.perf_counter()
+        for u in users:
+            motor.registrar_atividade(u, agora - rnd.uniform(0, 30 * DIA_SECONDS))
+        registrar_us = (time.perf_counter() - t0) / n * 1e6
+        # primeira varredura: materializa o atraso inicial (quem já passou de 14 dias)
+        t0 = time.perf_counter()
+        backlog = len(motor.varrer(agora))
+        primeira_ms = (time.perf_counter() - t0) * 1000
+
+        tempos, alertas = [], 0
+        for h in range(HORAS):
+            agora += 3600
+            for _ in range(ATIVIDADES_POR_HORA):
+                motor.registrar_atividade(users[rnd.randrange(n)], agora - rnd.uniform(0, 3600))
+            t0 = time.perf_counter()
+            alertas += len(motor.varrer(agora))
+            tempos.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        varredura_completa(motor._ultima, motor._alertados, agora, motor.limite)
+        completa_ms = (time.perf_counter() - t0) * 1000
+
+        tempos.sort()
+        print(f"{n:>9} | {registrar_us:>14.2f} | {primeira_ms:>9.0f} ({backlog:>6}) | {tempos[len(tempos) // 2]:>15.2f} | "
+              f"{tempos[-1]:>15.2f} | {completa_ms:>13.2f} | {alertas / HORAS:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_nutri.py — metas nutricionais da base inteira: laço escalar x services.nutri.metas_lote
+# Uso: python -m benchmarks.bench_nutri
+# Confere linha a linha que o lote reproduz exatamente o cálculo escalar da página Dieta.
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.nutri import alertas_dieta, calorias_alvo, macros_por_objetivo, metas_dataframe, tmb_mifflin
+
+ROWS = 1_000_000
+FIBRAS_PCT = 28
+OBJETIVOS = np.array(["Cutting", "Bulking", "Manutenção", "cutting", "BULKING"], dtype=object)
+ALERTAS = {"alerta_rn020": "RN-020", "alerta_rn018": "RN-018", "alerta_rn016": "RN-016"}
+
+
+def usuarios(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "altura_cm": rng.integers(140, 210, n),
+        "peso_kg": np.round(rng.uniform(40, 160, n), 1),
+        "idade": rng.integers(14, 90, n),
+        "sexo": rng.choice(np.array(["M", "F"], dtype=object), n),
+        "objetivo": rng.choice(OBJETIVOS, n),
+    })
+
+
+def metas_escalar(altura, peso, idade, sexo, objetivo):
+    # o que a página Dieta faz por usuário
+    tmb = tmb_mifflin(altura, peso, idade, sexo)
+    kcal = calorias_alvo(tmb, objetivo)
+    mac = macros_por_objetivo(kcal, objetivo)
+    msgs = alertas_dieta(int(tmb), kcal, mac["carbo_pct"], fibras_pct=FIBRAS_PCT)
+    return (tmb, kcal, mac["proteina_kcal"], mac["carbo_kcal"], mac["gordura_kcal"], mac["carbo_pct"],
+            mac["proteina_kcal"] // 4, mac["carbo_kcal"] // 4, mac["gordura_kcal"] // 9,
+            *[any(rn in m for m in msgs) for rn in ALERTAS.values()])
+
+
+def main():
+    df = usuarios(ROWS)
+    colunas = [df[c].tolist() for c in ("altura_cm", "peso_kg", "idade", "sexo", "objetivo")]
+
+    t0 = time.perf_counter()
+    escalar = [metas_escalar(*linha) for linha in zip(*colunas)]
+    t_escalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    lote = metas_dataframe(df, fibras_pct=FIBRAS_PCT)
+    t_lote = time.perf_counter() - t0
+
+    nomes = ["tmb", "kcal_alvo", "proteina_kcal", "carbo_kcal", "gordura_kcal", "carbo_pct",
+             "proteina_g", "carbo_g", "gordura_g", *ALERTAS]
+    esperado = pd.DataFrame(escalar, columns=nomes)
+    divergentes = {c: int((esperado[c].to_numpy() != lote[c].to_numpy()).sum()) for c in nomes}
+
+    categorico = df.astype({"sexo": "category", "objetivo": "category"})
+    t0 = time.perf_counter()
+    lote_cat = metas_dataframe(categorico, fibras_pct=FIBRAS_PCT)
+    t_cat = time.perf_counter() - t0
+    assert lote_cat.equals(lote)
+
+    print(f"{ROWS:,} usuários")
+    print(f"laço escalar : {t_escalar:8.3f} s")
+    print(f"metas_lote   : {t_lote:8.3f} s  ({t_escalar / t_lote:.0f}x)  sexo/objetivo como texto")
+    print(f"metas_lote   : {t_cat:8.3f} s  ({t_escalar / t_cat:.0f}x)  sexo/objetivo como category")
+    print("linhas divergentes:", divergentes if any(divergentes.values()) else "nenhuma")
+    print("alertas:", {c: int(lote[c].sum()) for c in ALERTAS})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_plano.py — gerador de plano alimentar: plano de 30 dias × 6 refeições, catálogo de 10k alimentos
+# Uso: python -m benchmarks.bench_plano
+import time
+
+import numpy as np
+
+from services.nutri import macros_por_objetivo
+from services.plano_alimentar import Catalogo, catalogo_padrao, gerar_itens, resolver_plano
+
+DAYS = 30
+MEALS = 6
+CATALOG_SIZES = [len(catalogo_padrao()), 1_000, 10_000]
+REPEAT = 5
+LIMIT_S = 1.0
+
+
+def catalogo_sintetico(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # mistura de perfis (proteico, carboidrato, gordura, misto) para parecer um catálogo real
+    base = catalogo_padrao()
+    idx = rng.integers(0, len(base), n)
+    jitter = rng.uniform(0.8, 1.2, (n, 3))
+    macros = base.macros[idx] * jitter
+    kcal = macros @ np.array([4.0, 4.0, 9.0])
+    nomes = [f"{base.nomes[i]} #{j}" for j, i in enumerate(idx)]
+    return Catalogo(nomes, kcal, macros[:, 0], macros[:, 1], macros[:, 2])
+
+
+def main():
+    target, objetivo = 2400, "Bulking"
+    mac = macros_por_objetivo(target, objetivo)
+    alvo = np.array([mac["proteina_kcal"] / 4, mac["carbo_kcal"] / 4, mac["gordura_kcal"] / 9])
+    print(f"plano {DAYS} dias × {MEALS} refeições, {target} kcal ({objetivo}); metas g/dia P/C/G = {alvo.round(0)}")
+    print(f"{'catálogo':>9} | {'resolver (ms)':>13} | {'itens (ms)':>10} | {'erro kcal/dia':>13} | {'erro macros/dia':>15} | {'repetições':>10}")
+    worst = 0.0
+    for n in CATALOG_SIZES:
+        cat = catalogo_padrao() if n == CATALOG_SIZES[0] else catalogo_sintetico(n)
+        resolver_plano(cat, target, DAYS, MEALS, objetivo, seed=0)  # aquecimento
+        t0 = time.perf_counter()
+        for r in range(REPEAT):
+            escolhas, porcoes = resolver_plano(cat, target, DAYS, MEALS, objetivo, seed=r)
+        solve_s = (time.perf_counter() - t0) / REPEAT
+        t0 = time.perf_counter()
+        gerar_itens(cat, escolhas, porcoes)
+        items_s = time.perf_counter() - t0
+        worst = max(worst, solve_s + items_s)
+
+        kcal_dia = (porcoes * cat.kcal[escolhas] / 100).sum(axis=(1, 2))
+        macro_dia = (porcoes[..., None] * cat.macros[escolhas] / 100).sum(axis=(1, 2))
+        erro_kcal = np.abs(kcal_dia - target).mean() / target * 100
+        erro_macro = (np.abs(macro_dia - alvo) / alvo).mean() * 100
+        # mesma refeição repetindo alimento em dias consecutivos
+        rep = sum(len(set(escolhas[d, m]) & set(escolhas[d - 1, m])) for d in range(1, DAYS) for m in range(MEALS))
+        print(f"{n:>9} | {solve_s * 1e3:>13.1f} | {items_s * 1e3:>10.1f} | {erro_kcal:>12.2f}% | {erro_macro:>14.2f}% | {rep:>10}")
+    print(f"pior caso {worst * 1e3:.0f} ms (limite {LIMIT_S * 1e3:.0f} ms): {'OK' if worst < LIMIT_S else 'ACIMA DO LIMITE'}")
+    return 0 if worst < LIMIT_S else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+# benchmarks/bench_treino.py — programas de treino periodizados em lote (services/treino.py)
+# Uso: python -m benchmarks.bench_treino
+# Gera programas de 12 semanas para milhares de perfis sintéticos (níveis, condições RN-007, grupo de ontem) e
+# confere as regras em todos: nenhum grupo muscular em dias seguidos (RN-019, inclusive com o treino de
+# ontem), duração, intensidade e treinos por semana dentro dos limites RN-007.
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from services.treino import (GRUPOS, LIMITES_RN007, MUSCULARES, NIVEIS, gerar_programas, limites_rn007,
+                             violacoes_rn019)
+
+USUARIOS = [1_000, 10_000, 100_000]
+SEMANAS = 12
+REPEAT = 3
+LIMIT_S = 1.0  # 10k usuários
+
+
+def perfis_sinteticos(n, seed=0):
+    rnd = random.Random(seed)
+    condicoes = list(LIMITES_RN007)
+    return [{"nivel": rnd.choice(NIVEIS), "condicoes": rnd.sample(condicoes, rnd.choice((0, 0, 0, 1, 2))),
+             "user": f"user-{i}", "grupo_ontem": rnd.choice(GRUPOS + (None,))} for i in range(n)]
+
+
+def conferir(perfis, prog):
+    # -> nº de perfis com alguma regra violada
+    lim = np.array([limites_rn007(p["condicoes"]) for p in perfis])
+    ontem = np.array([GRUPOS.index(p["grupo_ontem"]) if p["grupo_ontem"] else -1 for p in perfis])
+    treino = (prog.grupos >= 0) & (prog.grupos < MUSCULARES)
+    por_semana = treino.reshape(len(perfis), -1, 7).sum(axis=2).max(axis=1)
+    ruins = (violacoes_rn019(prog.grupos) > 0) | ((prog.grupos[:, 0] == ontem) & (ontem < MUSCULARES))
+    ruins |= (prog.duracao.max(axis=1) > lim[:, 1]) | (prog.intensidade > lim[:, 0]) | (por_semana > lim[:, 2])
+    return int(ruins.sum())
+
+
+def main():
+    inicio = date.today() - timedelta(days=date.today().weekday())
+    print(f"programas de {SEMANAS} semanas a partir de {inicio}")
+    print(f"{'usuários':>9} | {'gerar (ms)':>10} | {'usuários/s':>11} | {'dia (µs)':>8} | violações")
+    tempo_10k = None
+    ruins_total = 0
+    for n in USUARIOS:
+        perfis = perfis_sinteticos(n)
+        gerar_programas(perfis[:100], SEMANAS, inicio)  # aquecimento
+        t0 = time.perf_counter()
+        for _ in range(REPEAT):
+            prog = gerar_programas(perfis, SEMANAS, inicio)
+        gasto = (time.perf_counter() - t0) / REPEAT
+        if n == 10_000:
+            tempo_10k = gasto
+        # leitura do dia de hoje, como a página Treinos faz a cada rerun
+        t0 = time.perf_counter()
+        for i in range(1_000):
+            prog.dia(inicio + timedelta(days=i % prog.dias), i % n)
+        dia_us = (time.perf_counter() - t0) / 1_000 * 1e6
+        ruins = conferir(perfis, prog)
+        ruins_total += ruins
+        print(f"{n:>9,} | {gasto * 1e3:>10.1f} | {n / gasto:>11,.0f} | {dia_us:>8.1f} | {ruins}")
+    ok = tempo_10k < LIMIT_S and not ruins_total
+    print(f"10k usuários em {tempo_10k * 1e3:.0f} ms (limite {LIMIT_S * 1e3:.0f} ms), {ruins_total} perfil(is) com "
+          f"regra violada: {'OK' if ok else 'FALHOU'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
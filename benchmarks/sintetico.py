@@ -0,0 +1,123 @@
+# benchmarks/sintetico.py — dados sintéticos para os benchmarks: feed, fotos, curtidas, grupos e planos
+# Tudo é gravado em lote direto nas tabelas do Repository (mesmo esquema do app, sem passar pela UI);
+# quem mede carrega a partir dali pelo caminho normal (Community, list_plans, plan_items).
+import hashlib
+import json
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from services.repository import ITEM_COLUMNS, PLAN_COLUMNS
+
+REFEICOES = ("Café da manhã", "Lanche da manhã", "Almoço", "Lanche da tarde", "Jantar", "Ceia")
+ALIMENTOS = ("Arroz integral", "Feijão", "Frango grelhado", "Ovos", "Aveia", "Banana", "Batata-doce",
+             "Iogurte natural", "Pão integral", "Azeite", "Castanhas", "Brócolis", "Peixe", "Tapioca")
+
+
+def _ts(base, segundos):
+    return (base + timedelta(seconds=segundos)).isoformat()
+
+
+def _refs(i):
+    # referências no formato do BlobStore (services/images.py); os blobs não precisam existir
+    d = hashlib.sha256(str(i).encode()).hexdigest()
+    return {"full": d, "feed": d[::-1], "thumb": d[1:] + d[0], "width": 1600, "height": 1200}
+
+
+def popular_comunidade(path, n_itens=100_000, n_fotos=10_000, n_grupos=1_000, n_usuarios=5_000,
+                       curtidas_por_item=2.0, agora=None, seed=0):
+    # feed com n_itens (n_fotos fotos, o resto artigos), grupos com membros e curtidas dos últimos 30 dias.
+    # -> {"ids", "fotos", "grupos", "usuarios"}
+    rnd = random.Random(seed)
+    agora = agora or datetime.now()
+    inicio = agora - timedelta(days=60)
+    passo = 60 * 24 * 3600 / max(n_itens, 1)
+    grupos = [f"grupo-{g:04d}" for g in range(n_grupos)]
+    usuarios = [f"user-{u:05d}" for u in range(n_usuarios)]
+    fotos = set(rnd.sample(range(n_itens), min(n_fotos, n_itens)))
+
+    itens, linhas_fotos, ids = [], [], []
+    for i in range(n_itens):
+        autor = usuarios[rnd.randrange(n_usuarios)]
+        created_at = _ts(inicio, i * passo)
+        if i in fotos:
+            fid, pid = f"p-{i:08x}", f"{i:08x}"
+            grupo = grupos[rnd.randrange(n_grupos)] if grupos and rnd.random() < 0.8 else None
+            itens.append((fid, "photo", autor, created_at, grupo, None, None, "[]"))
+            linhas_fotos.append((pid, fid, autor, f"legenda {i}", json.dumps(_refs(i)), created_at, grupo))
+        else:
+            fid = f"a-{i:08x}"
+            itens.append((fid, "article", autor, created_at, None, f"Artigo {i}", "corpo do artigo " * 20,
+                          json.dumps(["treino"] if i % 3 else ["dieta"])))
+        ids.append(fid)
+
+    curtidas = set()
+    for _ in range(int(n_itens * curtidas_por_item)):
+        # cauda longa: poucos itens concentram muitas curtidas
+        i = min(int(rnd.paretovariate(1.2)) - 1, n_itens - 1)
+        curtidas.add((ids[n_itens - 1 - i] if rnd.random() < 0.5 else ids[rnd.randrange(n_itens)],
+                      usuarios[rnd.randrange(n_usuarios)]))
+    linhas_curtidas = [(fid, user, _ts(agora, -rnd.uniform(0, 30 * 24 * 3600))) for fid, user in curtidas]
+
+    membros = set()
+    for g in grupos:
+        for user in rnd.sample(usuarios, min(rnd.randint(1, 30), n_usuarios)):
+            membros.add((g, user))
+
+    with sqlite3.connect(path) as conn:
+        conn.executemany("INSERT INTO community_groups (name, id, created_at) VALUES (?, ?, ?)",
+                         [(g, f"{i:06x}", _ts(inicio, i)) for i, g in enumerate(grupos)])
+        conn.executemany("INSERT INTO group_members (group_name, user, joined_at) VALUES (?, ?, ?)",
+                         [(g, user, _ts(inicio, 0)) for g, user in membros])
+        conn.executemany("INSERT INTO feed_items (id, type, author, created_at, group_name, title, body, tags) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", itens)
+        conn.executemany("INSERT INTO photos (id, feed_id, uploader, caption, image, created_at, group_name) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", linhas_fotos)
+        conn.executemany("INSERT INTO likes (feed_id, user, created_at) VALUES (?, ?, ?)", linhas_curtidas)
+    conn.close()
+    return {"ids": ids, "fotos": [r[1] for r in linhas_fotos], "grupos": grupos, "usuarios": usuarios}
+
+
+def itens_plano(n, rnd, pct_concluido=0.5):
+    refeicoes = 6
+    out = []
+    for i in range(n):
+        kcal = round(rnd.uniform(80, 700), 1)
+        out.append({
+            "day": i // refeicoes + 1,
+            "meal_name": REFEICOES[i % refeicoes],
+            "food_name": ALIMENTOS[rnd.randrange(len(ALIMENTOS))],
+            "portion_g": round(rnd.uniform(30, 300), 1),
+            "kcal": kcal,
+            "protein_g": round(kcal * 0.3 / 4, 1),
+            "carbs_g": round(kcal * 0.45 / 4, 1),
+            "fats_g": round(kcal * 0.25 / 9, 1),
+            "done": rnd.random() < pct_concluido,
+        })
+    return out
+
+
+def popular_planos(path, user="bench", n_planos=500, itens_por_plano=180, seed=0, primeiro_id=0):
+    # planos de um usuário com itens e done_count coerentes -> [plan_id] (mais recente primeiro);
+    # primeiro_id separa os ids de chamadas sucessivas no mesmo banco
+    rnd = random.Random(seed)
+    inicio = datetime(2026, 1, 1)
+    planos, linhas = [], []
+    for p in range(n_planos):
+        pid = f"{primeiro_id + p:08x}"
+        itens = itens_plano(itens_por_plano, rnd, pct_concluido=rnd.random())
+        planos.append({
+            "id": pid, "user_id": user, "target_calories": 2100, "days": itens_por_plano // 6 or 1,
+            "meals_per_day": 6, "objetivo": "Manutenção", "created_at": _ts(inicio, p * 3600),
+            "status": "generated_local", "progress": 100, "item_count": len(itens),
+            "done_count": sum(it["done"] for it in itens),
+        })
+        linhas.extend((pid, i, *[int(it[c]) if c == "done" else it[c] for c in ITEM_COLUMNS])
+                      for i, it in enumerate(itens))
+    with sqlite3.connect(path) as conn:
+        conn.executemany(f"INSERT INTO plans ({', '.join(PLAN_COLUMNS)}) VALUES ({', '.join('?' * len(PLAN_COLUMNS))})",
+                         [[p[c] for c in PLAN_COLUMNS] for p in planos])
+        conn.executemany(f"INSERT INTO plan_items (plan_id, idx, {', '.join(ITEM_COLUMNS)}) "
+                         f"VALUES (?, ?, {', '.join('?' * len(ITEM_COLUMNS))})", linhas)
+    conn.close()
+    return [p["id"] for p in reversed(planos)]
@@ -0,0 +1,201 @@
+# benchmarks/stress_community.py — teste de estresse da Community compartilhada com muitas threads
+# Uso: python -m benchmarks.stress_community [--threads 32] [--ops 300] [--seed 0]
+# Cada thread faz o papel de uma sessão: mistura criar grupo (nomes repetidos de propósito), entrar em grupo,
+# curtir (itens populares disputados por todas), postar foto e artigo contra um Repository temporário. No fim
+# confere os invariantes na memória, no banco e numa Community recarregada do banco; sai com código 1 se
+# algum falhou.
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from services.community import Community
+from services.feed import ORDER_HOT, ORDER_LIKES, ORDER_RECENT
+from services.mudancas import CURTIDAS, FEED, GRUPOS
+from services.repository import Repository
+
+MIX = (("like", 0.55), ("join", 0.15), ("page", 0.12), ("photo", 0.08), ("create", 0.05), ("article", 0.05))
+N_GRUPOS = 20     # nomes de grupo disputados pelas threads
+N_USUARIOS = 200
+ITENS_INICIAIS = 50
+
+
+def semear(com, rnd):
+    for g in range(N_GRUPOS // 2):
+        com.create_group(f"g{g}", "seed")
+    for i in range(ITENS_INICIAIS):
+        if i % 2:
+            com.add_article(f"Artigo {i}", "corpo", "seed")
+        else:
+            com.add_photo("seed", f"legenda {i}", {}, group=f"g{rnd.randrange(N_GRUPOS // 2)}")
+
+
+def sessao(com, seed, ops, barreira, lat, erros):
+    rnd = random.Random(seed)
+    nomes, pesos = zip(*MIX)
+    barreira.wait()
+    for _ in range(ops):
+        op = rnd.choices(nomes, pesos)[0]
+        user = f"u{rnd.randrange(N_USUARIOS)}"
+        t0 = time.perf_counter()
+        try:
+            if op == "like":
+                ids = com.feed._order
+                # metade das curtidas disputa os 10 itens mais antigos
+                i = rnd.randrange(min(10, len(ids))) if rnd.random() < 0.5 else rnd.randrange(len(ids))
+                com.like(ids[i], user)
+            elif op == "join":
+                com.join_group(f"g{rnd.randrange(N_GRUPOS)}", user)
+            elif op == "create":
+                com.create_group(f"g{rnd.randrange(N_GRUPOS)}", user)
+            elif op == "photo":
+                grupos = com.group_names()
+                com.add_photo(user, "legenda", {}, group=rnd.choice(grupos) if grupos else None)
+            elif op == "article":
+                com.add_article("Artigo", "corpo", user)
+            else:
+                order = rnd.choice((ORDER_RECENT, ORDER_LIKES, ORDER_HOT))
+                cursor = None
+                for _ in range(3):
+                    _, cursor = com.feed.page(order=order, cursor=cursor, limit=20)
+                    if cursor is None:
+                        break
+                com.leaderboard.top(10, window=rnd.choice((None, "semana", "dia")))
+        except Exception as exc:  # noqa: BLE001 — qualquer exceção numa sessão é falha do teste
+            erros.append(f"{op}: {exc!r}")
+        lat[op].append(time.perf_counter() - t0)
+
+
+def _chaves(keys):
+    return [k for chunk in keys._chunks for k in chunk]
+
+
+def verificar(com, path):
+    # -> [mensagens de falha]
+    falhas = []
+    feed = com.feed
+    if len(feed._items) != len(feed._order) or any(feed._items[fid]["seq"] != s for s, fid in enumerate(feed._order)):
+        falhas.append("seq dos itens não corresponde à ordem de publicação")
+    with sqlite3.connect(path) as conn:
+        curtidas_db = Counter(fid for fid, in conn.execute("SELECT feed_id FROM likes"))
+        membros_db = {}
+        for g, user in conn.execute("SELECT group_name, user FROM group_members"):
+            membros_db.setdefault(g, set()).add(user)
+        grupos_db = {g for g, in conn.execute("SELECT name FROM community_groups")}
+        itens_db = conn.execute("SELECT COUNT(*) FROM feed_items").fetchone()[0]
+    conn.close()
+    if itens_db != len(feed):
+        falhas.append(f"itens: {len(feed)} em memória, {itens_db} no banco")
+    for fid, item in feed._items.items():
+        if item["likes"] != len(item["liked_by"]) or curtidas_db.get(fid, 0) != item["likes"]:
+            falhas.append(f"curtidas de {fid}: {item['likes']} / {len(item['liked_by'])} / banco {curtidas_db.get(fid, 0)}")
+    for scope, keys in list(feed._by_likes.items()) + list(feed._by_hot.items()):
+        ks = _chaves(keys)
+        if ks != sorted(ks) or len(ks) != len(keys) or keys._maxes != [c[-1] for c in keys._chunks]:
+            falhas.append(f"lista ordenada inconsistente no escopo {scope}")
+    esperado = sorted((-it["likes"], -it["seq"]) for it in feed._items.values())
+    if _chaves(feed._by_likes[None]) != esperado:
+        falhas.append("ordem por curtidas não bate com as curtidas dos itens")
+    if set(com.groups) != grupos_db:
+        falhas.append(f"grupos: {len(com.groups)} em memória, {len(grupos_db)} no banco")
+    curtidas_grupo = Counter()
+    fotos_grupo = Counter()
+    for item in feed._items.values():
+        photo = feed.photo_of(item)
+        if photo and photo["group"]:
+            curtidas_grupo[photo["group"]] += item["likes"]
+            fotos_grupo[photo["group"]] += 1
+    for name, grp in com.groups.items():
+        if len(grp["members"]) != len(set(grp["members"])) or set(grp["members"]) != membros_db.get(name, set()):
+            falhas.append(f"membros de {name}: {len(grp['members'])} em memória, {len(membros_db.get(name, ()))} no banco")
+        if len(grp["photos"]) != fotos_grupo[name]:
+            falhas.append(f"fotos de {name}: {len(grp['photos'])} na lista, {fotos_grupo[name]} no feed")
+        st = com.leaderboard.stats(name)
+        if (st["likes"], st["photos"], st["members"]) != (curtidas_grupo[name], fotos_grupo[name], len(grp["members"])):
+            falhas.append(f"ranking de {name}: {st}")
+    # barramento de mudanças: uma publicação por mudança efetiva (a semente não tem curtidas)
+    mud = com.mudancas
+    esperados = {FEED: len(feed), CURTIDAS: sum(it["likes"] for it in feed._items.values()),
+                 GRUPOS: sum(len(g["members"]) for g in com.groups.values())}
+    for topico, n in esperados.items():
+        if mud.versao(topico) != n:
+            falhas.append(f"barramento: versão de {topico} {mud.versao(topico)}, esperado {n}")
+    for name, grp in com.groups.items():
+        if mud.versao(GRUPOS, name) != len(grp["members"]) or mud.versao(CURTIDAS, name) != curtidas_grupo[name]:
+            falhas.append(f"barramento: versões do grupo {name} não batem")
+    return falhas
+
+
+def comparar_recarga(com, repo):
+    # uma Community nova, hidratada do banco, precisa enxergar o mesmo estado
+    nova = Community(repo)
+    falhas = []
+    if {fid: it["likes"] for fid, it in nova.feed._items.items()} != {fid: it["likes"] for fid, it in com.feed._items.items()}:
+        falhas.append("curtidas diferentes após recarregar do banco")
+    if {g: sorted(v["members"]) for g, v in nova.groups.items()} != {g: sorted(v["members"]) for g, v in com.groups.items()}:
+        falhas.append("membros diferentes após recarregar do banco")
+    if nova.leaderboard.top() != com.leaderboard.top():
+        falhas.append("ranking diferente após recarregar do banco")
+    return falhas
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.stress_community")
+    ap.add_argument("--threads", type=int, default=32)
+    ap.add_argument("--ops", type=int, default=300, help="operações por thread")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    pasta = tempfile.mkdtemp(prefix="stress-")
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # troca de thread a todo instante: expõe janelas de corrida
+    try:
+        repo = Repository(os.path.join(pasta, "stress.db"))
+        com = Community(repo)
+        semear(com, random.Random(args.seed))
+        lat = {op: [] for op, _ in MIX}
+        erros = []
+        barreira = threading.Barrier(args.threads)
+        threads = [threading.Thread(target=sessao, args=(com, args.seed * 1000 + i, args.ops, barreira, lat, erros))
+                   for i in range(args.threads)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        gasto = time.perf_counter() - t0
+        sys.setswitchinterval(intervalo)
+        repo.behind.flush()
+
+        total = args.threads * args.ops
+        print(f"{args.threads} threads × {args.ops} ops: {total:,} operações em {gasto:.2f} s "
+              f"({total / gasto:,.0f} ops/s)")
+        print(f"{'operação':<8} | {'n':>6} | {'p50':>9} | {'p99':>9}")
+        for op, amostras in lat.items():
+            if amostras:
+                amostras.sort()
+                p99 = amostras[min(len(amostras) - 1, int(len(amostras) * 0.99))]
+                print(f"{op:<8} | {len(amostras):>6} | {statistics.median(amostras) * 1e3:7.3f}ms | {p99 * 1e3:7.3f}ms")
+        print(f"feed: {len(com.feed):,} itens, {sum(it['likes'] for it in com.feed._items.values()):,} curtidas, "
+              f"{len(com.groups)} grupos")
+
+        falhas = erros + verificar(com, repo.path) + comparar_recarga(com, repo)
+        repo.close()
+    finally:
+        sys.setswitchinterval(intervalo)
+        shutil.rmtree(pasta, ignore_errors=True)
+    for f in falhas[:20]:
+        print("FALHA:", f)
+    print(f"{len(falhas)} falha(s)" if falhas else "invariantes ok")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+# benchmarks/suite.py — caminhos quentes do app.py medidos sem servidor Streamlit, com baseline em JSON
+# Uso: python -m benchmarks.suite [--salvar] [--limite 0.25] [--escala 1.0] [--casos feed,plano] [--baseline PATH]
+# Gera dados sintéticos (benchmarks/sintetico.py: 100k itens no feed, 10k fotos, 1k grupos, 500 planos × 180
+# itens), mede cada caso e compara a mediana por operação com a baseline da máquina. Sai com código 1 se
+# algum caso ficou mais lento que baseline × (1 + limite). --salvar grava as medidas atuais como baseline.
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.sintetico import popular_comunidade, popular_planos
+from services.community import Community
+from services.feed import ORDER_HOT, ORDER_LIKES, ORDER_RECENT
+from services.plan_items import PlanItems
+from services.plano_alimentar import catalogo_padrao, generate_plan
+from services.repository import Repository
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+LIMITE_PADRAO = 0.25   # 25% mais lento que a baseline = regressão
+REPETICOES = 5
+TEMPO_MIN_S = 0.2      # cada repetição roda o caso até somar pelo menos isso (casos rápidos)
+USUARIO_PLANOS = "bench"
+PAGINAS_FEED = 3
+TOP_K = 20
+
+
+def baseline_padrao():
+    # baselines dependem da máquina: uma por host e versão do Python
+    return os.path.join(BASELINE_DIR, f"{platform.node()}-py{sys.version_info[0]}.{sys.version_info[1]}.json")
+
+
+def preparar(escala, pasta, seed=0):
+    repo = Repository(os.path.join(pasta, "bench.db"))
+    dados = popular_comunidade(repo.path, n_itens=int(100_000 * escala), n_fotos=int(10_000 * escala),
+                               n_grupos=max(1, int(1_000 * escala)), n_usuarios=max(1, int(5_000 * escala)),
+                               seed=seed)
+    dados["planos"] = popular_planos(repo.path, USUARIO_PLANOS, n_planos=max(1, int(500 * escala)),
+                                     itens_por_plano=180, seed=seed)
+    dados["repo"] = repo
+    return dados
+
+
+def comunidade(d):
+    # uma Community compartilhada pelos casos de leitura/curtida, como o get_community do app
+    if "community" not in d:
+        d["community"] = Community(d["repo"])
+    return d["community"]
+
+
+# ---------- casos: cada um devolve (função, nº de operações por chamada) ----------
+def caso_comunidade_carregar(d):
+    # hidratação do feed/grupos/ranking na primeira sessão do processo (get_community)
+    return lambda: Community(d["repo"]), 1
+
+
+def caso_feed_curtir(d):
+    # like_feed_item: curtida nova (índices do feed + ranking do grupo + write-behind)
+    com = comunidade(d)
+    rnd = random.Random(1)
+    ids = d["ids"]
+    seq = iter(range(10**9))
+    ops = 1_000
+
+    def rodar():
+        for _ in range(ops):
+            com.like(ids[rnd.randrange(len(ids))], f"bench-like-{next(seq)}")
+    return rodar, ops
+
+
+def caso_feed_filtrar(d):
+    # página Feed: filtros tipo × grupo × ordem, três páginas por combinação
+    com = comunidade(d)
+    grupo = d["grupos"][0]
+    combos = [(t, g, o) for t in (None, "photo", "article") for g in (None, grupo)
+              for o in (ORDER_RECENT, ORDER_LIKES, ORDER_HOT)]
+
+    def rodar():
+        for type_, group, order in combos:
+            cursor = None
+            for _ in range(PAGINAS_FEED):
+                _, cursor = com.feed.page(type_=type_, group=group, order=order, cursor=cursor, limit=20)
+                if cursor is None:
+                    break
+    return rodar, len(combos) * PAGINAS_FEED
+
+
+def caso_feed_buscar(d):
+    # busca do Feed: BM25 com prefixo, com e sem filtro de tipo/grupo (o índice é montado no aquecimento)
+    feed = comunidade(d).feed
+    grupo = d["grupos"][0]
+    consultas = [("treino", None, None), ("artigo corpo", None, None), ("leg", "photo", None),
+                 ("legenda", None, grupo), ("dieta", "article", None)]
+
+    def rodar():
+        for query, type_, group in consultas:
+            feed.search(query, type_=type_, group=group, limit=20)
+    return rodar, len(consultas)
+
+
+def caso_competicoes_ranking(d):
+    # página Competições: top-K geral, da semana e do dia
+    com = comunidade(d)
+
+    def rodar():
+        for window in (None, "semana", "dia"):
+            com.leaderboard.top(TOP_K, window=window)
+    return rodar, 3
+
+
+def caso_plano_gerar(d):
+    # geração completa de um plano de 30 dias × 6 refeições (o que o job executa, sem pausas)
+    catalogo = catalogo_padrao()
+    return lambda: sum(len(s["new_items"]) for s in generate_plan(2100, 30, 6, "Manutenção", catalogo, seed=1)), 1
+
+
+def caso_plano_historico(d):
+    # Histórico de Planos: todas as páginas do usuário e o % concluído de cada plano (sem abrir os itens)
+    repo = d["repo"]
+
+    def rodar():
+        before = before_id = None
+        pcts = []
+        while True:
+            plans = repo.list_plans(USUARIO_PLANOS, limit=20, before=before, before_id=before_id)
+            if not plans:
+                break
+            pcts.extend(int(p["done_count"] / p["item_count"] * 100) if p["item_count"] else p["progress"]
+                        for p in plans)
+            before, before_id = plans[-1]["created_at"], plans[-1]["id"]
+        return pcts
+    return rodar, 1
+
+
+def caso_plano_abrir(d):
+    # abrir um plano do histórico: itens do banco -> PlanItems -> % concluído
+    repo = d["repo"]
+    planos = d["planos"][:20]
+
+    def rodar():
+        for pid in planos:
+            PlanItems(repo.plan_items(pid)).pct_done()
+    return rodar, len(planos)
+
+
+CASOS = {
+    "comunidade.carregar": caso_comunidade_carregar,
+    "feed.curtir": caso_feed_curtir,
+    "feed.filtrar": caso_feed_filtrar,
+    "feed.buscar": caso_feed_buscar,
+    "competicoes.ranking": caso_competicoes_ranking,
+    "plano.gerar": caso_plano_gerar,
+    "plano.historico": caso_plano_historico,
+    "plano.abrir": caso_plano_abrir,
+}
+
+
+def medir(fn, ops, repeticoes=REPETICOES):
+    # -> segundos por operação (mediana e mínimo das repetições)
+    fn()  # aquecimento
+    amostras = []
+    for _ in range(repeticoes):
+        chamadas, t0 = 0, time.perf_counter()
+        while True:
+            fn()
+            chamadas += 1
+            gasto = time.perf_counter() - t0
+            if gasto >= TEMPO_MIN_S:
+                break
+        amostras.append(gasto / (chamadas * ops))
+    return {"mediana_s": statistics.median(amostras), "min_s": min(amostras)}
+
+
+def _fmt(segundos):
+    if segundos >= 1:
+        return f"{segundos:8.3f} s "
+    if segundos >= 1e-3:
+        return f"{segundos * 1e3:8.3f} ms"
+    return f"{segundos * 1e6:8.1f} us"
+
+
+def comparar(atual, baseline, limite):
+    # -> [(caso, atual, base ou None, razão ou None, regrediu)]
+    linhas = []
+    base_casos = (baseline or {}).get("casos", {})
+    for nome, r in atual.items():
+        base = base_casos.get(nome)
+        razao = r["mediana_s"] / base["mediana_s"] if base else None
+        linhas.append((nome, r["mediana_s"], base and base["mediana_s"], razao,
+                       razao is not None and razao > 1 + limite))
+    return linhas
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    ap.add_argument("--escala", type=float, default=1.0, help="fração do tamanho padrão dos dados")
+    ap.add_argument("--casos", default="", help="prefixos separados por vírgula (ex.: feed,plano)")
+    ap.add_argument("--baseline", default=None, help="arquivo JSON (padrão: benchmarks/baselines/<host>-pyX.Y.json)")
+    ap.add_argument("--limite", type=float, default=LIMITE_PADRAO, help="tolerância antes de acusar regressão")
+    ap.add_argument("--salvar", action="store_true", help="grava as medidas atuais como baseline")
+    args = ap.parse_args(argv)
+
+    prefixos = [p for p in args.casos.split(",") if p]
+    nomes = [n for n in CASOS if not prefixos or any(n.startswith(p) for p in prefixos)]
+    caminho = args.baseline or baseline_padrao()
+    baseline = None
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["escala"] != args.escala:
+            print(f"baseline {caminho} foi medida com --escala {baseline['meta']['escala']}; ignorando")
+            baseline = None
+
+    pasta = tempfile.mkdtemp(prefix="bench-")
+    try:
+        t0 = time.perf_counter()
+        dados = preparar(args.escala, pasta)
+        print(f"dados sintéticos: {len(dados['ids']):,} itens no feed, {len(dados['fotos']):,} fotos, "
+              f"{len(dados['grupos']):,} grupos, {len(dados['planos']):,} planos ({time.perf_counter() - t0:.1f} s)")
+        atual = {}
+        for nome in nomes:
+            fn, ops = CASOS[nome](dados)
+            atual[nome] = medir(fn, ops)
+        dados["repo"].close()
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"{'caso':<22} | {'mediana/op':>11} | {'baseline':>11} | {'variação':>8}")
+    regressoes = []
+    for nome, med, base, razao, regrediu in comparar(atual, baseline, args.limite):
+        variacao = f"{(razao - 1) * 100:+7.1f}%" if razao is not None else "      —"
+        print(f"{nome:<22} | {_fmt(med):>11} | {_fmt(base) if base else '—':>11} | {variacao}"
+              f"{'  REGRESSÃO' if regrediu else ''}")
+        if regrediu:
+            regressoes.append(nome)
+
+    if args.salvar:
+        salvo = dict((baseline or {}).get("casos", {}), **atual)
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"escala": args.escala, "host": platform.node(), "python": platform.python_version(),
+                                "data": datetime.now().isoformat(timespec="seconds")},
+                       "casos": salvo}, f, indent=2, sort_keys=True)
+        print(f"baseline gravada em {caminho}")
+    elif baseline is None:
+        print(f"sem baseline em {caminho}; rode com --salvar para criar")
+
+    if regressoes and not args.salvar:
+        print(f"{len(regressoes)} caso(s) acima de +{args.limite:.0%}: {', '.join(regressoes)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
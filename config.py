@@ -10,3 +10,39 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ALGORITHM = "HS256"
     JWT_EXP_DELTA_SECONDS = int(os.environ.get("JWT_EXP_SECONDS", 3600))
+    JWT_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE", 1024))  # claims de tokens já verificados (LRU)
+    # senhas (services/auth.py): custo do pbkdf2_sha256 e pool de processos que calcula os hashes
+    PASSWORD_HASH_ROUNDS = int(os.environ.get("PASSWORD_HASH_ROUNDS", 29000))
+    AUTH_HASH_WORKERS = int(os.environ.get("AUTH_HASH_WORKERS", 2))  # 0 = na thread da requisição
+    AUTH_HASH_MAX_PENDING = int(os.environ.get("AUTH_HASH_MAX_PENDING", 32))
+    # imagens enviadas: blobs endereçados por conteúdo (sha256) + miniaturas
+    BLOB_DIR = os.environ.get("BLOB_DIR", os.path.join(BASE_DIR, "data", "blobs"))
+    # geração de planos em segundo plano (services/jobs.py)
+    PLAN_JOBS_MAX_WORKERS = int(os.environ.get("PLAN_JOBS_MAX_WORKERS", 2))
+    PLAN_JOBS_POLL_SECONDS = float(os.environ.get("PLAN_JOBS_POLL_SECONDS", 0.5))
+    # cliente da API remota de planos (services/api_client.py)
+    API_CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", 2))
+    API_READ_TIMEOUT = float(os.environ.get("API_READ_TIMEOUT", 5))
+    API_RETRIES = int(os.environ.get("API_RETRIES", 2))
+    # histórico de pesagens da página Progresso (services/progresso.py)
+    PROGRESSO_CSV = os.environ.get("PROGRESSO_CSV", os.path.join(BASE_DIR, "data", "progresso.csv"))
+    # alertas de inatividade RN-015 (services/notificacoes.py)
+    INATIVIDADE_DIAS = int(os.environ.get("INATIVIDADE_DIAS", 14))
+    NOTIF_SCAN_SECONDS = float(os.environ.get("NOTIF_SCAN_SECONDS", 60))
+    # log de eventos por sessão (services/eventos.py): últimos N eventos; arquivo rotativo opcional ("" = desligado)
+    EVENT_LOG_CAPACITY = int(os.environ.get("EVENT_LOG_CAPACITY", 500))
+    EVENT_LOG_FILE = os.environ.get("EVENT_LOG_FILE", "")
+    EVENT_LOG_MAX_BYTES = int(os.environ.get("EVENT_LOG_MAX_BYTES", 5 * 1024 * 1024))
+    EVENT_LOG_BACKUPS = int(os.environ.get("EVENT_LOG_BACKUPS", 3))
+    # instrumentação do app (services/metricas.py): desligada por padrão; o snapshot é lido pelo /metrics da API
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+    METRICS_FILE = os.environ.get("METRICS_FILE", os.path.join(BASE_DIR, "data", "metrics.json"))
+    METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 10))
+    # exportação em massa (services/exportacao.py): arquivos .ndjson.gz gerados pela página Dados
+    EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join(BASE_DIR, "data", "exports"))
+    # e-mails (separados por vírgula) cujo token leva o claim admin: exportar/importar dados de todos em /api/dados
+    ADMIN_EMAILS = os.environ.get("ADMIN_EMAILS", "")
+    # atualização ao vivo do Feed e do ranking (services/mudancas.py + st.fragment): intervalo em que o painel
+    # confere as versões do barramento; 0 = só atualiza quando a página inteira roda. Cada tique é um rerun do
+    # fragmento por sessão aberta: por padrão, a cada 30 s
+    LIVE_REFRESH_SECONDS = float(os.environ.get("LIVE_REFRESH_SECONDS", 30))
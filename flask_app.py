@@ -1,29 +1,39 @@
-flask_app.py
-from flask import Flask, jsonify
+# flask_app.py — Power Routine API (Flask)
+from flask import Flask, Response, abort, jsonify
 from config import Config
-from models import db
+from models import db, upgrade_schema
 from routes.auth_routes import auth_bp
+from routes.dados_routes import dados_bp
 from routes.food_routes import food_bp
 from routes.mealplan_routes import mp_bp
+from services.metricas import carregar, prometheus
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     db.init_app(app)
+    with app.app_context():
+        upgrade_schema()  # creates missing tables; migrates databases from before tags/name_key
 
     # register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(food_bp)
     app.register_blueprint(mp_bp)
+    app.register_blueprint(dados_bp)
 
     @app.route("/")
     def index():
         return jsonify({"msg": "Power Routine API - Diet module (dev)"})
 
+    @app.route("/metrics")
+    def metrics():
+        # Prometheus text from the snapshot the Streamlit app writes (services/metricas.py)
+        if not app.config["METRICS_ENABLED"]:
+            abort(404)
+        return Response(prometheus(carregar(app.config["METRICS_FILE"])), content_type="text/plain; version=0.0.4")
+
     return app
 
 if __name__ == "__main__":
     app = create_app()
-    with app.app_context():
-        db.create_all()
     app.run(debug=True, host="0.0.0.0", port=5000)
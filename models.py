@@ -1,6 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import validates
 from datetime import datetime
-from passlib.hash import pbkdf2_sha256 as sha256
+from services.auth import hash_password, verify_password
+from services.texto import sem_acentos, normalizar_tag
 
 db = SQLAlchemy()
 
@@ -12,20 +15,151 @@ class User(db.Model):
     password_hash = db.Column(db.String(200), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # synchronous helpers; request handlers go through the process pool in routes.auth_routes
     @staticmethod
-    def generate_hash(password):
-        return sha256.hash(password)
+    def generate_hash(password, rounds=None):
+        return hash_password(password, rounds)
 
     @staticmethod
     def verify_hash(password, hash_):
-        return sha256.verify(password, hash_)
+        return verify_password(password, hash_)[0]
+
+# food <-> tag; the PK covers lookups by food, the extra index covers "foods with tag X"
+food_tags = db.Table(
+    "food_tags",
+    db.Column("food_id", db.Integer, db.ForeignKey("foods.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("tag_id", db.Integer, db.ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    db.Index("ix_food_tags_tag_food", "tag_id", "food_id"),
+)
+
+class Tag(db.Model):
+    __tablename__ = "tags"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(60), unique=True, nullable=False)  # normalized: "low-carb", "vegano"
+
+    @staticmethod
+    def get_or_create(name):
+        name = normalizar_tag(name)
+        tag = Tag.query.filter_by(name=name).first()
+        if tag is None:
+            tag = Tag(name=name)
+            db.session.add(tag)
+        return tag
 
 class Food(db.Model):
     __tablename__ = "foods"
+    __table_args__ = (
+        # keyset pagination walks (name_key, id); prefix search is a range scan on name_key
+        db.Index("ix_foods_name_key_id", "name_key", "id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(150), nullable=False)
-    calories = db.Column(db.Float, nullable=False)
-    protein = db.Column(db.Float, default=0.0)
+    name = db.Column(db.String(150), nullable=False, index=True)
+    name_key = db.Column(db.String(150), nullable=False, default="")  # lowercase, no accents
+    calories = db.Column(db.Float, nullable=False, index=True)
+    protein = db.Column(db.Float, default=0.0, index=True)
     carbs = db.Column(db.Float, default=0.0)
     fats = db.Column(db.Float, default=0.0)
-    tags = db.Column(db.String(250), default="")
+    tags = db.relationship("Tag", secondary=food_tags, lazy="selectin", backref="foods")
+
+    @validates("name")
+    def _sync_name_key(self, key, value):
+        self.name_key = sem_acentos(value)
+        return value
+
+    def set_tags(self, tags):
+        # accepts a list or the old free-form "vegano, low-carb" string
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        names = {normalizar_tag(t) for t in tags if t and t.strip()}
+        self.tags = [Tag.get_or_create(n) for n in sorted(names)]
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "calories": self.calories,
+            "protein": self.protein,
+            "carbs": self.carbs,
+            "fats": self.fats,
+            "tags": [t.name for t in self.tags],
+        }
+
+class MealPlan(db.Model):
+    __tablename__ = "meal_plans"
+    __table_args__ = (db.Index("ix_meal_plans_user_created", "user_id", "created_at"),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String(120), nullable=False)
+    target_calories = db.Column(db.Integer, nullable=False)
+    days = db.Column(db.Integer, nullable=False)
+    meals_per_day = db.Column(db.Integer, nullable=False)
+    objetivo = db.Column(db.String(30), nullable=False, default="Manutenção")
+    status = db.Column(db.String(30), nullable=False, default="generating")  # generating | generated | failed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "target_calories": self.target_calories,
+            "days": self.days,
+            "meals_per_day": self.meals_per_day,
+            "objetivo": self.objetivo,
+            "status": self.status,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+class MealPlanItem(db.Model):
+    __tablename__ = "meal_plan_items"
+    id = db.Column(db.Integer, primary_key=True)
+    plan_id = db.Column(db.Integer, db.ForeignKey("meal_plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    day = db.Column(db.Integer, nullable=False)
+    meal_name = db.Column(db.String(60), nullable=False)
+    food_name = db.Column(db.String(150), nullable=False)
+    portion_g = db.Column(db.Float, nullable=False)
+    kcal = db.Column(db.Float, nullable=False)
+    protein_g = db.Column(db.Float, default=0.0)
+    carbs_g = db.Column(db.Float, default=0.0)
+    fats_g = db.Column(db.Float, default=0.0)
+    done = db.Column(db.Boolean, default=False)
+
+    FIELDS = ("day", "meal_name", "food_name", "portion_g", "kcal", "protein_g", "carbs_g", "fats_g", "done")
+
+    def to_dict(self):
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+def upgrade_schema(batch=500):
+    # startup migration for databases created before normalized tags: create_all() adds new tables but
+    # never alters existing ones. Adds foods.name_key and the foods indexes, backfills name_key from name
+    # and turns the old free-form foods.tags string into Tag rows (then blanks it, so this runs once per food)
+    db.create_all()
+    columns = {c["name"] for c in inspect(db.engine).get_columns("foods")}
+    if "name_key" not in columns:
+        db.session.execute(text("ALTER TABLE foods ADD COLUMN name_key VARCHAR(150) NOT NULL DEFAULT ''"))
+        db.session.commit()
+    for index in Food.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
+    while True:
+        rows = db.session.execute(text(
+            "SELECT id, name FROM foods WHERE (name_key IS NULL OR name_key = '') AND name <> '' LIMIT :n"),
+            {"n": batch}).all()
+        if not rows:
+            break
+        db.session.execute(text("UPDATE foods SET name_key = :key WHERE id = :id"),
+                           [{"key": sem_acentos(name), "id": food_id} for food_id, name in rows])
+        db.session.commit()
+
+    if "tags" in columns:  # legacy column: "vegano, low-carb"
+        while True:
+            rows = db.session.execute(text(
+                "SELECT id, tags FROM foods WHERE tags IS NOT NULL AND tags <> '' LIMIT :n"), {"n": batch}).all()
+            if not rows:
+                break
+            for food_id, tags in rows:
+                food = db.session.get(Food, food_id)
+                names = {t.name for t in food.tags}
+                names.update(normalizar_tag(t) for t in tags.split(",") if t.strip())
+                food.set_tags(sorted(names))
+                db.session.flush()  # new Tag rows visible to the next food's get_or_create
+            db.session.execute(text("UPDATE foods SET tags = '' WHERE id = :id"), [{"id": food_id} for food_id, _ in rows])
+            db.session.commit()
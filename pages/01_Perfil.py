@@ -1,24 +1,37 @@
-
 import streamlit as st
+from services.treino import NIVEIS, segunda_feira
 
 st.markdown("## 👤 Perfil do Usuário")
 st.write("Preencha seus dados para personalizar recomendações de treino e dieta.")
 
+# o perfil vive nesta sessão; a página Treinos monta (e guarda em cache) o programa de treino a partir dele
+perfil = st.session_state.get("perfil_salvo", {})
+OBJETIVOS = ["Cutting", "Bulking", "Manutenção"]
+CONDICOES = ["Nenhum", "Diabetes", "Hipertensão", "Problemas cardíacos", "Outros"]
+
 with st.form("perfil"):
     col1, col2, col3 = st.columns(3)
     with col1:
-        idade = st.number_input("Idade (anos)", min_value=12, max_value=100, value=28)
-        altura = st.number_input("Altura (cm)", min_value=50, max_value=250, value=170)
+        idade = st.number_input("Idade (anos)", min_value=12, max_value=100, value=perfil.get("idade", 28))
+        altura = st.number_input("Altura (cm)", min_value=50, max_value=250, value=perfil.get("altura", 170))
     with col2:
-        peso = st.number_input("Peso (kg)", min_value=20.0, max_value=300.0, value=70.0)
-        nivel = st.selectbox("Nível de atividade", ["Iniciante", "Intermediário", "Avançado"])
+        peso = st.number_input("Peso (kg)", min_value=20.0, max_value=300.0, value=perfil.get("peso", 70.0))
+        nivel = st.selectbox("Nível de atividade", NIVEIS, index=NIVEIS.index(perfil.get("nivel", NIVEIS[0])))
     with col3:
-        objetivo = st.selectbox("Objetivo", ["Cutting", "Bulking", "Manutenção"])
-        problemas = st.multiselect("Condições de saúde", ["Nenhum", "Diabetes", "Hipertensão", "Problemas cardíacos", "Outros"])
+        objetivo = st.selectbox("Objetivo", OBJETIVOS, index=OBJETIVOS.index(perfil.get("objetivo", OBJETIVOS[0])))
+        problemas = st.multiselect("Condições de saúde", CONDICOES, default=perfil.get("condicoes", []))
 
     submitted = st.form_submit_button("Salvar perfil")
     if submitted:
-        st.success("Perfil salvo (exemplo). Recomendações personalizadas ativadas (RN-006).")
-        if "Nenhum" not in problemas and len(problemas) > 0:
+        condicoes = [p for p in problemas if p != "Nenhum"]
+        # o programa mantém a data de início, a menos que mudem os dados de que ele depende
+        mesmo_programa = perfil.get("nivel") == nivel and perfil.get("condicoes") == condicoes
+        st.session_state["perfil_salvo"] = {
+            "idade": idade, "altura": altura, "peso": peso, "nivel": nivel, "objetivo": objetivo,
+            "condicoes": condicoes,
+            "programa_inicio": perfil["programa_inicio"] if mesmo_programa else segunda_feira(),
+        }
+        st.success("Perfil salvo. Recomendações personalizadas ativadas (RN-006).")
+        if condicoes:
             st.warning("Com base nos dados de saúde, treinos intensos serão limitados (RN-007).")
 st.info("Dica: Você pode alterar o objetivo a qualquer momento. Peso/altura devem ser atualizados com parcimônia (regra de negócio).")
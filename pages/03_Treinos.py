@@ -1,26 +1,64 @@
-
 import streamlit as st
-from services.treino import sugestoes_por_nivel, variar_grupo_muscular, hidratacao_extra
+from datetime import date
+from resources import current_user
+from services.treino import (GRUPOS, MAX_SEMANAS, NIVEIS, SEMANAS_PADRAO, gerar_programa, hidratacao_extra,
+                             limites_rn007, sugestoes_por_nivel, variar_grupo_muscular)
 
 st.markdown("## 🏋️ Treinos do Dia")
-st.write("Sugestões de treino por nível, variação para evitar sobrecarga (RN-019) e orientação de hidratação (RN-008).")
+st.write("Programa periodizado por nível, rodízio de grupos musculares sem repetir em dias seguidos (RN-019), "
+         "limites por condição de saúde (RN-007) e orientação de hidratação (RN-008).")
+
+@st.cache_data(max_entries=256)
+def programa(nivel, condicoes, semanas, inicio, user):
+    # um programa por perfil; os reruns só consultam a linha de hoje nos arrays
+    return gerar_programa(nivel, condicoes, semanas=semanas, inicio=inicio, user=user)
+
+perfil = st.session_state.get("perfil_salvo")
+if perfil is None:
+    st.info("Salve seu perfil na página Perfil para receber um programa de várias semanas. Enquanto isso, monte o treino de hoje:")
+    nivel = st.selectbox("Nível", NIVEIS)
+    grupo_ontem = st.selectbox("Grupo muscular de ontem", GRUPOS)
+    grupo_hoje = st.selectbox("Grupo desejado hoje", GRUPOS)
+
+    sug = sugestoes_por_nivel(nivel)
+    grupo_final = variar_grupo_muscular(grupo_ontem, grupo_hoje)
+    agua = hidratacao_extra(sug["duracao_min"])
+
+    st.write(f"**Intensidade:** {sug['intensidade']} • **Duração:** {sug['duracao_min']} min • **Grupo recomendado:** {grupo_final}")
+    st.write("**Exercícios sugeridos:**")
+    st.write("- " + "\n- ".join(sug["exercicios"]))
+
+    if agua > 0:
+        st.info(f"Sugestão de hidratação extra: {agua} ml (para treinos > 60 min).")
 
-nivel = st.selectbox("Nível", ["Iniciante", "Intermediário", "Avançado"])
-grupo_ontem = st.selectbox("Grupo muscular de ontem", ["Pernas", "Peito", "Costas", "Ombros", "Mobilidade/Alongamento"])
-grupo_hoje = st.selectbox("Grupo desejado hoje", ["Pernas", "Peito", "Costas", "Ombros", "Mobilidade/Alongamento"])
+    if grupo_final != grupo_hoje:
+        st.warning("Variação automática aplicada para evitar trabalhar o mesmo grupo em dias consecutivos (RN-019).")
+    st.stop()
 
-sug = sugestoes_por_nivel(nivel)
-grupo_final = variar_grupo_muscular(grupo_ontem, grupo_hoje)
-agua = hidratacao_extra(sug["duracao_min"])
+semanas = st.select_slider("Duração do programa (semanas)", options=list(range(4, MAX_SEMANAS + 1, 4)),
+                           value=SEMANAS_PADRAO)
+prog = programa(perfil["nivel"], tuple(perfil["condicoes"]), semanas, perfil["programa_inicio"], current_user())
+hoje = prog.dia(date.today())
 
-st.write(f"**Intensidade:** {sug['intensidade']} • **Duração:** {sug['duracao_min']} min • **Grupo recomendado:** {grupo_final}")
-st.write("**Exercícios sugeridos:**")
-st.write("- " + "\n- ".join(sug["exercicios"]))
+if hoje is None:
+    st.success(f"Programa de {semanas} semanas concluído. Salve o perfil de novo para começar um novo ciclo.")
+    st.stop()
 
-if agua > 0:
-    st.info(f"Sugestão de hidratação extra: {agua} ml (para treinos > 60 min).")
+st.markdown(f"### Hoje — semana {hoje['semana']} de {semanas}" + (" (descarga)" if hoje["descarga"] else ""))
+if hoje["grupo"] == "Descanso":
+    st.write("**Dia de descanso.** A recuperação faz parte do programa.")
+else:
+    st.write(f"**Grupo:** {hoje['grupo']} • **Intensidade:** {hoje['intensidade']} • **Duração:** {hoje['duracao_min']} min")
+    st.write("- " + "\n- ".join(hoje["exercicios"]))
+    if hoje["hidratacao_ml"] > 0:
+        st.info(f"Sugestão de hidratação extra: {hoje['hidratacao_ml']} ml (para treinos > 60 min).")
+if perfil["condicoes"]:
+    intensidade, duracao, freq = limites_rn007(perfil["condicoes"])
+    st.warning(f"RN-007 ({', '.join(perfil['condicoes'])}): até {freq} treinos/semana de no máximo {duracao} min.")
 
-if grupo_final != grupo_hoje:
-    st.warning("Variação automática aplicada para evitar trabalhar o mesmo grupo em dias consecutivos (RN-019).")
+st.markdown("#### Esta semana")
+st.dataframe([{"Dia": f"{t['data']:%a %d/%m}", "Grupo": t["grupo"], "Duração (min)": t["duracao_min"],
+               "Séries": t["series"], "Intensidade": t["intensidade"]} for t in prog.semana(date.today())],
+             hide_index=True)
 
 st.caption("Atenção: ajuste cargas e volume conforme evolução e histórico de lesões.")
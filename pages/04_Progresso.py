@@ -1,30 +1,65 @@
-
 import streamlit as st
-import pandas as pd
+from datetime import date
+from config import Config
+from resources import record_activity
+from services.progresso import HistoricoPeso, resumo, JANELA_TENDENCIA_DIAS
+
+PONTOS_GRAFICO = 400  # ~ largura do gráfico em px: séries maiores são reduzidas por LTTB
+
+@st.cache_resource
+def get_historico(path):
+    # one incremental reader per CSV and process; each rerun only stat()s the file
+    return HistoricoPeso(path)
+
+@st.cache_data(max_entries=32)
+def analise(path, versao, meta_inicial, meta_alvo, pontos, _dias, _pesos):
+    # recomputed only when the file changed (versao) or the goal/width changed; _dias/_pesos are the
+    # arrays of that versao (snapshot), so a refresh from another session can't mix in newer rows
+    return resumo(_dias, _pesos, meta_inicial, meta_alvo, pontos)
 
 st.markdown("## 📈 Evolução & Metas")
 st.write("Acompanhe a evolução de peso e treinos concluídos. Ao atingir 100% da meta, sugerimos definir uma nova (RN-010).")
 
-# Mock de dados
-df = pd.DataFrame({
-    "dia": pd.date_range("2025-08-01", periods=30, freq="D"),
-    "peso": [75 - i*0.1 for i in range(30)],
-    "treinos": [1 if i%2==0 else 0 for i in range(30)]
-})
+historico = get_historico(Config.PROGRESSO_CSV)
+
+with st.form("pesagem", clear_on_submit=True):
+    c1, c2, c3 = st.columns([2, 2, 1])
+    dia = c1.date_input("Dia", value=date.today())
+    peso = c2.number_input("Peso (kg)", min_value=20.0, max_value=300.0, value=70.0, step=0.1)
+    c3.write(" ")
+    if c3.form_submit_button("Registrar"):
+        historico.registrar(dia, peso)
+        record_activity("progresso")
+
+historico.refresh()
+versao, dias, pesos = historico.snapshot()
+if not len(pesos):
+    st.info("Nenhuma pesagem registrada ainda.")
+    st.stop()
+
+m1, m2 = st.columns(2)
+meta_inicial = m1.number_input("Peso inicial da meta (kg)", 20.0, 300.0, float(pesos[0]), step=0.5)
+meta_alvo = m2.number_input("Meta de peso (kg)", 20.0, 300.0, 70.0, step=0.5)
+
+r = analise(Config.PROGRESSO_CSV, versao, meta_inicial, meta_alvo, PONTOS_GRAFICO, dias, pesos)
 
 c1, c2 = st.columns(2)
 with c1:
-    st.line_chart(df.set_index("dia")["peso"], height=260)
+    st.line_chart(r["grafico"], height=260)
 with c2:
-    st.bar_chart(df.set_index("dia")["treinos"], height=260)
+    st.bar_chart(r["variacao_semanal"], height=260)
+st.caption(f"{r['pesagens']} pesagens desde {r['primeiro_dia']:%d/%m/%Y}"
+           + (f" — gráfico reduzido a {len(r['grafico'])} pontos" if len(r["grafico"]) < r["pesagens"] else ""))
 
-meta_inicial = 75
-meta_alvo = 70
-meta_atual = df["peso"].iloc[-1]
-pct_meta = (meta_inicial - meta_atual) / max((meta_inicial - meta_alvo), 0.0001)
-st.metric("Meta de peso", f"{meta_atual:.1f} kg", f"{pct_meta*100:.1f}% de progresso")
+k1, k2, k3 = st.columns(3)
+k1.metric("Meta de peso", f"{r['atual']:.1f} kg", f"{r['pct_meta']*100:.1f}% de progresso")
+if r["kg_por_semana"] is not None:
+    k2.metric(f"Tendência ({JANELA_TENDENCIA_DIAS} dias)", f"{r['kg_por_semana']:+.2f} kg/semana")
+else:
+    k2.metric(f"Tendência ({JANELA_TENDENCIA_DIAS} dias)", "—")
+k3.metric("Previsão para a meta", f"{r['eta']:%d/%m/%Y}" if r["eta"] else "sem previsão")
 
-if pct_meta >= 1.0:
+if r["pct_meta"] >= 1.0:
     st.success("Meta atingida! Sugestão: iniciar fase de **manutenção** ou **definição** (RN-010).")
 else:
     st.info("Dica: mantenha constância e registre treinos/refeições para acelerar o progresso.")
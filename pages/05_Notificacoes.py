@@ -1,17 +1,36 @@
-
 import streamlit as st
+import time
+from datetime import datetime
+from config import Config
+from resources import current_user, get_notificacoes
+from services.notificacoes import DIA_SECONDS
 
 st.markdown("## 🔔 Notificações & Insights")
 st.write("Alertas automáticos ajudam a manter constância e segurança.")
 
-ultimo_registro = "2025-09-10"
-st.write(f"Última atividade registrada: **{ultimo_registro}** (exemplo)")
+# alerts are materialized by the periodic scan (services/notificacoes.py); this page only reads them
+motor = get_notificacoes()
+user = current_user()
+ultima = motor.ultima_atividade(user) if user else None
 
-dias_sem = 17  # simulação
-if dias_sem >= 14:
-    st.error("Inatividade detectada (≥ 14 dias) — (RN-015). Que tal um treino leve hoje?")
+if ultima is None:
+    st.write("Nenhuma atividade registrada ainda (itens de plano, fotos ou pesagens).")
 else:
-    st.success("Atividade dentro do esperado. Continue assim!")
+    st.write(f"Última atividade registrada: **{datetime.fromtimestamp(ultima):%Y-%m-%d}**")
+
+pendentes = motor.pendentes(user) if user else []
+if pendentes:
+    for n in pendentes:
+        st.error(f"{n['message']} — ({n['rule']})")
+    if st.button("Marcar como lidas"):
+        motor.marcar_lidas(user)
+        st.rerun()
+elif ultima is not None:
+    dias_sem = int((time.time() - ultima) // DIA_SECONDS)
+    if dias_sem >= Config.INATIVIDADE_DIAS:
+        st.warning(f"{dias_sem} dias sem registros (RN-015). Que tal um treino leve hoje?")
+    else:
+        st.success(f"Atividade dentro do esperado ({dias_sem} dia(s) desde o último registro). Continue assim!")
 
 st.markdown("### Outros insights úteis (demo)")
 st.markdown("""
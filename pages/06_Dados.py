@@ -0,0 +1,72 @@
+import streamlit as st
+import os
+import time
+from datetime import datetime
+from config import Config
+from resources import current_user, get_repository
+from services.exportacao import (SECOES_USUARIO, TIPOS_USUARIO, exportar_csv, exportar_ndjson, gravar, importar_csv,
+                                 importar_ndjson)
+
+st.markdown("## 💾 Dados — exportar & importar")
+st.write("Backup ou migração dos seus planos e dos itens de cada plano. "
+         "Importar o mesmo arquivo de novo não duplica nada.")
+
+repo = get_repository()
+user = current_user()
+if not user:
+    st.info("Abra o app principal e escolha um nome de usuário para exportar ou importar seus planos.")
+    st.stop()
+
+# same scope as /api/dados without the admin claim: this user's plans in, this user's plans out (community
+# data and weigh-ins belong to everyone, so they only move through the API with an admin token)
+st.caption(f"Planos de **{user}**")
+
+# the export is streamed from SQLite to a file in Config.EXPORT_DIR (memory stays flat); only the
+# download button below holds the finished .gz in memory
+st.markdown("### Exportar")
+c1, c2 = st.columns(2)
+formato = c1.radio("Formato", ["NDJSON (planos e itens num arquivo)", "CSV (um tipo por arquivo)"])
+tipo = None if formato.startswith("NDJSON") else c2.selectbox("Tipo", list(TIPOS_USUARIO))
+
+if st.button("Gerar arquivo"):
+    os.makedirs(Config.EXPORT_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    t0 = time.perf_counter()
+    if tipo is None:
+        nome = f"export-{stamp}.ndjson.gz"
+        blocos = exportar_ndjson(repo, secoes=SECOES_USUARIO, usuario=user)
+    else:
+        nome = f"{tipo}-{stamp}.csv.gz"
+        blocos = exportar_csv(repo, tipo, usuario=user)
+    with st.spinner("Exportando..."):
+        tamanho = gravar(blocos, os.path.join(Config.EXPORT_DIR, nome))
+    st.session_state["export_file"] = nome
+    st.success(f"{nome}: {tamanho / 1024:,.0f} KB em {time.perf_counter() - t0:.1f} s")
+
+nome = st.session_state.get("export_file")
+if nome and os.path.exists(os.path.join(Config.EXPORT_DIR, nome)):
+    with open(os.path.join(Config.EXPORT_DIR, nome), "rb") as f:
+        st.download_button(f"Download {nome}", data=f, file_name=nome, mime="application/gzip")
+
+st.markdown("### Importar")
+st.caption("Só entram planos (e seus itens) deste usuário; o resto do arquivo é lido e ignorado.")
+arquivo = st.file_uploader("Arquivo .ndjson(.gz) ou .csv(.gz)", type=["gz", "ndjson", "csv"])
+tipo_csv = None
+if arquivo is not None and ".csv" in arquivo.name:
+    tipo_csv = st.selectbox("Tipo dos registros do CSV", list(TIPOS_USUARIO))
+if arquivo is not None and st.button("Importar"):
+    t0 = time.perf_counter()
+    try:
+        with st.spinner("Importando..."):
+            if tipo_csv is None:
+                stats = importar_ndjson(repo, arquivo, usuario=user)
+            else:
+                stats = importar_csv(repo, tipo_csv, arquivo, usuario=user)
+    except ValueError as e:
+        st.error(f"Arquivo inválido: {e}")
+    else:
+        # this session's plan list reloads with the imported plans
+        st.session_state.pop("plans_user", None)
+        st.success(f"Importado em {time.perf_counter() - t0:.1f} s.")
+        st.dataframe([{"tipo": t, "lidos": s["lidos"], "novos": s["inseridos"]} for t, s in stats.items()],
+                     hide_index=True)
@@ -0,0 +1,51 @@
+# resources.py — shared per-process resources for app.py and the pages/ scripts
+# (app.py runs Streamlit code at import, so pages can't import its cached getters)
+import streamlit as st
+from config import Config
+from services.community import Community
+from services.eventos import arquivo_rotativo
+from services.exportacao import CONTADOR_IMPORTACOES
+from services.metricas import Metricas
+from services.notificacoes import MotorNotificacoes
+from services.repository import Repository
+
+@st.cache_resource
+def get_repository():
+    # SQLite (WAL) at Config.SQLALCHEMY_DATABASE_URI, shared by every session of this process
+    return Repository.shared(Config.SQLALCHEMY_DATABASE_URI)
+
+@st.cache_resource(max_entries=1)
+def _community(imports):
+    return Community(get_repository())
+
+def get_community():
+    # feed, groups and ranking shared by every session; rebuilt from the tables after a bulk import (Dados page
+    # or the /api/dados route of another process), which bumps the import counter
+    return _community(get_repository().counter(CONTADOR_IMPORTACOES))
+
+@st.cache_resource
+def get_notificacoes():
+    # last-activity index + RN-015 scan thread, one per process
+    motor = MotorNotificacoes(get_repository(), limite_dias=Config.INATIVIDADE_DIAS)
+    motor.iniciar(Config.NOTIF_SCAN_SECONDS)
+    return motor
+
+@st.cache_resource
+def get_event_sink():
+    # optional rotating file for the session event logs; one writer thread per process
+    if not Config.EVENT_LOG_FILE:
+        return None
+    logger, _listener = arquivo_rotativo(Config.EVENT_LOG_FILE, Config.EVENT_LOG_MAX_BYTES, Config.EVENT_LOG_BACKUPS)
+    return logger
+
+@st.cache_resource
+def get_metricas():
+    # page timings, rerun causes and session_state sizes for this process (no-op unless METRICS_ENABLED)
+    return Metricas(Config.METRICS_ENABLED, Config.METRICS_FILE, Config.METRICS_FLUSH_SECONDS)
+
+def current_user():
+    # display name chosen in app.py; None when a page is opened before the main app ran
+    return st.session_state.get("display_name")
+
+def record_activity(origem, user=None):
+    get_notificacoes().registrar_atividade(user or current_user(), origem=origem)
@@ -0,0 +1,106 @@
+from functools import wraps
+
+import jwt
+from flask import Blueprint, current_app, g, jsonify, request
+
+from models import db, User
+from services.auth import HasherBusy, PasswordHasher, TokenService
+
+auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
+
+EXTENSION = "power_routine_auth"
+
+
+@auth_bp.record_once
+def init_auth(state):
+    # one hashing pool and one token cache per app, created when the blueprint is registered
+    cfg = state.app.config
+    state.app.extensions[EXTENSION] = {
+        "hasher": PasswordHasher(workers=cfg["AUTH_HASH_WORKERS"], rounds=cfg["PASSWORD_HASH_ROUNDS"],
+                                 max_pending=cfg["AUTH_HASH_MAX_PENDING"]),
+        "tokens": TokenService(cfg["SECRET_KEY"], cfg["JWT_ALGORITHM"], cfg["JWT_EXP_DELTA_SECONDS"],
+                               cfg["JWT_CACHE_SIZE"]),
+    }
+
+
+def hasher():
+    return current_app.extensions[EXTENSION]["hasher"]
+
+
+def tokens():
+    return current_app.extensions[EXTENSION]["tokens"]
+
+
+def busy():
+    return jsonify({"error": "servidor ocupado, tente novamente"}), 503, {"Retry-After": "1"}
+
+
+def token_required(view):
+    # Authorization: Bearer <jwt>; the claims end up in g.token_claims
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get("Authorization", "")
+        if not header.startswith("Bearer "):
+            return jsonify({"error": "token ausente"}), 401
+        try:
+            g.token_claims = tokens().verify(header[len("Bearer "):])
+        except jwt.InvalidTokenError:
+            return jsonify({"error": "token inválido ou expirado"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@auth_bp.route("/register", methods=["POST"])
+def register():
+    data = request.get_json(silent=True) or {}
+    name = (data.get("name") or "").strip()
+    email = (data.get("email") or "").strip().lower()
+    password = data.get("password") or ""
+    if not name or not email or len(password) < 6:
+        return jsonify({"error": "nome, email e senha (mín. 6 caracteres) são obrigatórios"}), 400
+    if User.query.filter_by(email=email).first():
+        return jsonify({"error": "email já cadastrado"}), 409
+    # the name is the account's user key in the Streamlit app (/api/dados scopes plans by it): one account each
+    if User.query.filter_by(name=name).first():
+        return jsonify({"error": "nome já cadastrado"}), 409
+    try:
+        password_hash = hasher().hash(password)
+    except HasherBusy:
+        return busy()
+    user = User(name=name, email=email, password_hash=password_hash)
+    db.session.add(user)
+    db.session.commit()
+    return jsonify({"id": user.id, "name": user.name, "email": user.email}), 201
+
+
+@auth_bp.route("/login", methods=["POST"])
+def login():
+    data = request.get_json(silent=True) or {}
+    email = (data.get("email") or "").strip().lower()
+    user = User.query.filter_by(email=email).first()
+    try:
+        if user is None:
+            # same pbkdf2 cost as a wrong password: the response time doesn't tell which emails have accounts
+            hasher().verify_unknown(data.get("password") or "")
+            return jsonify({"error": "credenciais inválidas"}), 401
+        ok, new_hash = hasher().verify(data.get("password") or "", user.password_hash)
+    except HasherBusy:
+        return busy()
+    if not ok:
+        return jsonify({"error": "credenciais inválidas"}), 401
+    if new_hash:  # PASSWORD_HASH_ROUNDS changed since this hash was stored
+        user.password_hash = new_hash
+        db.session.commit()
+    admins = {e.strip().lower() for e in current_app.config["ADMIN_EMAILS"].split(",") if e.strip()}
+    token = tokens().issue(user.id, name=user.name, **({"admin": True} if user.email in admins else {}))
+    return jsonify({"access_token": token, "token_type": "Bearer",
+                    "expires_in": current_app.config["JWT_EXP_DELTA_SECONDS"]})
+
+
+@auth_bp.route("/me", methods=["GET"])
+@token_required
+def me():
+    user = db.session.get(User, int(g.token_claims["sub"]))
+    if user is None:
+        return jsonify({"error": "usuário não encontrado"}), 404
+    return jsonify({"id": user.id, "name": user.name, "email": user.email})
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, g, jsonify, request, stream_with_context
+
+from routes.auth_routes import token_required
+from services.exportacao import (SECOES, SECOES_USUARIO, TABELAS, TIPOS_USUARIO, exportar_csv, exportar_ndjson,
+                                 importar_csv, importar_ndjson)
+from services.progresso import HistoricoPeso
+from services.repository import Repository
+
+dados_bp = Blueprint("dados", __name__, url_prefix="/api/dados")
+
+TIPOS = tuple(TABELAS) + ("pesagem",)
+
+
+def repo():
+    # the repository instance of this process (the same one resources.get_repository returns)
+    return Repository.shared(current_app.config["SQLALCHEMY_DATABASE_URI"])
+
+
+def caller():
+    # -> (app user key, admin) of the verified token. Without the admin claim only that user's plans go in
+    # and out. Plans are keyed by the user name typed in the Streamlit app (plans.user_id), not by users.id:
+    # the account's name is that key (unique per account, see auth_routes.register)
+    return g.token_claims["name"], g.token_claims.get("admin") is True
+
+
+def bad_request(msg):
+    return jsonify({"error": msg}), 400
+
+
+def forbidden(msg):
+    return jsonify({"error": msg}), 403
+
+
+def download(blocos, nome):
+    # gzip blocks go out as they are produced: the whole file is never in memory
+    return Response(stream_with_context(blocos), mimetype="application/gzip",
+                    headers={"Content-Disposition": f'attachment; filename="{nome}"', "X-Accel-Buffering": "no"})
+
+
+@dados_bp.route("/export", methods=["GET"])
+@token_required
+def export_ndjson():
+    user, admin = caller()
+    padrao = SECOES if admin else SECOES_USUARIO
+    secoes = request.args.get("secoes", ",".join(padrao)).split(",")
+    if not set(secoes) <= set(SECOES):
+        return bad_request(f"secoes deve ter só {', '.join(SECOES)}")
+    if not admin and not set(secoes) <= set(SECOES_USUARIO):
+        return forbidden(f"sem permissão de administrador, só {', '.join(SECOES_USUARIO)}")
+    # admins may narrow to one user; everyone else only gets their own plans
+    usuario = request.args.get("user_id") if admin else user
+    blocos = exportar_ndjson(repo(), secoes=secoes, progresso_path=current_app.config["PROGRESSO_CSV"],
+                             usuario=usuario)
+    return download(blocos, f"export-{datetime.now():%Y%m%d-%H%M%S}.ndjson.gz")
+
+
+@dados_bp.route("/export/<tipo>.csv", methods=["GET"])
+@token_required
+def export_csv(tipo):
+    user, admin = caller()
+    if tipo not in TIPOS:
+        return bad_request(f"tipo deve ser um de {', '.join(TIPOS)}")
+    if not admin and tipo not in TIPOS_USUARIO:
+        return forbidden(f"sem permissão de administrador, só {', '.join(TIPOS_USUARIO)}")
+    blocos = exportar_csv(repo(), tipo, progresso_path=current_app.config["PROGRESSO_CSV"],
+                          usuario=request.args.get("user_id") if admin else user)
+    return download(blocos, f"{tipo}-{datetime.now():%Y%m%d-%H%M%S}.csv.gz")
+
+
+@dados_bp.route("/import", methods=["POST"])
+@token_required
+def import_data():
+    # body: .ndjson(.gz), or .csv(.gz) with ?tipo=; read from request.stream (no upload buffering).
+    # Without the admin claim only the caller's own plans/items are written; other records are counted as
+    # read and skipped
+    user, admin = caller()
+    tipo = request.args.get("tipo")
+    if tipo is not None and tipo not in TIPOS:
+        return bad_request(f"tipo deve ser um de {', '.join(TIPOS)}")
+    if tipo is not None and not admin and tipo not in TIPOS_USUARIO:
+        return forbidden(f"sem permissão de administrador, só {', '.join(TIPOS_USUARIO)}")
+    gzipado = request.content_encoding == "gzip" or request.mimetype == "application/gzip"
+    historico = HistoricoPeso(current_app.config["PROGRESSO_CSV"]) if admin else None
+    usuario = None if admin else user
+    try:
+        if tipo is None:
+            stats = importar_ndjson(repo(), request.stream, historico=historico, gzipado=gzipado, usuario=usuario)
+        else:
+            stats = importar_csv(repo(), tipo, request.stream, historico=historico, gzipado=gzipado,
+                                 usuario=usuario)
+    except ValueError as e:
+        return bad_request(str(e))
+    return jsonify({"stats": stats})
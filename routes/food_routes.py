@@ -0,0 +1,100 @@
+import base64
+import json
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import and_, or_, select
+
+from models import Food, Tag, food_tags
+from services.texto import sem_acentos, normalizar_tag
+
+food_bp = Blueprint("foods", __name__, url_prefix="/api/foods")
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# query param -> (column, comparison); e.g. ?min_protein=20&max_kcal=300
+RANGE_FILTERS = {
+    "min_kcal": (Food.calories, ">="),
+    "max_kcal": (Food.calories, "<="),
+    "min_protein": (Food.protein, ">="),
+    "max_protein": (Food.protein, "<="),
+    "min_carbs": (Food.carbs, ">="),
+    "max_carbs": (Food.carbs, "<="),
+    "min_fats": (Food.fats, ">="),
+    "max_fats": (Food.fats, "<="),
+}
+
+
+def encode_cursor(food):
+    raw = json.dumps([food.name_key, food.id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    name_key, food_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    return str(name_key), int(food_id)
+
+
+def prefix_successor(prefix):
+    # smallest string above every string starting with prefix (exclusive upper bound of the range scan):
+    # the last code point + 1, skipping surrogates; None when every code point is already the maximum
+    chars = list(prefix)
+    while chars:
+        last = ord(chars.pop()) + 1
+        if last == 0xD800:
+            last = 0xE000
+        if last <= 0x10FFFF:
+            return "".join(chars) + chr(last)
+    return None
+
+
+def bad_request(msg):
+    return jsonify({"error": msg}), 400
+
+
+@food_bp.route("/search", methods=["GET"])
+def search_foods():
+    args = request.args
+    try:
+        limit = min(max(int(args.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return bad_request("limit inválido")
+
+    query = Food.query
+
+    # name prefix, accent/case-insensitive: range scan on the name_key index
+    prefix = sem_acentos(args.get("q", "").strip())
+    if prefix:
+        query = query.filter(Food.name_key >= prefix)
+        upper = prefix_successor(prefix)
+        if upper is not None:
+            query = query.filter(Food.name_key < upper)
+
+    for param, (column, op) in RANGE_FILTERS.items():
+        if param in args:
+            try:
+                value = float(args[param])
+            except ValueError:
+                return bad_request(f"{param} inválido")
+            query = query.filter(column >= value if op == ">=" else column <= value)
+
+    # every requested tag must match; resolve names to ids once, then one indexed IN per tag
+    tag_names = {normalizar_tag(t) for t in args.get("tags", "").split(",") if t.strip()}
+    if tag_names:
+        tag_ids = [t.id for t in Tag.query.filter(Tag.name.in_(tag_names)).all()]
+        if len(tag_ids) < len(tag_names):
+            return jsonify({"items": [], "next_cursor": None})
+        for tag_id in tag_ids:
+            query = query.filter(Food.id.in_(select(food_tags.c.food_id).where(food_tags.c.tag_id == tag_id)))
+
+    cursor = args.get("cursor")
+    if cursor:
+        try:
+            name_key, food_id = decode_cursor(cursor)
+        except (ValueError, TypeError):
+            return bad_request("cursor inválido")
+        query = query.filter(or_(Food.name_key > name_key, and_(Food.name_key == name_key, Food.id > food_id)))
+
+    rows = query.order_by(Food.name_key, Food.id).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return jsonify({"items": [f.to_dict() for f in rows[:limit]], "next_cursor": next_cursor})
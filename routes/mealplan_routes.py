@@ -0,0 +1,131 @@
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from models import db, Food, MealPlan, MealPlanItem
+from services.plano_alimentar import Catalogo, catalogo_padrao, generate_plan
+
+mp_bp = Blueprint("mealplans", __name__, url_prefix="/api/mealplans")
+
+OBJETIVOS = ("Manutenção", "Cutting", "Bulking")
+MAX_DAYS = 90
+MAX_MEALS = 8
+
+
+def bad_request(msg):
+    return jsonify({"error": msg}), 400
+
+
+def parse_plan_request(data):
+    # -> (campos do MealPlan, erro)
+    try:
+        fields = {
+            "user_id": str(data.get("user_id") or "anon")[:120],
+            "target_calories": int(data["target_calories"]),
+            "days": int(data.get("days", 7)),
+            "meals_per_day": int(data.get("meals_per_day", 3)),
+            "objetivo": data.get("objetivo") or "Manutenção",
+        }
+    except (KeyError, TypeError, ValueError):
+        return None, "target_calories, days e meals_per_day devem ser inteiros"
+    if fields["target_calories"] <= 0:
+        return None, "target_calories inválido"
+    if not 1 <= fields["days"] <= MAX_DAYS:
+        return None, f"days deve estar entre 1 e {MAX_DAYS}"
+    if not 1 <= fields["meals_per_day"] <= MAX_MEALS:
+        return None, f"meals_per_day deve estar entre 1 e {MAX_MEALS}"
+    if fields["objetivo"] not in OBJETIVOS:
+        return None, f"objetivo deve ser um de {', '.join(OBJETIVOS)}"
+    return fields, None
+
+
+def current_catalog():
+    # foods table as NumPy arrays (only the numeric columns are read); built-in catalog while it is empty
+    rows = db.session.query(Food.name, Food.calories, Food.protein, Food.carbs, Food.fats).all()
+    if not rows:
+        return catalogo_padrao()
+    return Catalogo.de_linhas([(n, k, p or 0.0, c or 0.0, g or 0.0) for n, k, p, c, g in rows])
+
+
+def generation_steps(plan):
+    # runs the generator and persists each day's items as it goes; yields the generator's steps
+    try:
+        for step in generate_plan(plan.target_calories, plan.days, plan.meals_per_day, plan.objetivo,
+                                  catalogo=current_catalog()):
+            if step["new_items"]:
+                db.session.execute(MealPlanItem.__table__.insert(),
+                                   [dict(it, plan_id=plan.id) for it in step["new_items"]])
+                db.session.commit()
+            yield step
+    except Exception:
+        db.session.rollback()
+        plan.status = "failed"
+        db.session.commit()
+        raise
+    plan.status = "generated"
+    db.session.commit()
+
+
+def create_plan_row(fields):
+    plan = MealPlan(**fields)
+    db.session.add(plan)
+    db.session.commit()
+    return plan
+
+
+@mp_bp.route("", methods=["POST"])
+def create_plan():
+    fields, error = parse_plan_request(request.get_json(silent=True) or {})
+    if error:
+        return bad_request(error)
+    plan = create_plan_row(fields)
+    item_count = sum(len(step["new_items"]) for step in generation_steps(plan))
+    return jsonify({"plan_id": plan.id, "status": plan.status, "item_count": item_count}), 201
+
+
+@mp_bp.route("/stream", methods=["POST"])
+def stream_plan():
+    # NDJSON: {"plan_id", "plan"} first, then one line per generated day
+    # ({"progress", "current_item", "new_items"}), then {"progress": 100, "done": true, "status", "item_count"}.
+    # A failure mid-stream ends with {"error": ...}; the status code is already sent by then.
+    fields, error = parse_plan_request(request.get_json(silent=True) or {})
+    if error:
+        return bad_request(error)
+    plan = create_plan_row(fields)
+    plan_id, header = plan.id, plan.to_dict()
+
+    def lines():
+        # the body runs after this view returns, with a new db session: reload the plan there
+        yield json.dumps({"plan_id": plan_id, "plan": header}, ensure_ascii=False) + "\n"
+        plan = db.session.get(MealPlan, plan_id)
+        count = 0
+        try:
+            for step in generation_steps(plan):
+                if not step["new_items"]:
+                    continue
+                count += len(step["new_items"])
+                yield json.dumps(step, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+            return
+        yield json.dumps({"progress": 100, "done": True, "status": plan.status, "item_count": count}) + "\n"
+
+    return Response(stream_with_context(lines()), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@mp_bp.route("/<int:plan_id>", methods=["GET"])
+def get_plan(plan_id):
+    plan = db.session.get(MealPlan, plan_id)
+    if plan is None:
+        return jsonify({"error": "plano não encontrado"}), 404
+    return jsonify(plan.to_dict())
+
+
+@mp_bp.route("/<int:plan_id>/items", methods=["GET"])
+def get_plan_items(plan_id):
+    if db.session.get(MealPlan, plan_id) is None:
+        return jsonify({"error": "plano não encontrado"}), 404
+    rows = db.session.query(*[getattr(MealPlanItem, f) for f in MealPlanItem.FIELDS]) \
+        .filter(MealPlanItem.plan_id == plan_id).order_by(MealPlanItem.id).all()
+    return jsonify([dict(zip(MealPlanItem.FIELDS, r)) for r in rows])
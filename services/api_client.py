@@ -0,0 +1,85 @@
+# services/api_client.py — cliente HTTP da API remota de planos (flask_app)
+# Uma requests.Session com pool keep-alive por processo, timeouts curtos de conexão/leitura e
+# retentativas limitadas com backoff; a geração pode ser acompanhada em streaming (NDJSON).
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = 2.0
+READ_TIMEOUT = 5.0
+RETRIES = 2
+BACKOFF = 0.3               # backoff exponencial do urllib3: 1ª retentativa imediata, depois 0.6 s, 1.2 s, ...
+RETRY_STATUS = (429, 502, 503, 504)
+POOL_SIZE = 10              # conexões mantidas por host (sessões e threads de job compartilham o cliente)
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiClient:
+    def __init__(self, base_url, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, pool_size=POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        # POST não é idempotente: só repete se a conexão nem chegou a abrir; GET repete também leitura e 5xx
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff,
+                      status_forcelist=RETRY_STATUS, allowed_methods=frozenset({"GET"}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method, path, **kwargs):
+        try:
+            r = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+            r.raise_for_status()
+            return r.json()
+        except (requests.RequestException, ValueError) as e:
+            raise ApiError(f"{method} {path}: {e}") from e
+
+    def create_plan(self, user_id, target_calories, days, meals_per_day):
+        # devolve o id do plano criado (ou None se a API não informar)
+        resp = self._request("POST", "/api/mealplans", json={
+            "user_id": user_id, "target_calories": target_calories, "days": days, "meals_per_day": meals_per_day})
+        if not isinstance(resp, dict):
+            raise ApiError(f"POST /api/mealplans: resposta inesperada {resp!r:.80}")
+        return resp.get("plan_id") or resp.get("id")
+
+    def stream_plan(self, user_id, target_calories, days, meals_per_day, objetivo="Manutenção"):
+        # gera o plano pelo endpoint NDJSON; devolve um gerador de mensagens (dicts), uma por linha:
+        # {"plan_id", "plan"}, depois {"progress", "current_item", "new_items"} por dia e {"done": True, ...} no fim
+        path = "/api/mealplans/stream"
+        try:
+            r = self.session.post(f"{self.base_url}{path}", timeout=self.timeout, stream=True, json={
+                "user_id": user_id, "target_calories": target_calories, "days": days,
+                "meals_per_day": meals_per_day, "objetivo": objetivo})
+            r.raise_for_status()
+        except requests.RequestException as e:
+            raise ApiError(f"POST {path}: {e}") from e
+        return self._ndjson(r, path)
+
+    @staticmethod
+    def _ndjson(r, path):
+        # o read timeout vale entre linhas, não para a resposta inteira
+        with r:
+            try:
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    msg = json.loads(line)
+                    if "error" in msg:
+                        raise ApiError(f"POST {path}: {msg['error']}")
+                    yield msg
+            except (requests.RequestException, ValueError) as e:
+                raise ApiError(f"POST {path}: {e}") from e
+
+    def get_items(self, plan_id):
+        return self._request("GET", f"/api/mealplans/{plan_id}/items")
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,149 @@
+# services/auth.py — hash de senhas fora da thread da requisição e cache de tokens JWT verificados
+# O pbkdf2 é CPU puro: roda num pool de processos limitado (a fila também é limitada, e o excesso vira
+# "ocupado" em vez de acumular logins); as claims de um token já verificado ficam num LRU até o token expirar.
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import jwt
+from passlib.hash import pbkdf2_sha256
+
+HASH_TIMEOUT_SECONDS = 10
+HASH_WORKER_NICE = 10  # workers com prioridade menor: numa rajada, a CPU vai primeiro para as requisições
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def _lower_priority(increment):
+    try:
+        os.nice(increment)
+    except (AttributeError, OSError):  # sem os.nice (Windows) ou sem permissão: segue com a prioridade normal
+        pass
+
+
+def hash_password(password, rounds=None):
+    hasher = pbkdf2_sha256.using(rounds=rounds) if rounds else pbkdf2_sha256
+    return hasher.hash(password)
+
+
+def verify_password(password, hash_, rounds=None):
+    # -> (confere, novo_hash): novo_hash vem preenchido quando o hash guardado usa outro custo
+    if not pbkdf2_sha256.verify(password, hash_):
+        return False, None
+    if rounds and pbkdf2_sha256.using(rounds=rounds).needs_update(hash_):
+        return True, hash_password(password, rounds)
+    return True, None
+
+
+class PasswordHasher:
+    # workers=0 mantém o hash na thread chamadora (testes, scripts)
+    def __init__(self, workers=2, rounds=None, max_pending=32, timeout=HASH_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.rounds = rounds
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool_lock = threading.Lock()
+        self._pool = self._new_pool() if workers else None
+        self._dummy = None  # hash de uma senha aleatória, com o mesmo custo, para e-mails sem conta
+
+    def _new_pool(self):
+        # spawn: o processo do servidor tem threads; fork copiaria locks em estado indefinido
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_lower_priority, initargs=(HASH_WORKER_NICE,))
+
+    def _run(self, fn, *args):
+        if self._pool is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("muitas operações de senha em andamento")
+        pool = self._pool
+        try:
+            return pool.submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy("hash de senha demorou demais")
+        except BrokenProcessPool:
+            # um worker morreu (OOM, kill): troca o pool para as próximas requisições
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = self._new_pool()
+            raise HasherBusy("pool de hash reiniciado")
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.rounds)
+
+    def verify(self, password, hash_):
+        return self._run(verify_password, password, hash_, self.rounds)
+
+    def verify_unknown(self, password):
+        # e-mail sem conta: paga o mesmo verify (sempre falso), para o tempo da resposta não revelar quem tem conta
+        if self._dummy is None:
+            self._dummy = self._run(hash_password, os.urandom(16).hex(), self.rounds)
+        return self._run(verify_password, password, self._dummy, self.rounds)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+
+class TokenCache:
+    # LRU token -> claims; uma entrada vale até o "exp" do próprio token
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+            claims, exp = entry
+            if exp <= now:
+                del self._data[token]
+                return None
+            self._data.move_to_end(token)
+            return claims
+
+    def put(self, token, claims):
+        with self._lock:
+            self._data[token] = (claims, claims.get("exp", 0))
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, token):
+        with self._lock:
+            self._data.pop(token, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TokenService:
+    def __init__(self, secret, algorithm="HS256", ttl_seconds=3600, cache_size=1024):
+        self.secret = secret
+        self.algorithm = algorithm
+        self.ttl_seconds = ttl_seconds
+        self.cache = TokenCache(cache_size)
+
+    def issue(self, user_id, **extra):
+        now = int(time.time())
+        claims = dict(extra, sub=str(user_id), iat=now, exp=now + self.ttl_seconds)
+        return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def verify(self, token):
+        # -> claims; jwt.InvalidTokenError se inválido ou expirado
+        claims = self.cache.get(token)
+        if claims is None:
+            claims = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+            self.cache.put(token, claims)
+        return claims
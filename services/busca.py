@@ -0,0 +1,154 @@
+# services/busca.py — índice invertido incremental com ranking BM25 (artigos e legendas do feed)
+# Cada documento é indexado uma vez (documentos publicados não mudam): termos sem acento e em minúsculas ("Refeição" ->
+# "refeicao") com a frequência ponderada por campo (título/tags valem mais que o corpo). O vocabulário fica
+# ordenado para que um termo da busca também case com os termos que começam com ele ("nutri" ->
+# "nutricao", "nutricional"). As listas de cada termo são arrays tipados (posição do doc, tf) que só
+# crescem; uma busca pontua só as listas dos termos consultados, em NumPy, e cruza pela menor.
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+K1 = 1.2
+B = 0.75
+PESO_PREFIXO = 0.5    # termo que só casa por prefixo pontua menos que o termo exato
+MAX_EXPANSOES = 50    # termos do vocabulário considerados por prefixo
+MIN_PREFIXO = 2       # prefixos mais curtos que isso não expandem
+STOPWORDS = frozenset(
+    "a ao aos as com da das de do dos e em na nas no nos o os ou para pela pelas pelo pelos por que se sem "
+    "um uma umas uns".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokens(texto):
+    # mesmo resultado de texto.sem_acentos para os tokens [a-z0-9]: o que não vira ASCII após o NFKD não
+    # seria token de qualquer forma (e isto não percorre o texto caractere a caractere em Python)
+    texto = texto or ""
+    if not texto.isascii():
+        texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return [t for t in _TOKEN.findall(texto.lower()) if t not in STOPWORDS]
+
+
+class IndiceBusca:
+    def __init__(self):
+        self._docs = []          # posição -> doc
+        self._pos = {}           # doc -> posição
+        self._lens = array("f")  # posição -> comprimento ponderado
+        self._postings = {}      # termo -> (array de posições crescentes, array de tf ponderado)
+        self._vocab = []         # termos em ordem alfabética (busca por prefixo)
+        self._vocab_novos = []   # termos ainda fora de _vocab: entram ordenados na próxima busca
+        self._escopos = {}       # rótulo -> array de posições crescentes (filtros da busca)
+        # add() acrescenta em _vocab_novos enquanto uma busca de outra thread pode estar juntando a lista
+        self._vocab_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc, campos, escopos=()):
+        # campos: [(texto, peso)]; doc é qualquer chave hashable (o FeedStore usa o seq do item);
+        # escopos: rótulos pelos quais a busca pode ser restrita (ex.: ("type", "photo")).
+        # Conteúdo publicado não muda: um doc já indexado é ignorado
+        if doc in self._pos:
+            return
+        tf = {}
+        for texto, peso in campos:
+            for t in tokens(texto):
+                tf[t] = tf.get(t, 0.0) + peso
+        pos = self._pos[doc] = len(self._docs)
+        self._docs.append(doc)
+        with self._vocab_lock:
+            for t, f in tf.items():
+                post = self._postings.get(t)
+                if post is None:
+                    post = self._postings[t] = (array("I"), array("f"))
+                    self._vocab_novos.append(t)
+                post[0].append(pos)
+                post[1].append(f)
+        for e in escopos:
+            self._escopos.setdefault(e, array("I")).append(pos)
+        self._lens.append(sum(tf.values()))
+
+    def _expandir(self, termo):
+        # [(termo do vocabulário, peso)]: o exato (se existir) e os que começam com ele
+        out = [(termo, 1.0)] if termo in self._postings else []
+        if len(termo) < MIN_PREFIXO:
+            return out
+        vocab = self._vocabulario()
+        i = bisect_left(vocab, termo)
+        while i < len(vocab) and len(out) < MAX_EXPANSOES and vocab[i].startswith(termo):
+            if vocab[i] != termo:
+                out.append((vocab[i], PESO_PREFIXO))
+            i += 1
+        return out
+
+    def _vocabulario(self):
+        # inserir em ordem a cada termo novo desloca a lista toda (a carga inicial tem centenas de milhares);
+        # os novos são juntados de uma vez, e o sort do Python só intercala os dois trechos ordenados
+        # (troca da lista sob o lock: um termo acrescentado durante a troca não se perde)
+        if self._vocab_novos:
+            with self._vocab_lock:
+                novos, self._vocab_novos = self._vocab_novos, []
+                if novos:
+                    self._vocab = sorted(self._vocab + sorted(novos))
+        return self._vocab
+
+    def _pontuar(self, expansoes, n, norm):
+        # -> (posições ordenadas, score) de um termo da consulta; variações do termo: vale a melhor
+        partes_pos, partes_s = [], []
+        for t, peso in expansoes:
+            docs, tfs = self._postings[t]
+            # tobytes copia com o GIL: um add() concorrente não encontra o array exportado
+            pos = np.frombuffer(docs.tobytes(), dtype=np.uint32)
+            tf = np.frombuffer(tfs.tobytes(), dtype=np.float32)
+            # um add() concorrente pode ter acrescentado depois da cópia dos comprimentos: fica de fora
+            m = min(len(pos), len(tf))
+            m = int(np.searchsorted(pos[:m], n))
+            pos, tf = pos[:m], tf[:m]
+            idf = np.log1p((n - m + 0.5) / (m + 0.5)) * peso
+            partes_pos.append(pos)
+            partes_s.append(idf * tf * (K1 + 1) / (tf + norm[pos]))
+        if len(partes_pos) == 1:
+            return partes_pos[0], partes_s[0]
+        pos, s = np.concatenate(partes_pos), np.concatenate(partes_s)
+        ordem = np.lexsort((-s, pos))
+        pos, s = pos[ordem], s[ordem]
+        primeiro = np.r_[True, pos[1:] != pos[:-1]]
+        return pos[primeiro], s[primeiro]
+
+    def buscar(self, consulta, limite=20, escopo=None):
+        # -> [(doc, score)] do maior score para o menor (empate: o mais recente); todos os termos da
+        # consulta precisam casar. escopo: rótulo dado no add() ao qual a busca se restringe
+        termos = list(dict.fromkeys(tokens(consulta)))
+        if not termos or not self._docs or (escopo is not None and escopo not in self._escopos):
+            return []
+        grupos = []
+        for termo in termos:
+            exp = self._expandir(termo)
+            if not exp:
+                return []
+            grupos.append(exp)
+        lens = np.frombuffer(self._lens.tobytes(), dtype=np.float32)
+        n = len(lens)
+        norm = K1 * (1 - B + B * lens / (lens.sum() / n))
+        grupos.sort(key=lambda g: sum(len(self._postings[t][1]) for t, _ in g))
+        cand, scores = self._pontuar(grupos[0], n, norm)
+        if escopo is not None:
+            pos = np.frombuffer(self._escopos[escopo].tobytes(), dtype=np.uint32)
+            pos = pos[:int(np.searchsorted(pos, n))]
+            cand, ia, _ = np.intersect1d(cand, pos, assume_unique=True, return_indices=True)
+            scores = scores[ia]
+        for grupo in grupos[1:]:
+            pos, s = self._pontuar(grupo, n, norm)
+            cand, ia, ib = np.intersect1d(cand, pos, assume_unique=True, return_indices=True)
+            scores = scores[ia] + s[ib]
+            if not len(cand):
+                return []
+        if len(cand) > limite:
+            topo = np.argpartition(-scores, limite - 1)[:limite]
+            cand, scores = cand[topo], scores[topo]
+        ordem = np.lexsort((-cand.astype(np.int64), -scores))
+        return [(self._docs[cand[i]], float(scores[i])) for i in ordem]
@@ -0,0 +1,111 @@
+# services/community.py — estado da comunidade (feed, fotos, curtidas, grupos, ranking) compartilhado pelo processo
+# Uma única instância por servidor (st.cache_resource), hidratada do repositório na criação; toda alteração
+# é persistida e então publicada nos índices em memória. As sessões guardam só cursores/filtros.
+# Sem lock global: feed e ranking têm cada um o seu lock curto (nunca segurado durante IO); criar grupo
+# serializa só a checagem do nome, e entrar num grupo só trava aquele grupo. Cada mudança já visível é
+# publicada no barramento (services/mudancas.py), que as páginas consultam para atualizar só o painel afetado.
+import threading
+import uuid
+from datetime import datetime
+
+from services.feed import FeedStore
+from services.leaderboard import Leaderboard
+from services.mudancas import CURTIDAS, FEED, GRUPOS, RANKING, BarramentoMudancas
+
+
+class Community:
+    def __init__(self, repo):
+        self.repo = repo
+        self.feed = FeedStore()
+        self.leaderboard = Leaderboard()
+        self.mudancas = BarramentoMudancas()
+        self.groups = {}  # nome -> {id, members:[], photos:[photo_id], created_at}
+        self._groups_lock = threading.Lock()  # criação de grupos (nome único)
+        self._group_locks = {}                # nome -> Lock dos membros/fotos do grupo
+        self._load()
+
+    def _load(self):
+        self.groups = self.repo.load_groups()
+        self._group_locks = {name: threading.Lock() for name in self.groups}
+        for name, grp in self.groups.items():
+            self.leaderboard.add_group(name)
+            for _ in grp["members"]:
+                self.leaderboard.add_member(name)
+        for item, photo, likes in self.repo.iter_feed():
+            self.feed.load(item, photo, likes)
+            group = photo["group"] if photo else None
+            if group in self.groups:
+                self.groups[group]["photos"].insert(0, photo["id"])
+                self.leaderboard.add_photo(group)
+                for _, created_at in likes:
+                    self.leaderboard.add_like(group, datetime.fromisoformat(created_at))
+
+    def group_names(self):
+        return list(self.groups)
+
+    def add_photo(self, uploader, caption, image, group=None):
+        item, photo = self.feed.new_photo(uploader, caption, image, group=group)
+        # persistido antes de ficar visível: uma curtida (gravada em segundo plano) sempre encontra o item
+        self.repo.add_feed_item(item, group=group, photo=photo)
+        self.feed.insert(item, photo)
+        lock = self._group_locks.get(group) if group else None
+        if lock:
+            with lock:
+                self.groups[group]["photos"].insert(0, photo["id"])
+            self.leaderboard.add_photo(group)
+            self.mudancas.publicar(RANKING)
+        self.mudancas.publicar(FEED, group)
+        return photo["id"]
+
+    def add_article(self, title, body, author, tags=None):
+        item = self.feed.new_article(title, body, author, tags=tags)
+        self.repo.add_feed_item(item)
+        aid = self.feed.insert(item)
+        self.mudancas.publicar(FEED)
+        return aid
+
+    def like(self, feed_id, user):
+        now = datetime.now()
+        if not self.feed.like(feed_id, user, now):
+            return False
+        self.repo.add_like(feed_id, user, now.isoformat())
+        photo = self.feed.photo_of(self.feed.get(feed_id))
+        group = photo["group"] if photo else None
+        if group in self.leaderboard:
+            self.leaderboard.add_like(group, now)
+            self.mudancas.publicar(RANKING)
+        self.mudancas.publicar(CURTIDAS, group)
+        return True
+
+    def create_group(self, name, creator):
+        if not name or name.strip() == "":
+            return False
+        with self._groups_lock:
+            if name in self.groups:
+                return False
+            created_at = datetime.now().isoformat()
+            gid = str(uuid.uuid4())[:6]
+            self.repo.add_group(name, gid, created_at)
+            self.repo.add_member(name, creator, created_at)
+            self._group_locks[name] = threading.Lock()
+            # publicado por último: quem encontra o grupo já encontra o lock dele
+            self.groups[name] = {"id": gid, "members": [creator], "photos": [], "created_at": created_at}
+            self.leaderboard.add_member(name)
+        self.mudancas.publicar(GRUPOS, name)
+        self.mudancas.publicar(RANKING)
+        return True
+
+    def join_group(self, name, user):
+        # devolve None se o grupo não existe, False se já era membro, True se entrou agora
+        grp = self.groups.get(name)
+        if not grp:
+            return None
+        with self._group_locks[name]:
+            if user in grp["members"]:
+                return False
+            self.repo.add_member(name, user, datetime.now().isoformat())
+            grp["members"].append(user)
+        self.leaderboard.add_member(name)
+        self.mudancas.publicar(GRUPOS, name)
+        self.mudancas.publicar(RANKING)
+        return True
@@ -0,0 +1,117 @@
+# services/eventos.py — log de eventos estruturado e limitado
+# Cada sessão guarda os últimos N eventos num ring buffer (deque com maxlen): memória constante em sessões
+# longas. Um evento guarda o modelo da mensagem e os campos (ids, contagens); o texto só é montado quando
+# alguém lê. Opcionalmente os eventos também vão para um arquivo rotativo por uma fila (QueueHandler ->
+# QueueListener): quem registra não espera o disco e a formatação acontece na thread do listener.
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from collections import deque
+
+NIVEIS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+CAPACIDADE_PADRAO = 500
+ARQUIVO_MAX_BYTES = 5 * 1024 * 1024
+ARQUIVO_BACKUPS = 3
+
+
+class Evento:
+    __slots__ = ("seq", "ts", "nivel", "tipo", "modelo", "campos", "_texto")
+
+    def __init__(self, seq, ts, nivel, tipo, modelo, campos):
+        self.seq = seq
+        self.ts = ts
+        self.nivel = nivel
+        self.tipo = tipo
+        self.modelo = modelo
+        self.campos = campos
+        self._texto = None
+
+    @property
+    def texto(self):
+        if self._texto is None:
+            try:
+                self._texto = self.modelo.format(**self.campos)
+            except (KeyError, IndexError, ValueError):
+                self._texto = self.modelo
+        return self._texto
+
+    def to_dict(self):
+        return {"seq": self.seq, "ts": self.ts, "nivel": self.nivel, "tipo": self.tipo, "mensagem": self.texto,
+                **self.campos}
+
+
+class EventLog:
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, sink=None):
+        self._buf = deque(maxlen=capacidade)
+        self._seq = itertools.count(1)
+        self.sink = sink  # logging.Logger opcional (ver arquivo_rotativo)
+
+    @property
+    def capacidade(self):
+        return self._buf.maxlen
+
+    def __len__(self):
+        return len(self._buf)
+
+    def add(self, tipo, modelo, nivel="INFO", **campos):
+        ev = Evento(next(self._seq), time.time(), nivel, tipo, modelo, campos)
+        self._buf.append(ev)
+        if self.sink is not None:
+            self.sink.log(NIVEIS.get(nivel, logging.INFO), modelo, extra={"evento": ev})
+        return ev
+
+    def consultar(self, nivel_min=None, tipo=None, antes=None, limite=50):
+        # mais recentes primeiro; `antes` é o cursor (seq) da página anterior. -> (eventos, próximo cursor)
+        minimo = NIVEIS.get(nivel_min, 0)
+        achados = []
+        for ev in reversed(self._buf):
+            if antes is not None and ev.seq >= antes:
+                continue
+            if NIVEIS.get(ev.nivel, 0) < minimo or (tipo and ev.tipo != tipo):
+                continue
+            achados.append(ev)
+            if len(achados) > limite:
+                break
+        proximo = achados[limite - 1].seq if len(achados) > limite else None
+        return achados[:limite], proximo
+
+    def tipos(self):
+        return sorted({ev.tipo for ev in self._buf})
+
+    def limpar(self):
+        self._buf.clear()
+
+
+class _FilaSemFormatar(logging.handlers.QueueHandler):
+    # QueueHandler.prepare formataria a mensagem na thread de quem registra; a fila é local ao processo,
+    # então o registro vai como está e o listener formata
+    def prepare(self, record):
+        return record
+
+
+class _FormatoJson(logging.Formatter):
+    def format(self, record):
+        ev = getattr(record, "evento", None)
+        if ev is None:
+            return json.dumps({"ts": record.created, "nivel": record.levelname, "mensagem": record.getMessage()},
+                              ensure_ascii=False)
+        return json.dumps(ev.to_dict(), ensure_ascii=False, default=str)
+
+
+def arquivo_rotativo(path, max_bytes=ARQUIVO_MAX_BYTES, backups=ARQUIVO_BACKUPS, nome="power_routine.eventos"):
+    # -> (logger, listener): eventos em JSON por linha num arquivo rotativo, gravados por uma thread própria
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    handler.setFormatter(_FormatoJson())
+    fila = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(fila, handler, respect_handler_level=False)
+    logger = logging.getLogger(nome)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+    logger.addHandler(_FilaSemFormatar(fila))
+    listener.start()
+    return logger, listener
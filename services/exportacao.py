@@ -0,0 +1,390 @@
+# services/exportacao.py — exportação/importação em massa de planos, comunidade e progresso
+# Exportar é um gerador de blocos gzip: as linhas saem de cursores SQLite (numa transação de leitura, então
+# o arquivo é um retrato consistente do banco) e do CSV de pesagens, e são comprimidas aos poucos — a memória
+# não cresce com o histórico. NDJSON traz tudo num arquivo (uma linha por registro, com "tipo"); CSV traz um
+# tipo por arquivo. Importar lê o stream linha a linha e grava em lotes com INSERT OR IGNORE: ids que já
+# existem são pulados (reimportar o mesmo arquivo não duplica nada) e registros cujo pai não existe também.
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+
+from services.repository import ITEM_COLUMNS, PLAN_COLUMNS
+
+FORMATO = "power_routine.export"
+VERSAO = 1
+BLOCO_BYTES = 256 * 1024  # texto acumulado antes de cada chamada ao compressor
+LOTE = 2_000              # registros por transação na importação
+NIVEL_GZIP = 1          # o compressor dominava a exportação: nível 1 é ~1,5× mais rápido que 6 e o .gz sai ~35% maior
+GZIP_MAGICO = b"\x1f\x8b"
+CONTADOR_IMPORTACOES = "importacoes"  # Repository.counter: avança a cada lote importado (caches se renovam)
+
+
+class Tabela:
+    __slots__ = ("tipo", "tabela", "colunas", "json", "pai", "dono")
+
+    def __init__(self, tipo, tabela, colunas, json_cols=(), pai=None, dono=None):
+        self.tipo = tipo
+        self.tabela = tabela
+        self.colunas = tuple(colunas)
+        self.json = frozenset(json_cols)  # gravadas como texto JSON no banco; no NDJSON vão como valor
+        self.pai = pai                    # (coluna, tabela do pai, coluna do pai): registro órfão é pulado
+        # coluna do usuário dono (nesta tabela, ou na do pai quando há pai): importação restrita a um usuário
+        # só aceita registros dele; tabela sem dono não entra nesse modo
+        self.dono = dono
+
+    def _guarda_pai(self, valor, usuario):
+        coluna, tabela, coluna_pai = self.pai
+        dono = f" AND {self.dono} = ?" if usuario else ""
+        return f"EXISTS (SELECT 1 FROM {tabela} WHERE {coluna_pai} = {valor}{dono})"
+
+    def insert_sql(self, usuario=False):
+        # usuario=True: params() recebe o usuário e o registro precisa ser dele
+        cols = ", ".join(self.colunas)
+        marcas = ", ".join("?" * len(self.colunas))
+        if self.pai is None and not usuario:
+            return f"INSERT OR IGNORE INTO {self.tabela} ({cols}) VALUES ({marcas})"
+        # OR IGNORE não cobre violação de chave estrangeira: o órfão é filtrado no próprio INSERT
+        guarda = self._guarda_pai("?", usuario) if self.pai is not None else "? = ?"
+        return f"INSERT OR IGNORE INTO {self.tabela} ({cols}) SELECT {marcas} WHERE {guarda}"
+
+    def insert_json_sql(self, usuario=False):
+        # uma linha NDJSON como único parâmetro (mais o usuário, se restrito): o SQLite extrai os campos
+        # (json_extract, em C); linha com JSON inválido não entra (conta como lida e não inserida)
+        cols = ", ".join(self.colunas)
+        campos = ", ".join(f"json_extract(j, '$.{c}')" for c in self.colunas)
+        sql = f"INSERT OR IGNORE INTO {self.tabela} ({cols}) SELECT {campos} FROM (SELECT ? AS j) WHERE json_valid(j)"
+        if self.pai is not None:
+            sql += " AND " + self._guarda_pai(f"json_extract(j, '$.{self.pai[0]}')", usuario)
+        elif usuario:
+            sql += f" AND json_extract(j, '$.{self.dono}') = ?"
+        return sql
+
+    def params(self, registro, usuario=None):
+        valores = []
+        for c in self.colunas:
+            v = registro.get(c)
+            valores.append(json.dumps(v, ensure_ascii=False) if c in self.json and v is not None else v)
+        if self.pai is not None:
+            valores.append(registro.get(self.pai[0]))
+        elif usuario is not None:
+            valores.append(registro.get(self.dono))
+        if usuario is not None:
+            valores.append(usuario)
+        return valores
+
+
+# em ordem de dependência: pais antes dos filhos, na exportação e em cada lote da importação
+TABELAS = {t.tipo: t for t in (
+    Tabela("grupo", "community_groups", ("name", "id", "created_at")),
+    Tabela("membro", "group_members", ("group_name", "user", "joined_at"), pai=("group_name", "community_groups", "name")),
+    Tabela("feed_item", "feed_items", ("id", "type", "author", "created_at", "group_name", "title", "body", "tags"),
+           json_cols=("tags",)),
+    Tabela("foto", "photos", ("id", "feed_id", "uploader", "caption", "image", "created_at", "group_name"),
+           json_cols=("image",), pai=("feed_id", "feed_items", "id")),
+    Tabela("curtida", "likes", ("feed_id", "user", "created_at"), pai=("feed_id", "feed_items", "id")),
+    Tabela("plano", "plans", PLAN_COLUMNS, dono="user_id"),
+    Tabela("item_plano", "plan_items", ("plan_id", "idx") + ITEM_COLUMNS, pai=("plan_id", "plans", "id"),
+           dono="user_id"),
+)}
+PESAGEM = "pesagem"  # progresso: vem do CSV de pesagens, não do banco
+SECOES = {
+    "comunidade": ("grupo", "membro", "feed_item", "foto", "curtida"),
+    "planos": ("plano", "item_plano"),
+    "progresso": (PESAGEM,),
+}
+# o que quem não é admin exporta/importa (página Dados e /api/dados): só os próprios planos e itens
+SECOES_USUARIO = ("planos",)
+TIPOS_USUARIO = tuple(t for t, tabela in TABELAS.items() if tabela.dono)
+
+
+# ---------- exportação ----------
+def gzip_stream(textos, nivel=NIVEL_GZIP, bloco=BLOCO_BYTES):
+    # str... -> blocos de bytes de um único arquivo .gz
+    z = zlib.compressobj(nivel, zlib.DEFLATED, 31)  # wbits 31 = cabeçalho gzip
+    partes, n = [], 0
+    for texto in textos:
+        partes.append(texto)
+        n += len(texto)
+        if n >= bloco:
+            saida = z.compress("".join(partes).encode("utf-8"))
+            partes, n = [], 0
+            if saida:
+                yield saida
+    yield z.compress("".join(partes).encode("utf-8")) + z.flush()
+
+
+def _filtro(tabela, usuario, planos):
+    # só planos/itens podem ser filtrados (por usuário ou ids); a comunidade sai inteira
+    if tabela.tipo == "plano":
+        coluna = "id"
+    elif tabela.tipo == "item_plano":
+        coluna = "plan_id"
+    else:
+        return "", ()
+    if planos is not None:
+        planos = list(planos)
+        return f" WHERE {coluna} IN ({', '.join('?' * len(planos))})", planos
+    if usuario is not None:
+        if coluna == "id":
+            return " WHERE user_id = ?", (usuario,)
+        return " WHERE plan_id IN (SELECT id FROM plans WHERE user_id = ?)", (usuario,)
+    return "", ()
+
+
+def _linhas_tabela(conn, tabela, usuario=None, planos=None, colunas=None):
+    # -> cursor com as colunas pedidas (padrão: tabela.colunas), linha a linha (sem montar listas)
+    where, params = _filtro(tabela, usuario, planos)
+    ordem = " ORDER BY plan_id, idx" if tabela.tipo == "item_plano" else ""
+    return conn.execute(f"SELECT {colunas or ', '.join(tabela.colunas)} FROM {tabela.tabela}{where}{ordem}", params)
+
+
+def _json_sql(tabela):
+    # o próprio SQLite monta cada linha NDJSON (json_object, em C): o Python só concatena e comprime
+    pares = [f"'tipo', '{tabela.tipo}'"]
+    for c in tabela.colunas:
+        pares.append(f"'{c}', json({c})" if c in tabela.json else f"'{c}', {c}")
+    return f"json_object({', '.join(pares)})"
+
+
+def _pesagens(progresso_path):
+    # (dia, peso) do CSV de pesagens, linha a linha
+    if not progresso_path:
+        return
+    try:
+        f = open(progresso_path, encoding="utf-8", newline="")
+    except FileNotFoundError:
+        return
+    with f:
+        for row in csv.DictReader(f):
+            if row.get("dia") and row.get("peso"):
+                yield row["dia"], float(row["peso"])
+
+
+def registros_ndjson(repo, secoes=tuple(SECOES), progresso_path=None, usuario=None, planos=None):
+    # -> linhas NDJSON (str com \n): cabeçalho e depois cada registro com seu "tipo"
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    yield enc({"tipo": "cabecalho", "formato": FORMATO, "versao": VERSAO,
+               "gerado_em": datetime.now().isoformat(timespec="seconds"), "secoes": list(secoes)}) + "\n"
+    with repo.read_snapshot() as conn:
+        for secao in secoes:
+            for tipo in SECOES[secao]:
+                if tipo == PESAGEM:
+                    for dia, peso in _pesagens(progresso_path):
+                        yield enc({"tipo": PESAGEM, "dia": dia, "peso": peso}) + "\n"
+                    continue
+                tabela = TABELAS[tipo]
+                for (linha,) in _linhas_tabela(conn, tabela, usuario, planos, colunas=_json_sql(tabela)):
+                    yield linha + "\n"
+
+
+def exportar_ndjson(repo, secoes=tuple(SECOES), progresso_path=None, usuario=None, planos=None):
+    # -> blocos gzip de um .ndjson.gz
+    return gzip_stream(registros_ndjson(repo, secoes, progresso_path, usuario, planos))
+
+
+def linhas_csv(repo, tipo, progresso_path=None, usuario=None, planos=None):
+    # -> linhas CSV (com cabeçalho) de um tipo; colunas JSON ficam como texto JSON
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+
+    def linha(valores):
+        w.writerow(valores)
+        texto = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return texto
+
+    if tipo == PESAGEM:
+        yield linha(("dia", "peso"))
+        for dia, peso in _pesagens(progresso_path):
+            yield linha((dia, peso))
+        return
+    tabela = TABELAS[tipo]
+    yield linha(tabela.colunas)
+    with repo.read_snapshot() as conn:
+        for row in _linhas_tabela(conn, tabela, usuario, planos):
+            yield linha(row)
+
+
+def exportar_csv(repo, tipo, progresso_path=None, usuario=None, planos=None):
+    # -> blocos gzip de um .csv.gz
+    return gzip_stream(linhas_csv(repo, tipo, progresso_path, usuario, planos))
+
+
+def gravar(blocos, path):
+    # grava os blocos de uma exportação num arquivo -> bytes gravados
+    n = 0
+    with open(path, "wb") as f:
+        for bloco in blocos:
+            f.write(bloco)
+            n += len(bloco)
+    return n
+
+
+# ---------- importação ----------
+def _texto(origem, gzipado=None):
+    # origem: caminho ou arquivo binário (upload, request.stream); gzipado=None detecta pelos bytes mágicos
+    # (num arquivo aberto, precisa de seek); o texto é lido em streaming
+    if isinstance(origem, (str, os.PathLike)):
+        if gzipado is None:
+            with open(origem, "rb") as f:
+                gzipado = f.read(2) == GZIP_MAGICO
+        raw = gzip.open(origem, "rb") if gzipado else open(origem, "rb")
+    else:
+        if gzipado is None:
+            gzipado = origem.read(2) == GZIP_MAGICO
+            origem.seek(0)
+        raw = gzip.GzipFile(fileobj=origem, mode="rb") if gzipado else origem
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+class Importacao:
+    # acumula registros por tipo e grava um lote por transação, pais antes dos filhos.
+    # ndjson=True: add() recebe a linha NDJSON como veio (o SQLite a decodifica); senão, um dict por registro.
+    # usuario: só entram registros desse usuário (tabelas com dono); os demais são lidos e pulados
+    def __init__(self, repo, historico=None, lote=LOTE, ndjson=False, usuario=None):
+        self.repo = repo
+        self.ndjson = ndjson
+        self.usuario = usuario
+        self.historico = historico  # services.progresso.HistoricoPeso para as pesagens (None = ignoradas)
+        self.lote = lote
+        self.stats = {}             # tipo -> {"lidos", "inseridos"}
+        self._pendentes = {}        # tipo -> [params]
+        self._n = 0
+        self._pesagens_vistas = None
+
+    def _conta(self, tipo, lidos=0, inseridos=0):
+        s = self.stats.setdefault(tipo, {"lidos": 0, "inseridos": 0})
+        s["lidos"] += lidos
+        s["inseridos"] += inseridos
+
+    def add(self, tipo, registro):
+        if tipo == PESAGEM:
+            self._add_pesagem(json.loads(registro) if self.ndjson else registro)
+            return
+        tabela = TABELAS.get(tipo)
+        if tabela is None or (self.usuario is not None and tabela.dono is None):
+            # tipo desconhecido (arquivo de versão mais nova) ou sem dono numa importação restrita: pulado
+            self._conta(tipo, lidos=1)
+            return
+        if self.ndjson:
+            params = (registro,) if self.usuario is None else (registro, self.usuario)
+        else:
+            params = tabela.params(registro, self.usuario)
+        self._pendentes.setdefault(tipo, []).append(params)
+        self._n += 1
+        if self._n >= self.lote:
+            self.flush()
+
+    def _add_pesagem(self, registro):
+        if self.historico is None:
+            self._conta(PESAGEM, lidos=1)
+            return
+        if self._pesagens_vistas is None:
+            # dedup pelas pesagens já registradas (o histórico já fica em memória para a página Progresso)
+            self.historico.refresh()
+            self._pesagens_vistas = {(str(d), round(float(p), 1))
+                                     for d, p in zip(self.historico.dias, self.historico.pesos)}
+        try:
+            chave = (str(registro["dia"])[:10], round(float(registro["peso"]), 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"pesagem inválida: {registro!r}") from None
+        novo = chave not in self._pesagens_vistas
+        if novo:
+            self._pesagens_vistas.add(chave)
+            self._pendentes.setdefault(PESAGEM, []).append(chave)
+            self._n += 1
+        self._conta(PESAGEM, lidos=1)
+        if self._n >= self.lote:
+            self.flush()
+
+    def flush(self):
+        pendentes, self._pendentes, self._n = self._pendentes, {}, 0
+        pesagens = pendentes.pop(PESAGEM, None)
+        tipos = [t for t in TABELAS if t in pendentes]
+        if tipos:
+            # o lote SQL antes das pesagens: se o banco recusar o lote, nada do lote fica gravado no CSV
+            restrito = self.usuario is not None
+            comandos = [(TABELAS[t].insert_json_sql(restrito) if self.ndjson else TABELAS[t].insert_sql(restrito),
+                         pendentes[t]) for t in tipos]
+            try:
+                alterados = self.repo.write_batch(comandos)
+            except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError) as e:
+                # valor que o banco recusa (o lote inteiro foi desfeito): é erro do arquivo, não do servidor
+                raise ValueError(f"registro inválido em {', '.join(tipos)}: {e}") from None
+            if any(alterados):
+                # as tabelas mudaram por fora da Community: quem a mantém em cache (outro processo) recarrega
+                self.repo.bump_counter(CONTADOR_IMPORTACOES)
+            for t, n in zip(tipos, alterados):
+                self._conta(t, lidos=len(pendentes[t]), inseridos=n)
+        if pesagens:
+            self._conta(PESAGEM, inseridos=self.historico.registrar_lote(pesagens))
+
+
+def _tipo(linha):
+    # as linhas exportadas começam com {"tipo":"...": o tipo sai sem decodificar a linha inteira
+    if linha.startswith(_PREFIXO_TIPO):
+        fim = linha.find('"', len(_PREFIXO_TIPO))
+        if fim > 0:
+            return linha[len(_PREFIXO_TIPO):fim]
+    reg = json.loads(linha)
+    return reg["tipo"]
+
+
+_PREFIXO_TIPO = '{"tipo":"'
+
+
+@contextlib.contextmanager
+def _lendo(origem, gzipado):
+    # texto da origem; stream corrompido (gzip truncado, CSV malformado) vira ValueError, como o resto do
+    # arquivo inválido
+    try:
+        with _texto(origem, gzipado) as f:
+            yield f
+    except (gzip.BadGzipFile, EOFError, zlib.error, csv.Error) as e:
+        raise ValueError(f"arquivo corrompido ({e})") from None
+
+
+def importar_ndjson(repo, origem, historico=None, gzipado=None, lote=LOTE, usuario=None):
+    # -> {tipo: {"lidos", "inseridos"}}; linha que não é um objeto JSON com "tipo" levanta ValueError.
+    # usuario: só planos/itens desse usuário entram (importação pela API de quem não é admin)
+    imp = Importacao(repo, historico, lote, ndjson=True, usuario=usuario)
+    with _lendo(origem, gzipado) as f:
+        for n, linha in enumerate(f, 1):
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                tipo = _tipo(linha)
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                raise ValueError(f"linha {n}: registro inválido ({e})") from None
+            if tipo == "cabecalho":
+                cab = json.loads(linha)
+                if cab.get("formato") != FORMATO or cab.get("versao", 0) > VERSAO:
+                    raise ValueError(f"arquivo não é uma exportação compatível ({cab.get('formato')} v{cab.get('versao')})")
+                continue
+            imp.add(tipo, linha)
+    imp.flush()
+    return imp.stats
+
+
+def importar_csv(repo, tipo, origem, historico=None, gzipado=None, lote=LOTE, usuario=None):
+    # CSV de um tipo (cabeçalho com os nomes das colunas); colunas JSON chegam como texto JSON
+    tabela = TABELAS.get(tipo)
+    if tabela is None and tipo != PESAGEM:
+        raise ValueError(f"tipo desconhecido: {tipo}")
+    imp = Importacao(repo, historico, lote, usuario=usuario)
+    with _lendo(origem, gzipado) as f:
+        for row in csv.DictReader(f):
+            if tabela is not None:
+                row = {c: (json.loads(row[c]) if c in tabela.json and row.get(c) else (row.get(c) or None))
+                       for c in tabela.colunas}
+            imp.add(tipo, row)
+    imp.flush()
+    return imp.stats
@@ -0,0 +1,338 @@
+# services/feed.py — armazenamento indexado do feed (fotos + artigos)
+# Itens ficam em mapas id -> item; cada item recebe um seq crescente (ordem de inserção = ordem de created_at).
+# Os índices secundários guardam seqs já ordenados, e cada escopo (tudo, tipo, grupo) mantém também
+# uma lista ordenada por curtidas, então uma página custa O(log n + tamanho da página), sem ordenar o feed.
+# "Em alta" (ORDER_HOT) é um score com decaimento exponencial guardado em log e relativo a um instante fixo:
+# o decaimento com o passar do tempo é igual para todos os itens e não muda a ordem, então só a publicação
+# e cada curtida (somadas com logaddexp) atualizam a chave do item; nada é recalculado por rerun.
+# Concorrência (uma instância para todas as sessões): escritas nos índices e leituras das listas ordenadas
+# passam por um lock curto do próprio store; as listas por ordem de publicação só crescem no fim e são lidas
+# sem lock.
+import math
+import threading
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+from services.busca import IndiceBusca
+
+ORDER_RECENT = "recent"
+ORDER_LIKES = "likes"
+ORDER_HOT = "hot"
+HOT_HALF_LIFE_HOURS = 24   # uma curtida de ontem vale metade de uma de agora
+HOT_POST_WEIGHT = 3.0      # a publicação em si conta como 3 curtidas no instante em que saiu
+_HOT_EPOCH = datetime(2024, 1, 1).timestamp()
+_HOT_TAU = HOT_HALF_LIFE_HOURS * 3600 / math.log(2)
+SEARCH_TITLE_WEIGHT = 2.0  # termos do título/tags contam como 2 ocorrências no corpo
+SEARCH_TAGS_WEIGHT = 2.0
+
+
+class SortedKeys:
+    # lista ordenada em blocos: inserir/remover desloca só um bloco, não a lista inteira
+    CHUNK = 512
+
+    def __init__(self):
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def add(self, key):
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        i = min(bisect_left(self._maxes, key), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        insort(chunk, key)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * self.CHUNK:
+            self._chunks[i:i + 1] = [chunk[:self.CHUNK], chunk[self.CHUNK:]]
+            self._maxes[i:i + 1] = [chunk[self.CHUNK - 1], chunk[-1]]
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        chunk = self._chunks[i]
+        del chunk[bisect_left(chunk, key)]
+        self._len -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def after(self, key, limit):
+        # até `limit` chaves estritamente maiores que `key` (None = desde o início)
+        if key is None:
+            i, j = 0, 0
+        else:
+            i = bisect_right(self._maxes, key)
+            j = bisect_right(self._chunks[i], key) if i < len(self._chunks) else 0
+        out = []
+        while i < len(self._chunks) and len(out) < limit:
+            out.extend(self._chunks[i][j:j + limit - len(out)])
+            i, j = i + 1, 0
+        return out
+
+
+def _epoch(when):
+    if when is None:
+        return datetime.now().timestamp()
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    return when.timestamp()
+
+
+def hot_score(when, prev=None, weight=1.0):
+    # log(soma de peso × e^((t - epoch)/tau)); somar um evento a um score existente é logaddexp
+    x = (_epoch(when) - _HOT_EPOCH) / _HOT_TAU + math.log(weight)
+    if prev is None:
+        return x
+    return max(prev, x) + math.log1p(math.exp(-abs(prev - x)))
+
+
+class FeedStore:
+    def __init__(self):
+        self._items = {}      # feed_id -> {id, seq, type, author, created_at, likes, liked_by:set, data}
+        self._photos = {}     # photo_id -> {id, uploader, caption, image, created_at, group, feed_id}
+        self._order = []      # seq -> feed_id (do mais antigo ao mais recente)
+        self._by_type = {"photo": [], "article": []}  # tipo -> [seq]
+        self._by_group = {}   # grupo -> [seq] (apenas fotos; artigos não têm grupo)
+        self._by_author = {}  # autor -> [seq]
+        # combinações dos filtros, para nenhuma página filtrar uma lista inteira: (autor, tipo) e (grupo, autor)
+        self._by_author_type = {}   # (autor, tipo) -> [seq]
+        self._by_group_author = {}  # (grupo, autor) -> [seq]
+        # escopo -> SortedKeys de (-likes, -seq); escopos: None (tudo), ("type", t), ("group", g)
+        self._by_likes = {None: SortedKeys()}
+        self._by_hot = {None: SortedKeys()}  # idem, com (-hot, -seq)
+        # busca: seq -> título/tags/corpo dos artigos e legendas das fotos; alcança o feed na próxima busca
+        self._search = IndiceBusca()
+        self._search_lock = threading.Lock()
+        self._lock = threading.Lock()  # índices (seq, SortedKeys) e curtidas; nunca segurado durante IO
+
+    def __len__(self):
+        return len(self._items)
+
+    def _scopes(self, item, group):
+        scopes = [None, ("type", item["type"])]
+        if group:
+            scopes.append(("group", group))
+        return scopes
+
+    def _index(self, item, group=None):
+        with self._lock:
+            self._index_locked(item, group)
+
+    def _index_locked(self, item, group):
+        seq = len(self._order)
+        item["seq"] = seq
+        # _items antes de _order: quem lê pelo seq sempre encontra o item
+        self._items[item["id"]] = item
+        self._order.append(item["id"])
+        self._by_type[item["type"]].append(seq)
+        self._by_author.setdefault(item["author"], []).append(seq)
+        self._by_author_type.setdefault((item["author"], item["type"]), []).append(seq)
+        if group:
+            self._by_group.setdefault(group, []).append(seq)
+            self._by_group_author.setdefault((group, item["author"]), []).append(seq)
+        for scope in self._scopes(item, group):
+            # empates de curtidas ficam do mais recente para o mais antigo
+            self._by_likes.setdefault(scope, SortedKeys()).add((-item["likes"], -seq))
+            self._by_hot.setdefault(scope, SortedKeys()).add((-item["hot"], -seq))
+
+    def _search_fields(self, item):
+        data = item["data"]
+        if item["type"] == "photo":
+            photo = self._photos.get(data["photo_id"])
+            return [(photo["caption"] if photo else "", 1.0)]
+        return [(data.get("title") or "", SEARCH_TITLE_WEIGHT),
+                (" ".join(data.get("tags") or ()), SEARCH_TAGS_WEIGHT),
+                (data.get("body") or "", 1.0)]
+
+    def load(self, item, photo=None, likes=()):
+        # reidrata um item já persistido, mantendo id e created_at originais (itens chegam em ordem de criação);
+        # likes: [(usuário, created_at)]
+        item = dict(item, liked_by={user for user, _ in likes})
+        item["likes"] = len(item["liked_by"])
+        hot = hot_score(item["created_at"], weight=HOT_POST_WEIGHT)
+        for _, created_at in likes:
+            hot = hot_score(created_at, hot)
+        item["hot"] = hot
+        if photo:
+            self._photos[photo["id"]] = photo
+        self._index(item, photo["group"] if photo else None)
+        return item
+
+    def new_photo(self, uploader, caption, image, group=None):
+        # -> (item, foto) ainda fora do feed: o chamador persiste e depois publica com insert()
+        # image: referências do BlobStore (services/images.py), nunca os bytes
+        pid = str(uuid.uuid4())[:8]
+        created_at = datetime.now().isoformat()
+        item = {
+            "id": f"p-{pid}",
+            "type": "photo",
+            "author": uploader,
+            "created_at": created_at,
+            "likes": 0,
+            "liked_by": set(),
+            "hot": hot_score(created_at, weight=HOT_POST_WEIGHT),
+            "data": {"photo_id": pid}
+        }
+        # curtidas vivem só no item do feed; a foto aponta para ele
+        photo = {
+            "id": pid,
+            "uploader": uploader,
+            "caption": caption,
+            "image": image,
+            "created_at": created_at,
+            "group": group,
+            "feed_id": item["id"]
+        }
+        return item, photo
+
+    def new_article(self, title, body, author, tags=None):
+        aid = str(uuid.uuid4())[:8]
+        created_at = datetime.now().isoformat()
+        return {
+            "id": f"a-{aid}",
+            "type": "article",
+            "author": author,
+            "created_at": created_at,
+            "likes": 0,
+            "liked_by": set(),
+            "hot": hot_score(created_at, weight=HOT_POST_WEIGHT),
+            "data": {"title": title, "body": body, "tags": tags or []}
+        }
+
+    def insert(self, item, photo=None):
+        # publica um item criado por new_photo/new_article
+        if photo:
+            self._photos[photo["id"]] = photo
+        self._index(item, photo["group"] if photo else None)
+        return item["id"]
+
+    def add_photo(self, uploader, caption, image, group=None):
+        item, photo = self.new_photo(uploader, caption, image, group=group)
+        self.insert(item, photo)
+        return photo["id"]
+
+    def add_article(self, title, body, author, tags=None):
+        return self.insert(self.new_article(title, body, author, tags=tags))
+
+    def like(self, feed_id, user, when=None):
+        item = self._items.get(feed_id)
+        if item is None:
+            return False
+        photo = self.photo_of(item)
+        scopes = self._scopes(item, photo and photo["group"])
+        # verificar e curtir sob o mesmo lock: duas sessões curtindo ao mesmo tempo contam uma vez cada
+        with self._lock:
+            if user in item["liked_by"]:
+                return False
+            old, old_hot = item["likes"], item["hot"]
+            item["liked_by"].add(user)
+            item["likes"] = len(item["liked_by"])
+            item["hot"] = hot_score(when, old_hot)
+            for scope in scopes:
+                keys = self._by_likes[scope]
+                keys.remove((-old, -item["seq"]))
+                keys.add((-item["likes"], -item["seq"]))
+                keys = self._by_hot[scope]
+                keys.remove((-old_hot, -item["seq"]))
+                keys.add((-item["hot"], -item["seq"]))
+        return True
+
+    def get(self, feed_id):
+        return self._items.get(feed_id)
+
+    def photo(self, photo_id):
+        return self._photos.get(photo_id)
+
+    def photo_of(self, item):
+        if item["type"] != "photo":
+            return None
+        return self._photos.get(item["data"]["photo_id"])
+
+    def photo_likes(self, photo_id):
+        p = self._photos.get(photo_id)
+        return self._items[p["feed_id"]]["likes"] if p else 0
+
+    def groups(self):
+        return list(self._by_group.keys())
+
+    def _seqs(self, type_=None, group=None, author=None):
+        # a lista de seqs já pronta para a combinação de filtros: nada é copiado nem filtrado por página
+        if group is not None:
+            # grupos só têm fotos: type_ "photo" não filtra nada
+            if type_ == "article":
+                return []
+            if author is not None:
+                return self._by_group_author.get((group, author), [])
+            return self._by_group.get(group, [])
+        if author is not None:
+            if type_ is not None:
+                return self._by_author_type.get((author, type_), [])
+            return self._by_author.get(author, [])
+        if type_ is not None:
+            return self._by_type.get(type_, [])
+        return range(len(self._order))
+
+    def filter(self, type_=None, group=None, author=None):
+        # mais recentes primeiro
+        return [self._items[self._order[s]] for s in reversed(self._seqs(type_, group, author))]
+
+    def page(self, type_=None, group=None, order=ORDER_RECENT, cursor=None, limit=20):
+        # paginação por cursor: devolve (itens, próximo cursor); cursor None = primeira página,
+        # próximo cursor None = acabou. Para ORDER_RECENT o cursor é um seq, para ORDER_LIKES é (-likes, -seq)
+        # e para ORDER_HOT (-hot, -seq).
+        if group is not None and type_ == "article":
+            return [], None
+        if order in (ORDER_LIKES, ORDER_HOT):
+            scope = ("group", group) if group is not None else (("type", type_) if type_ else None)
+            keys = (self._by_likes if order == ORDER_LIKES else self._by_hot).get(scope)
+            if keys is None:
+                return [], None
+            with self._lock:  # um add()/remove() concorrente divide ou remove blocos
+                window = keys.after(None if cursor is None else tuple(cursor), limit + 1)
+            more = len(window) > limit
+            window = window[:limit]
+            items = [self._items[self._order[-neg_seq]] for _, neg_seq in window]
+            return items, (window[-1] if more else None)
+        seqs = self._seqs(type_, group)
+        end = len(seqs) if cursor is None else bisect_left(seqs, cursor)
+        start = max(0, end - limit)
+        items = [self._items[self._order[seqs[i]]] for i in range(end - 1, start - 1, -1)]
+        return items, (seqs[start] if start > 0 else None)
+
+    def _search_catch_up(self):
+        # indexa só o que foi publicado desde a última busca (na primeira, o feed hidratado inteiro:
+        # a carga do processo não paga pelo índice se ninguém buscar)
+        if len(self._search) == len(self._order):
+            return
+        with self._search_lock:
+            for seq in range(len(self._search), len(self._order)):
+                item = self._items[self._order[seq]]
+                photo = self.photo_of(item)
+                self._search.add(seq, self._search_fields(item),
+                                 escopos=self._scopes(item, photo and photo["group"])[1:])
+
+    def search(self, query, type_=None, group=None, cursor=None, limit=20):
+        # busca por relevância (BM25 sobre o índice invertido): devolve (itens, próximo cursor);
+        # o cursor é a quantidade de resultados já mostrados
+        if group is not None and type_ == "article":
+            return [], None
+        self._search_catch_up()
+        offset = cursor or 0
+        # grupo só tem fotos, então o escopo do grupo já cobre o filtro de tipo
+        scope = ("group", group) if group is not None else (("type", type_) if type_ is not None else None)
+        hits = self._search.buscar(query, limite=offset + limit + 1, escopo=scope)
+        window = hits[offset:offset + limit]
+        items = [self._items[self._order[seq]] for seq, _ in window]
+        return items, (offset + limit if len(hits) > offset + limit else None)
+
+    def photos(self, uploader=None):
+        seqs = self._seqs("photo", author=uploader)
+        return [self._photos[self._items[self._order[s]]["data"]["photo_id"]] for s in reversed(seqs)]
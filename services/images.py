@@ -0,0 +1,93 @@
+# services/images.py — pipeline de upload de imagens
+# A imagem é decodificada uma única vez no envio; geramos miniatura (galeria) e versão do feed,
+# e tudo vai para disco endereçado pelo sha256 do conteúdo. Sessão/feed guardam só as referências.
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image, ImageOps
+
+THUMB_SIZE = (320, 320)
+FEED_SIZE = (1080, 1080)
+THUMB_QUALITY = 75
+FEED_QUALITY = 82
+
+
+class BlobStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def put(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        self._write(self.path(digest), data)
+        return digest
+
+    def get(self, digest):
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def _write(self, path, data):
+        if os.path.exists(path):
+            return  # mesmo conteúdo já armazenado (dedup)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # manifesto: original -> renditions, para não decodificar de novo um envio repetido
+    def _manifest_path(self, digest):
+        return os.path.join(self.root, "meta", f"{digest}.json")
+
+    def manifest(self, digest):
+        try:
+            with open(self._manifest_path(digest), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_manifest(self, digest, refs):
+        self._write(self._manifest_path(digest), json.dumps(refs).encode("utf-8"))
+
+
+def _encode_jpeg(img, quality):
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def process_upload(image_bytes, store):
+    # retorna {"full", "feed", "thumb", "width", "height"}; full/feed/thumb são digests no BlobStore
+    full = hashlib.sha256(image_bytes).hexdigest()
+    refs = store.manifest(full)
+    if refs and all(store.exists(refs[k]) for k in ("full", "feed", "thumb")):
+        return refs
+
+    img = Image.open(io.BytesIO(image_bytes))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    width, height = img.size
+
+    feed_img = img.copy()
+    feed_img.thumbnail(FEED_SIZE)
+    thumb_img = feed_img.copy()
+    thumb_img.thumbnail(THUMB_SIZE)
+
+    refs = {
+        "full": store.put(image_bytes),
+        "feed": store.put(_encode_jpeg(feed_img, FEED_QUALITY)),
+        "thumb": store.put(_encode_jpeg(thumb_img, THUMB_QUALITY)),
+        "width": width,
+        "height": height,
+    }
+    store.save_manifest(full, refs)
+    return refs
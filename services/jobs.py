@@ -0,0 +1,138 @@
+# services/jobs.py — execução de gerações de plano em segundo plano
+# Um executor compartilhado pelo processo roda os geradores; a página só consulta o estado pelo id do job.
+# O limite de concorrência é o número de workers; jobs excedentes ficam na fila ("queued").
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+JOB_TTL_SECONDS = 3600  # jobs terminados e não coletados são descartados depois disso
+
+
+class Job:
+    __slots__ = ("id", "meta", "status", "progress", "items", "current_item", "result", "error",
+                 "created_at", "finished_at", "_cancel")
+
+    def __init__(self, meta=None, items=None):
+        self.id = str(uuid.uuid4())[:8]
+        self.meta = meta  # dados do chamador que precisam sobreviver a um refresh (ex.: cabeçalho do plano)
+        self.status = QUEUED
+        self.progress = 0
+        self.items = items if items is not None else []  # qualquer contêiner com extend/len/tail ou fatiamento
+        self.current_item = None
+        self.result = None  # último passo com dados extras do gerador (ex.: status do plano)
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def _recent(self, n):
+        items = self.items
+        return items.tail(n) if hasattr(items, "tail") else list(items[-n:])
+
+    def snapshot(self):
+        # leve: não copia os itens; o contêiner completo sai por JobManager.items()
+        return {
+            "id": self.id,
+            "meta": self.meta,
+            "status": self.status,
+            "progress": self.progress,
+            "item_count": len(self.items),
+            "recent_items": self._recent(3),
+            "current_item": self.current_item,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="plan-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, make_steps, *args, meta=None, items=None, cancel_arg=None, **kwargs):
+        # make_steps(*args, **kwargs) deve devolver um gerador de passos {"progress", "current_item", "new_items", ...};
+        # os itens novos de cada passo são acrescentados a `items` (lista por padrão).
+        # cancel_arg: nome do parâmetro de make_steps que recebe a checagem de cancelamento (callable sem argumentos),
+        # para o gerador parar também no meio de um passo longo; o gerador que desiste só termina (return)
+        job = Job(meta, items)
+        if cancel_arg:
+            kwargs[cancel_arg] = job._cancel.is_set
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, make_steps, args, kwargs)
+        return job.id
+
+    def _run(self, job, make_steps, args, kwargs):
+        if job.cancelled:
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        try:
+            for step in make_steps(*args, **kwargs):
+                if job.cancelled:
+                    self._finish(job, CANCELLED)
+                    return
+                job.progress = step["progress"]
+                job.current_item = step.get("current_item")
+                job.items.extend(step["new_items"])
+                job.result = {k: v for k, v in step.items() if k not in ("progress", "current_item", "new_items")}
+            self._finish(job, CANCELLED if job.cancelled else DONE)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED)
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+
+    def _purge(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for jid in [jid for jid, j in self._jobs.items() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[jid]
+
+    def _job(self, job_id):
+        # submit() apaga jobs vencidos de _jobs: leitura sob o mesmo lock
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get(self, job_id):
+        job = self._job(job_id)
+        return job.snapshot() if job else None
+
+    def items(self, job_id):
+        job = self._job(job_id)
+        return job.items if job else None
+
+    def cancel(self, job_id):
+        job = self._job(job_id)
+        if job is None or job.status in FINISHED:
+            return False
+        job._cancel.set()
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED)
+        return True
+
+    def release(self, job_id):
+        # a sessão já consumiu o resultado
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def active(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sum(1 for j in jobs if j.status in (QUEUED, RUNNING))
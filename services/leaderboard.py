@@ -0,0 +1,111 @@
+# services/leaderboard.py — ranking de grupos mantido incrementalmente (Competições)
+# Cada evento (foto, curtida, novo membro) atualiza contadores em O(log n) + um deslocamento da lista;
+# a leitura do top-K é só um fatiamento da lista já ordenada. Um lock próprio (curto, sem IO) protege
+# contadores e listas: o ranking é compartilhado por todas as sessões.
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+
+KEEP_DAYS = 14   # buckets diários mantidos
+KEEP_WEEKS = 8   # buckets semanais mantidos
+
+
+class RankedCounter:
+    def __init__(self):
+        self._counts = {}
+        self._ranked = []  # (-contagem, chave), sempre ordenada
+
+    def __len__(self):
+        return len(self._counts)
+
+    def incr(self, key, delta=1):
+        old = self._counts.get(key)
+        if old is not None:
+            del self._ranked[bisect_left(self._ranked, (-old, key))]
+        new = (old or 0) + delta
+        self._counts[key] = new
+        insort(self._ranked, (-new, key))
+        return new
+
+    def get(self, key):
+        return self._counts.get(key, 0)
+
+    def top(self, k=None):
+        return [(key, -neg) for neg, key in self._ranked[:k]]
+
+
+def day_bucket(when):
+    return when.date().isoformat()
+
+
+def week_bucket(when):
+    year, week, _ = when.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class Leaderboard:
+    def __init__(self):
+        self._groups = {}  # nome -> {"likes", "photos", "members"}
+        self._likes = RankedCounter()
+        self._windows = {"dia": {}, "semana": {}}  # janela -> bucket -> RankedCounter
+        self._lock = threading.Lock()
+
+    def __contains__(self, group):
+        return group in self._groups
+
+    def _add_group(self, group):
+        if group not in self._groups:
+            self._groups[group] = {"likes": 0, "photos": 0, "members": 0}
+            self._likes.incr(group, 0)
+
+    def add_group(self, group):
+        with self._lock:
+            self._add_group(group)
+
+    def add_member(self, group):
+        with self._lock:
+            self._add_group(group)
+            self._groups[group]["members"] += 1
+
+    def add_photo(self, group):
+        with self._lock:
+            self._add_group(group)
+            self._groups[group]["photos"] += 1
+
+    def add_like(self, group, when=None):
+        when = when or datetime.now()
+        with self._lock:
+            self._add_group(group)
+            self._groups[group]["likes"] = self._likes.incr(group)
+            self._bucket("dia", day_bucket(when), KEEP_DAYS).incr(group)
+            self._bucket("semana", week_bucket(when), KEEP_WEEKS).incr(group)
+
+    def _bucket(self, window, key, keep):
+        buckets = self._windows[window]
+        counter = buckets.get(key)
+        if counter is None:
+            counter = buckets[key] = RankedCounter()
+            # chaves ISO ordenam cronologicamente; descarta as mais antigas
+            for old in sorted(buckets)[:-keep]:
+                del buckets[old]
+        return counter
+
+    def stats(self, group):
+        with self._lock:
+            return dict(self._groups.get(group, {"likes": 0, "photos": 0, "members": 0}))
+
+    def top(self, k=None, window=None, now=None):
+        # window: None (geral), "semana" ou "dia" — nas janelas entram só grupos com curtidas no período
+        now = now or datetime.now()
+        with self._lock:
+            if window is None:
+                ranked = self._likes.top(k)
+            else:
+                key = day_bucket(now) if window == "dia" else week_bucket(now)
+                counter = self._windows[window].get(key)
+                ranked = counter.top(k) if counter else []
+            rows = []
+            for group, likes in ranked:
+                g = self._groups[group]
+                rows.append({"group": group, "likes": likes, "members": g["members"], "photos": g["photos"]})
+        return rows
@@ -0,0 +1,247 @@
+# services/metricas.py — instrumentação do app Streamlit: tempo de execução por página, reruns por causa e
+# tamanho aproximado de cada chave do st.session_state
+# Tudo é agregado no processo (histograma com baldes fixos, contadores) e gravado de tempos em tempos
+# num snapshot JSON; o endpoint /metrics da API Flask (outro processo) lê o snapshot e o expõe no formato
+# texto do Prometheus. Desligado, iniciar() devolve uma execução nula e nada é medido nem gravado.
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from collections import deque
+
+BUCKETS_SECONDS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_SECONDS = 10
+AMOSTRA_SESSAO_SECONDS = 10  # o tamanho do session_state é estimado no máximo uma vez por intervalo por sessão
+PREFIXO = "power_routine"
+CHAVE_AMOSTRA = "_metricas_amostra"  # última amostra da sessão, guardada no próprio session_state
+
+# compartilhados pelo processo (ou grandes demais para serem da sessão): não entram na conta
+_NAO_CONTAR = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+               threading.Thread, logging.Logger, logging.Handler, type(threading.Lock()))
+
+_local = threading.local()  # cada sessão roda o script na sua própria thread
+
+
+class Execucao:
+    __slots__ = ("_metricas", "pagina", "inicio", "_encerrada")
+
+    def __init__(self, metricas, pagina):
+        self._metricas = metricas
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self._encerrada = False
+
+    def encerrar(self, rerun=None):
+        # chamado no fim do script ou antes de um rerun (que interrompe o script com uma exceção)
+        if self._encerrada:
+            return
+        self._encerrada = True
+        if getattr(_local, "execucao", None) is self:
+            del _local.execucao
+        self._metricas._registrar(self.pagina, time.perf_counter() - self.inicio, rerun)
+
+
+class _ExecucaoNula:
+    __slots__ = ()
+    pagina = None
+
+    def __setattr__(self, name, value):
+        pass
+
+    def encerrar(self, rerun=None):
+        pass
+
+
+EXECUCAO_NULA = _ExecucaoNula()
+
+
+class Metricas:
+    def __init__(self, habilitado=True, arquivo=None, flush_seconds=FLUSH_SECONDS):
+        self.habilitado = habilitado
+        self.arquivo = arquivo
+        self.flush_seconds = flush_seconds
+        self._tempos = {}      # página -> [contagens por balde..., +Inf], soma
+        self._reruns = {}      # (página, causa) -> n
+        self._sessao = {}      # chave -> [último, máximo] em bytes
+        self._lock = threading.Lock()
+        self._ultimo_flush = 0.0
+
+    # ---------- execuções ----------
+    def iniciar(self, pagina=None):
+        if not self.habilitado:
+            return EXECUCAO_NULA
+        _local.execucao = ex = Execucao(self, pagina)
+        return ex
+
+    def atual(self):
+        return getattr(_local, "execucao", None) or EXECUCAO_NULA
+
+    def _registrar(self, pagina, segundos, rerun):
+        pagina = pagina or "?"
+        with self._lock:
+            entrada = self._tempos.get(pagina)
+            if entrada is None:
+                entrada = self._tempos[pagina] = [[0] * (len(BUCKETS_SECONDS) + 1), 0.0]
+            baldes = entrada[0]
+            for i, limite in enumerate(BUCKETS_SECONDS):
+                if segundos <= limite:
+                    baldes[i] += 1
+                    break
+            else:
+                baldes[-1] += 1
+            entrada[1] += segundos
+            if rerun:
+                self._reruns[(pagina, rerun)] = self._reruns.get((pagina, rerun), 0) + 1
+        self.flush()
+
+    # ---------- sessão ----------
+    def amostrar_sessao(self, state, agora=None):
+        # -> {chave: bytes} desta sessão; reaproveita a última amostra se ela é recente. None se desligado
+        if not self.habilitado:
+            return None
+        agora = time.time() if agora is None else agora
+        ultima = state.get(CHAVE_AMOSTRA)
+        if ultima and agora - ultima["ts"] < AMOSTRA_SESSAO_SECONDS:
+            return ultima["tamanhos"]
+        tamanhos = tamanhos_sessao(state)
+        state[CHAVE_AMOSTRA] = {"ts": agora, "tamanhos": tamanhos}
+        with self._lock:
+            for chave, n in tamanhos.items():
+                atual = self._sessao.get(chave)
+                if atual is None:
+                    self._sessao[chave] = [n, n]
+                else:
+                    atual[0], atual[1] = n, max(atual[1], n)
+        return tamanhos
+
+    # ---------- leitura / exportação ----------
+    def snapshot(self):
+        with self._lock:
+            return {
+                "ts": time.time(),
+                "buckets": list(BUCKETS_SECONDS),
+                "page_runs": {p: {"buckets": list(b), "sum": s} for p, (b, s) in self._tempos.items()},
+                "reruns": [[p, c, n] for (p, c), n in self._reruns.items()],
+                "session_bytes": {k: list(v) for k, v in self._sessao.items()},
+            }
+
+    def flush(self, forcar=False):
+        # grava o snapshot (troca atômica do arquivo) no máximo a cada flush_seconds
+        if not self.arquivo:
+            return False
+        agora = time.monotonic()
+        if not forcar and agora - self._ultimo_flush < self.flush_seconds:
+            return False
+        self._ultimo_flush = agora
+        if os.path.dirname(self.arquivo):
+            os.makedirs(os.path.dirname(self.arquivo), exist_ok=True)
+        tmp = f"{self.arquivo}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, self.arquivo)
+        return True
+
+
+# ---------- tamanho aproximado ----------
+def tamanho_aprox(obj):
+    # sys.getsizeof recursivo (contêineres, __dict__/__slots__); arrays NumPy e objetos pandas pelo buffer
+    vistos = set()
+    total = 0
+    pilha = [obj]
+    while pilha:
+        o = pilha.pop()
+        if id(o) in vistos or isinstance(o, _NAO_CONTAR):
+            continue
+        vistos.add(id(o))
+        if hasattr(o, "dtype") and hasattr(o, "nbytes") and not hasattr(o, "index"):
+            total += sys.getsizeof(o)  # ndarray: inclui o buffer quando é dono dele; views contam só o cabeçalho
+            continue
+        memory_usage = getattr(o, "memory_usage", None)
+        if callable(memory_usage) and hasattr(o, "index"):  # DataFrame / Series
+            uso = memory_usage(deep=True)
+            total += int(uso.sum() if hasattr(uso, "sum") else uso)
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(o, dict):
+            pilha.extend(o.keys())
+            pilha.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            pilha.extend(o)
+        else:
+            d = getattr(o, "__dict__", None)
+            if d is not None:
+                pilha.append(d)
+            for cls in type(o).__mro__:
+                for nome in getattr(cls, "__slots__", ()):
+                    if isinstance(nome, str) and hasattr(o, nome):
+                        pilha.append(getattr(o, nome))
+    return total
+
+
+def tamanhos_sessao(state):
+    tamanhos = {}
+    for chave in list(state.keys()):
+        if chave == CHAVE_AMOSTRA:
+            continue
+        try:
+            tamanhos[str(chave)] = tamanho_aprox(state[chave])
+        except (KeyError, RuntimeError):  # chave removida ou contêiner alterado por outra thread no meio
+            continue
+    return tamanhos
+
+
+# ---------- Prometheus ----------
+def _label(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _num(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def prometheus(snapshot):
+    # formato de exposição em texto (version 0.0.4)
+    linhas = []
+    if not snapshot:
+        return ""
+    nome = f"{PREFIXO}_page_run_seconds"
+    linhas += [f"# HELP {nome} Tempo de execução do script app.py por página.", f"# TYPE {nome} histogram"]
+    limites = snapshot["buckets"]
+    for pagina, h in sorted(snapshot["page_runs"].items()):
+        p = _label(pagina)
+        acumulado = 0
+        for limite, n in zip(limites, h["buckets"]):
+            acumulado += n
+            linhas.append(f'{nome}_bucket{{page="{p}",le="{_num(limite)}"}} {acumulado}')
+        acumulado += h["buckets"][-1]
+        linhas.append(f'{nome}_bucket{{page="{p}",le="+Inf"}} {acumulado}')
+        linhas.append(f'{nome}_sum{{page="{p}"}} {_num(h["sum"])}')
+        linhas.append(f'{nome}_count{{page="{p}"}} {acumulado}')
+    nome = f"{PREFIXO}_reruns_total"
+    linhas += [f"# HELP {nome} Reruns pedidos pelo app, por página e causa.", f"# TYPE {nome} counter"]
+    for pagina, causa, n in sorted(snapshot["reruns"]):
+        linhas.append(f'{nome}{{page="{_label(pagina)}",cause="{_label(causa)}"}} {n}')
+    for sufixo, i, ajuda in (("bytes", 0, "Tamanho estimado da chave no st.session_state (última amostra)."),
+                             ("max_bytes", 1, "Maior tamanho estimado já amostrado da chave no st.session_state.")):
+        nome = f"{PREFIXO}_session_state_{sufixo}"
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} gauge"]
+        for chave, valores in sorted(snapshot["session_bytes"].items()):
+            linhas.append(f'{nome}{{key="{_label(chave)}"}} {valores[i]}')
+    nome = f"{PREFIXO}_metrics_snapshot_timestamp_seconds"
+    linhas += [f"# HELP {nome} Quando o app gravou este snapshot.", f"# TYPE {nome} gauge",
+               f"{nome} {_num(snapshot['ts'])}"]
+    return "\n".join(linhas) + "\n"
+
+
+def carregar(path):
+    # snapshot gravado pelo app; None se ainda não existe
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,37 @@
+# services/mudancas.py — barramento local de mudanças da comunidade (pub/sub por contadores de versão)
+# A Community publica cada mudança num tópico (item novo no feed, curtida, grupo criado/membro novo, ranking);
+# cada tópico tem um contador e, opcionalmente, contadores por chave (o nome do grupo: conjunto limitado).
+# Quem assina guarda só as versões que já viu — uma tupla curta na sessão — e compara com versoes():
+# a página só refaz o trabalho do painel quando alguma versão observada avançou.
+import threading
+import uuid
+
+FEED = "feed"          # item novo (chave: grupo da foto)
+CURTIDAS = "curtidas"  # curtida nova (chave: grupo da foto curtida)
+GRUPOS = "grupos"      # grupo criado ou membro novo (chave: nome do grupo)
+RANKING = "ranking"    # qualquer mudança nos números do ranking de grupos
+
+
+class BarramentoMudancas:
+    def __init__(self):
+        self._versoes = {}  # tópico ou (tópico, chave) -> int
+        self._lock = threading.Lock()
+        # identifica a instância: versões vistas numa instância anterior (cache limpo) não se comparam com estas
+        self.origem = uuid.uuid4().hex[:8]
+
+    def publicar(self, topico, *chaves):
+        # -> nova versão do tópico
+        with self._lock:
+            versao = self._versoes[topico] = self._versoes.get(topico, 0) + 1
+            for chave in chaves:
+                if chave is not None:
+                    k = (topico, chave)
+                    self._versoes[k] = self._versoes.get(k, 0) + 1
+        return versao
+
+    def versao(self, topico, chave=None):
+        return self._versoes.get(topico if chave is None else (topico, chave), 0)
+
+    def versoes(self, assinatura):
+        # assinatura: tópicos e/ou (tópico, chave) -> (origem, versões...), comparável com a última vista
+        return (self.origem, *(self._versoes.get(k, 0) for k in assinatura))
@@ -0,0 +1,154 @@
+# services/notificacoes.py — alertas de inatividade (RN-015) a partir de um índice de última atividade
+# Atividades (check-off de itens, fotos, pesagens) só atualizam um dict usuário -> último instante.
+# Um heap guarda no máximo uma entrada por usuário ainda não alertado, com um instante <= o real; a
+# varredura só olha o topo do heap: entrada vencida com atividade mais nova é reagendada, entrada
+# realmente vencida vira notificação. Custo por varredura ~ usuários que cruzaram o limite, não o total.
+import heapq
+import threading
+import time
+import uuid
+
+LIMITE_INATIVIDADE_DIAS = 14
+DIA_SECONDS = 86400
+INTERVALO_VARREDURA_SECONDS = 60
+PERSISTIR_A_CADA_SECONDS = 60  # atividades do mesmo usuário mais próximas que isso não vão ao banco
+TIPO_INATIVIDADE = "inatividade"
+
+
+class MotorNotificacoes:
+    def __init__(self, repo=None, limite_dias=LIMITE_INATIVIDADE_DIAS):
+        self.repo = repo
+        self.limite = limite_dias * DIA_SECONDS
+        self._ultima = {}        # usuário -> epoch da última atividade
+        self._persistida = {}    # usuário -> último epoch gravado no repositório
+        self._heap = []          # (epoch, usuário)
+        self._alertados = set()  # usuários já notificados pela inatividade atual (sem entrada no heap)
+        self._pendentes = {}     # usuário -> [notificação não lida]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if repo is not None:
+            self._load()
+
+    def _load(self):
+        for user, last_at, alerted in self.repo.load_activity():
+            self._ultima[user] = self._persistida[user] = last_at
+            if alerted:
+                self._alertados.add(user)
+            else:
+                self._heap.append((last_at, user))
+        heapq.heapify(self._heap)
+        for n in self.repo.pending_notifications():
+            self._pendentes.setdefault(n["user"], []).append(n)
+
+    def __len__(self):
+        return len(self._ultima)
+
+    # ---------- entrada ----------
+    def registrar_atividade(self, user, quando=None, origem=None):
+        if not user:
+            return
+        quando = time.time() if quando is None else quando
+        resolvidas = []
+        with self._lock:
+            anterior = self._ultima.get(user)
+            if anterior is not None and quando <= anterior:
+                return
+            self._ultima[user] = quando
+            if anterior is None or user in self._alertados:
+                # sem entrada no heap: volta a ser vigiado
+                self._alertados.discard(user)
+                heapq.heappush(self._heap, (quando, user))
+                resolvidas = self._resolver(user)
+            persistir = quando - self._persistida.get(user, float("-inf")) >= PERSISTIR_A_CADA_SECONDS \
+                or bool(resolvidas)
+            if persistir:
+                self._persistida[user] = quando
+        if self.repo is not None:
+            if persistir:
+                self.repo.record_activity(user, quando, origem)
+            if resolvidas:
+                self.repo.mark_notifications_read(resolvidas, quando)
+
+    def _resolver(self, user):
+        # o usuário voltou: alertas de inatividade pendentes deixam de valer
+        pend = self._pendentes.get(user)
+        if not pend:
+            return []
+        ids = [n["id"] for n in pend if n["kind"] == TIPO_INATIVIDADE]
+        resto = [n for n in pend if n["kind"] != TIPO_INATIVIDADE]
+        if resto:
+            self._pendentes[user] = resto
+        else:
+            del self._pendentes[user]
+        return ids
+
+    # ---------- varredura ----------
+    def varrer(self, agora=None):
+        # devolve as notificações novas desta varredura
+        agora = time.time() if agora is None else agora
+        corte = agora - self.limite
+        novas = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= corte:
+                _, user = heapq.heappop(heap)
+                ultima = self._ultima[user]
+                if ultima > corte:
+                    heapq.heappush(heap, (ultima, user))  # teve atividade depois: reagenda
+                    continue
+                self._alertados.add(user)
+                dias = int((agora - ultima) // DIA_SECONDS)
+                n = {
+                    "id": uuid.uuid4().hex[:12],
+                    "user": user,
+                    "kind": TIPO_INATIVIDADE,
+                    "rule": "RN-015",
+                    "message": f"Inatividade detectada ({dias} dias sem registros). Que tal um treino leve hoje?",
+                    "created_at": agora,
+                    "last_activity": ultima,
+                }
+                self._pendentes.setdefault(user, []).append(n)
+                novas.append(n)
+        if novas and self.repo is not None:
+            self.repo.add_notifications(novas)
+        return novas
+
+    def iniciar(self, intervalo=INTERVALO_VARREDURA_SECONDS):
+        # varredura periódica numa thread daemon (uma por processo)
+        if self._thread is not None:
+            return
+        def loop():
+            while not self._stop.is_set():
+                self.varrer()
+                self._stop.wait(intervalo)
+        self._thread = threading.Thread(target=loop, name="notificacoes", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # ---------- leitura (página) ----------
+    def ultima_atividade(self, user):
+        with self._lock:
+            return self._ultima.get(user)
+
+    def pendentes(self, user):
+        with self._lock:
+            return list(self._pendentes.get(user, ()))
+
+    def marcar_lidas(self, user, ids=None):
+        with self._lock:
+            pend = self._pendentes.get(user, [])
+            lidas = [n["id"] for n in pend if ids is None or n["id"] in ids]
+            resto = [n for n in pend if n["id"] not in lidas]
+            if resto:
+                self._pendentes[user] = resto
+            else:
+                self._pendentes.pop(user, None)
+        if lidas and self.repo is not None:
+            self.repo.mark_notifications_read(lidas, time.time())
+        return len(lidas)
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 
 def tmb_mifflin(altura_cm, peso_kg, idade, sexo="M"):
     if sexo == "M":
@@ -37,3 +39,98 @@ def alertas_dieta(calorias_base, calorias_alvo, carbo_pct, fibras_pct=30):
     if fibras_pct < 30:
         msgs.append("⚠️ Baixa ingestão de fibras (< 30% do recomendado) (RN-016).")
     return msgs
+
+
+# ---------- versões em lote (NumPy) ----------
+# Mesmas fórmulas e mesma ordem de operações das versões escalares, sobre colunas inteiras: cada linha
+# sai idêntica à chamada escalar. objetivo/sexo são fatorados (pd.factorize) e só os valores distintos
+# passam pelas regras de texto.
+OBJ_MANUTENCAO, OBJ_CUTTING, OBJ_BULKING = 0, 1, 2
+FATOR_KCAL = np.array([1.0, 0.85, 1.10])
+DIVISAO_MACROS = np.array([[0.30, 0.45, 0.25],   # (proteína, carbo, gordura) por código de objetivo
+                           [0.30, 0.40, 0.30],
+                           [0.25, 0.50, 0.25]])
+
+def _codigos(valores, regra):
+    # colunas categóricas já trazem os códigos; texto solto é fatorado aqui (o passo mais caro do lote)
+    if isinstance(valores, pd.Series):
+        valores = valores.array if isinstance(valores.dtype, pd.CategoricalDtype) else valores.to_numpy()
+    if isinstance(valores, pd.Categorical):
+        # código -1 (ausente) cai no último elemento: a regra aplicada a None
+        por_unico = np.array([regra(v) for v in valores.categories] + [regra(None)], dtype=np.int64)
+        return por_unico[valores.codes]
+    valores = np.asarray(valores, dtype=object)
+    codigos, unicos = pd.factorize(valores.ravel(), use_na_sentinel=False)
+    por_unico = np.array([regra(v) for v in unicos], dtype=np.int64)
+    return por_unico[codigos].reshape(valores.shape)
+
+def _regra_objetivo(v):
+    v = str(v).lower()
+    if v == "cutting":
+        return OBJ_CUTTING
+    if v == "bulking":
+        return OBJ_BULKING
+    return OBJ_MANUTENCAO
+
+def codigos_objetivo(objetivo):
+    return _codigos(objetivo, _regra_objetivo)
+
+def _trunc_int(x):
+    # int() da versão escalar: trunca em direção a zero; NaN/inf dá ValueError como int(nan), não lixo no int64
+    x = np.asarray(x)
+    if not np.isfinite(x).all():
+        raise ValueError("valor ausente (NaN) ou infinito nas entradas")
+    return np.trunc(x).astype(np.int64)
+
+def _kcal_alvo(tmb, codigos):
+    return _trunc_int(np.asarray(tmb, dtype=np.float64) * FATOR_KCAL[codigos])
+
+def _macros(calorias, codigos):
+    divisao = DIVISAO_MACROS[codigos]
+    calorias = np.asarray(calorias)
+    return {
+        "proteina_kcal": _trunc_int(calorias*divisao[..., 0]),
+        "carbo_kcal": _trunc_int(calorias*divisao[..., 1]),
+        "gordura_kcal": _trunc_int(calorias*divisao[..., 2]),
+        "carbo_pct": _trunc_int(divisao[..., 1]*100),
+    }
+
+def tmb_mifflin_lote(altura_cm, peso_kg, idade, sexo="M"):
+    masc = sexo == "M" if isinstance(sexo, str) else _codigos(sexo, lambda v: int(v == "M")).astype(bool)
+    base = 10*np.asarray(peso_kg) + 6.25*np.asarray(altura_cm) - 5*np.asarray(idade)
+    return base + np.where(masc, 5, -161)
+
+def calorias_alvo_lote(tmb, objetivo):
+    return _kcal_alvo(tmb, codigos_objetivo(objetivo))
+
+def macros_por_objetivo_lote(calorias, objetivo):
+    return _macros(calorias, codigos_objetivo(objetivo))
+
+def alertas_dieta_lote(calorias_base, calorias_alvo, carbo_pct, fibras_pct=30):
+    # uma coluna booleana por mensagem de alertas_dieta
+    calorias_base = np.asarray(calorias_base)
+    deficit = (calorias_base - np.asarray(calorias_alvo)) / np.maximum(calorias_base, 1)
+    return {
+        "alerta_rn020": deficit > 0.30,
+        "alerta_rn018": np.asarray(carbo_pct) > 50,
+        "alerta_rn016": np.broadcast_to(np.asarray(fibras_pct) < 30, deficit.shape),
+    }
+
+def metas_lote(altura_cm, peso_kg, idade, sexo, objetivo, fibras_pct=30):
+    # o cálculo da página Dieta (TMB -> kcal alvo -> macros -> gramas -> alertas) para colunas inteiras
+    codigos = codigos_objetivo(objetivo)
+    tmb = tmb_mifflin_lote(altura_cm, peso_kg, idade, sexo)
+    kcal = _kcal_alvo(tmb, codigos)
+    mac = _macros(kcal, codigos)
+    metas = {"tmb": tmb, "kcal_alvo": kcal, **mac,
+             "proteina_g": mac["proteina_kcal"] // 4,
+             "carbo_g": mac["carbo_kcal"] // 4,
+             "gordura_g": mac["gordura_kcal"] // 9}
+    metas.update(alertas_dieta_lote(_trunc_int(tmb), kcal, mac["carbo_pct"], fibras_pct))
+    return metas
+
+def metas_dataframe(df, fibras_pct=30):
+    # colunas altura_cm, peso_kg, idade, sexo, objetivo -> DataFrame de metas com o mesmo índice
+    # (sexo/objetivo como "category" evitam a fatoração do texto)
+    return pd.DataFrame(metas_lote(df["altura_cm"].to_numpy(), df["peso_kg"].to_numpy(), df["idade"].to_numpy(),
+                                   df["sexo"], df["objetivo"], fibras_pct), index=df.index)
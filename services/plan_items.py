@@ -0,0 +1,140 @@
+# services/plan_items.py — itens de plano em colunas compactas
+# Cada campo numérico é um array tipado, nomes de alimento/refeição são internados, "done" é um bitmap
+# e o total concluído é mantido a cada alteração (sem recontar os itens a cada rerun).
+from array import array
+
+NUMERIC_FIELDS = ("portion_g", "kcal", "protein_g", "carbs_g", "fats_g")
+
+
+def _num(value):
+    return int(value) if float(value).is_integer() else round(value, 1)
+
+
+class PlanItems:
+    __slots__ = ("_day", "_meal", "_food", "_nums", "_meal_names", "_meal_ids", "_food_names", "_food_ids",
+                 "_done", "_len", "done_count")
+
+    def __init__(self, items=()):
+        self._day = array("H")
+        self._meal = array("H")   # índice em _meal_names
+        self._food = array("I")   # índice em _food_names
+        self._nums = {f: array("f") for f in NUMERIC_FIELDS}
+        self._meal_names, self._meal_ids = [], {}
+        self._food_names, self._food_ids = [], {}
+        self._done = bytearray()
+        self._len = 0
+        self.done_count = 0
+        self.extend(items)
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    @staticmethod
+    def _intern(value, names, ids):
+        idx = ids.get(value)
+        if idx is None:
+            idx = ids[value] = len(names)
+            names.append(value)
+        return idx
+
+    def append(self, item):
+        i = self._len
+        self._day.append(int(item["day"]))
+        self._meal.append(self._intern(item["meal_name"], self._meal_names, self._meal_ids))
+        self._food.append(self._intern(item["food_name"], self._food_names, self._food_ids))
+        for f in NUMERIC_FIELDS:
+            self._nums[f].append(float(item.get(f) or 0.0))
+        if i % 8 == 0:
+            self._done.append(0)
+        self._len += 1
+        if item.get("done"):
+            self.set_done(i, True)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def is_done(self, i):
+        return bool(self._done[i >> 3] & (1 << (i & 7)))
+
+    def set_done(self, i, value=True):
+        # devolve True se o estado mudou
+        if self.is_done(i) == bool(value):
+            return False
+        self._done[i >> 3] ^= 1 << (i & 7)
+        self.done_count += 1 if value else -1
+        return True
+
+    def set_done_where(self, day=None, meal_name=None, value=True):
+        # marca/desmarca em bloco por dia e/ou refeição; devolve os índices que mudaram
+        meal = self._meal_ids.get(meal_name) if meal_name is not None else None
+        if meal_name is not None and meal is None:
+            return []
+        changed = []
+        for i in range(self._len):
+            if day is not None and self._day[i] != day:
+                continue
+            if meal is not None and self._meal[i] != meal:
+                continue
+            if self.set_done(i, value):
+                changed.append(i)
+        return changed
+
+    def mark_all(self, value=True):
+        full, rest = divmod(self._len, 8)
+        self._done = bytearray([0xFF if value else 0]) * full
+        if rest:
+            self._done.append(((1 << rest) - 1) if value else 0)
+        self.done_count = self._len if value else 0
+
+    def pct_done(self):
+        return int(self.done_count / self._len * 100) if self._len else 0
+
+    def days(self):
+        return sorted(set(self._day))
+
+    def meal_names(self):
+        return list(self._meal_names)
+
+    def done_flags(self):
+        return [self.is_done(i) for i in range(self._len)]
+
+    def to_columns(self):
+        # colunas prontas para um DataFrame, sem passar por um dict por item
+        cols = {
+            "day": list(self._day),
+            "meal_name": [self._meal_names[m] for m in self._meal],
+            "food_name": [self._food_names[f] for f in self._food],
+        }
+        for f in NUMERIC_FIELDS:
+            cols[f] = [_num(v) for v in self._nums[f]]
+        cols["done"] = self.done_flags()
+        return cols
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        item = {
+            "day": self._day[i],
+            "meal_name": self._meal_names[self._meal[i]],
+            "food_name": self._food_names[self._food[i]],
+        }
+        for f in NUMERIC_FIELDS:
+            item[f] = _num(self._nums[f][i])
+        item["done"] = self.is_done(i)
+        return item
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self[i]
+
+    def tail(self, n):
+        return [self[i] for i in range(max(0, self._len - n), self._len)]
+
+    def to_dicts(self):
+        return list(self)
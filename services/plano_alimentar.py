@@ -0,0 +1,198 @@
+# services/plano_alimentar.py — gerador de plano alimentar sobre o catálogo de alimentos (models.Food)
+# O catálogo vira arrays NumPy (valores por 100 g) e a escolha de alimentos/porções é resolvida em lote
+# para todos os dias × refeições; só as restrições de variedade percorrem os dias, e sobre matrizes pequenas.
+import numpy as np
+
+from services.nutri import macros_por_objetivo
+
+ALIMENTOS_POR_REFEICAO = 2
+JANELA_VARIEDADE = 2        # mesmo alimento não se repete na mesma refeição dentro desta janela de dias
+PORCAO_MIN_G = 30
+PORCAO_MAX_G = 400
+PENALIDADE_REPETICAO = 1e6  # finita: com catálogo pequeno ainda dá para escolher algo
+PENALIDADE_MESMO_DIA = 5.0
+PENALIDADE_OUTRO_DIA = 1.0  # alimento de dias recentes em qualquer refeição
+RUIDO = 0.05                # desempate aleatório entre candidatos parecidos
+
+# nome, kcal, proteína, carboidrato, gordura (por 100 g)
+CATALOGO_PADRAO = [
+    ("Peito de frango grelhado", 165, 31.0, 0.0, 3.6),
+    ("Patinho moído", 219, 35.9, 0.0, 7.3),
+    ("Tilápia assada", 128, 26.0, 0.0, 2.7),
+    ("Salmão grelhado", 208, 20.0, 0.0, 13.0),
+    ("Ovo cozido", 146, 13.3, 0.6, 9.5),
+    ("Clara de ovo", 52, 10.9, 0.7, 0.2),
+    ("Iogurte natural", 61, 3.5, 4.7, 3.3),
+    ("Queijo cottage", 98, 11.1, 3.4, 4.3),
+    ("Whey protein", 400, 80.0, 8.0, 6.0),
+    ("Tofu", 76, 8.0, 1.9, 4.8),
+    ("Arroz branco cozido", 128, 2.5, 28.1, 0.2),
+    ("Arroz integral cozido", 124, 2.6, 25.8, 1.0),
+    ("Feijão carioca cozido", 76, 4.8, 13.6, 0.5),
+    ("Lentilha cozida", 93, 6.3, 16.3, 0.5),
+    ("Batata-doce cozida", 77, 0.6, 18.4, 0.1),
+    ("Mandioca cozida", 125, 0.6, 30.1, 0.3),
+    ("Macarrão integral cozido", 124, 5.3, 26.5, 0.5),
+    ("Pão integral", 253, 9.4, 49.9, 3.7),
+    ("Aveia em flocos", 394, 13.9, 66.6, 8.5),
+    ("Tapioca", 240, 0.0, 60.0, 0.0),
+    ("Banana", 98, 1.3, 26.0, 0.1),
+    ("Maçã", 56, 0.3, 15.2, 0.0),
+    ("Mamão", 40, 0.5, 10.4, 0.1),
+    ("Brócolis cozido", 25, 2.1, 4.4, 0.5),
+    ("Salada verde", 15, 1.2, 2.5, 0.2),
+    ("Cenoura crua", 34, 1.3, 7.7, 0.2),
+    ("Abacate", 96, 1.2, 6.0, 8.4),
+    ("Azeite de oliva", 884, 0.0, 0.0, 100.0),
+    ("Pasta de amendoim", 588, 25.0, 20.0, 50.0),
+    ("Castanha-do-pará", 643, 14.5, 15.1, 63.5),
+    ("Leite desnatado", 35, 3.4, 4.9, 0.1),
+    ("Granola", 421, 10.0, 65.0, 14.0),
+]
+
+
+class Catalogo:
+    __slots__ = ("nomes", "kcal", "macros")
+
+    def __init__(self, nomes, kcal, proteina, carbo, gordura):
+        self.nomes = list(nomes)
+        self.kcal = np.asarray(kcal, dtype=np.float64)
+        self.macros = np.column_stack([proteina, carbo, gordura]).astype(np.float64)  # (n, 3) g/100 g
+
+    def __len__(self):
+        return len(self.nomes)
+
+    @classmethod
+    def de_linhas(cls, linhas):
+        linhas = [l for l in linhas if l[1] > 0]
+        nomes, kcal, p, c, g = zip(*linhas) if linhas else ([], [], [], [], [])
+        return cls(nomes, kcal, p, c, g)
+
+    @classmethod
+    def de_foods(cls, foods):
+        # foods: iterável de models.Food
+        return cls.de_linhas([(f.name, f.calories, f.protein or 0.0, f.carbs or 0.0, f.fats or 0.0) for f in foods])
+
+
+def catalogo_padrao():
+    return Catalogo.de_linhas(CATALOGO_PADRAO)
+
+
+def metas_por_refeicao(target_calories, meals_per_day, objetivo):
+    # kcal e gramas de (proteína, carbo, gordura) por refeição, a partir da divisão de nutri.macros_por_objetivo
+    mac = macros_por_objetivo(target_calories, objetivo)
+    gramas = np.array([mac["proteina_kcal"] / 4, mac["carbo_kcal"] / 4, mac["gordura_kcal"] / 9])
+    return target_calories / meals_per_day, gramas / meals_per_day
+
+
+def resolver_plano(catalogo, target_calories, days, meals_per_day, objetivo="Manutenção",
+                   alimentos_por_refeicao=ALIMENTOS_POR_REFEICAO, janela=JANELA_VARIEDADE, seed=None, cancelado=None):
+    # devolve (escolhas, porcoes): arrays (days, meals, k) com índice do alimento e gramas;
+    # None se cancelado() (checado a cada dia de cada passo) ficar verdadeiro no meio da resolução
+    if len(catalogo) == 0:
+        raise ValueError("Catálogo de alimentos vazio.")
+    rng = np.random.default_rng(seed)
+    k = alimentos_por_refeicao
+    kcal_ref, macro_ref = metas_por_refeicao(target_calories, meals_per_day, objetivo)
+    escala = np.maximum(macro_ref, 1.0)
+    kcal_g = catalogo.kcal / 100.0                  # (n,)
+    macro_g = catalogo.macros / 100.0               # (n, 3)
+
+    shape = (days, meals_per_day)
+    restante_kcal = np.full(shape, kcal_ref)
+    restante_macro = np.broadcast_to(macro_ref, shape + (3,)).copy()
+    escolhas = np.zeros(shape + (k,), dtype=np.int64)
+    porcoes = np.zeros(shape + (k,))
+    meal_idx = np.arange(meals_per_day)
+
+    for passo in range(k):
+        # 1) pontuação em lote para todos os dias × refeições × alimentos
+        cota = restante_kcal / (k - passo)                                          # kcal que este alimento deve cobrir
+        g = np.clip(cota[..., None] / kcal_g, PORCAO_MIN_G, PORCAO_MAX_G)          # (d, m, n)
+        fracao = (cota / np.maximum(restante_kcal, 1e-9))[..., None]                # parte do restante de macros
+        alvo = restante_macro * fracao                                              # (d, m, 3)
+        erro = np.zeros_like(g)
+        for j in range(3):  # um macro por vez evita o tensor (d, m, n, 3)
+            erro += ((g * macro_g[:, j] - alvo[..., j:j + 1]) / escala[j]) ** 2
+        erro += ((g * kcal_g - cota[..., None]) / np.maximum(cota[..., None], 1.0)) ** 2
+        erro += rng.random(erro.shape) * RUIDO
+        # já escolhidos nesta refeição ficam fora
+        for anterior in range(passo):
+            np.put_along_axis(erro, escolhas[..., anterior:anterior + 1], np.inf, axis=-1)
+
+        # 2) variedade: percorre os dias só aplicando penalidades e argmin sobre (refeições × alimentos)
+        for d in range(days):
+            if cancelado is not None and cancelado():
+                return None
+            pen = erro[d]  # view: (refeições, alimentos)
+            for dd in range(max(0, d - janela), d):
+                pen[meal_idx[:, None], escolhas[dd, :, :passo + 1]] += PENALIDADE_REPETICAO
+                pen[:, escolhas[dd, :, :passo + 1].ravel()] += PENALIDADE_OUTRO_DIA
+            # os dias seguintes já têm os alimentos dos passos anteriores: a janela vale para os dois lados
+            if passo:
+                for dd in range(d + 1, min(days, d + janela + 1)):
+                    pen[meal_idx[:, None], escolhas[dd, :, :passo]] += PENALIDADE_REPETICAO
+                    pen[:, escolhas[dd, :, :passo].ravel()] += PENALIDADE_OUTRO_DIA
+            # o mesmo alimento em outra refeição do dia leva só uma penalidade leve
+            usados = escolhas[d, :, :passo].ravel().tolist()
+            for m in range(meals_per_day):
+                linha = pen[m]
+                if usados:
+                    linha = linha.copy()
+                    linha[usados] += PENALIDADE_MESMO_DIA
+                escolhas[d, m, passo] = int(np.argmin(linha))
+                usados.append(escolhas[d, m, passo])
+
+        # 3) porções e restante, de novo em lote
+        sel = escolhas[..., passo]
+        gram = np.take_along_axis(g, sel[..., None], axis=-1)[..., 0]
+        porcoes[..., passo] = gram
+        restante_kcal = restante_kcal - gram * kcal_g[sel]
+        restante_macro = restante_macro - gram[..., None] * macro_g[sel]
+
+    # ajuste final: escala as porções da refeição para bater as calorias da refeição. Só as kcal são meta
+    # exata: os macros seguem da escolha dos alimentos (escalar as porções não muda a proporção entre eles), e o
+    # arredondamento a 5 g e o corte em [5, 2 × PORCAO_MAX_G] ainda deixam alguma sobra nas kcal da refeição
+    kcal_refeicao = (porcoes * kcal_g[escolhas]).sum(axis=-1, keepdims=True)
+    porcoes = porcoes * (kcal_ref / np.maximum(kcal_refeicao, 1e-9))
+    porcoes = np.clip(np.round(porcoes / 5.0) * 5.0, 5.0, PORCAO_MAX_G * 2)
+    return escolhas, porcoes
+
+
+def gerar_itens(catalogo, escolhas, porcoes, dia_inicial=1):
+    # dia_inicial: número do primeiro dia de `escolhas` (para converter fatias de dias)
+    days, meals, k = escolhas.shape
+    kcal = porcoes * catalogo.kcal[escolhas] / 100.0
+    macros = porcoes[..., None] * catalogo.macros[escolhas] / 100.0
+    itens = []
+    for d in range(days):
+        for m in range(meals):
+            for a in range(k):
+                itens.append({
+                    "day": dia_inicial + d,
+                    "meal_name": f"Refeição {m + 1}",
+                    "food_name": catalogo.nomes[escolhas[d, m, a]],
+                    "portion_g": int(porcoes[d, m, a]),
+                    "kcal": round(float(kcal[d, m, a]), 1),
+                    "protein_g": round(float(macros[d, m, a, 0]), 1),
+                    "carbs_g": round(float(macros[d, m, a, 1]), 1),
+                    "fats_g": round(float(macros[d, m, a, 2]), 1),
+                    "done": False
+                })
+    return itens
+
+
+def generate_plan(target_calories: int, days: int, meals_per_day: int, objetivo="Manutenção", catalogo=None, seed=None,
+                  cancelado=None):
+    # protocolo de progresso da página "Gerar Plano": cada passo traz só os itens novos ("new_items");
+    # cancelado: callable checado durante a resolução (JobManager.submit(cancel_arg=...)); cancelado, nada é emitido
+    catalogo = catalogo if catalogo is not None else catalogo_padrao()
+    # os dicts de item são montados um dia por vez; só os arrays do plano ficam inteiros em memória
+    plano = resolver_plano(catalogo, target_calories, days, meals_per_day, objetivo, seed=seed, cancelado=cancelado)
+    if plano is None:
+        return
+    escolhas, porcoes = plano
+    for d in range(days):
+        novos = gerar_itens(catalogo, escolhas[d:d + 1], porcoes[d:d + 1], dia_inicial=d + 1)
+        yield {"progress": int((d + 1) / days * 100), "current_item": novos[-1], "new_items": novos}
+    yield {"progress": 100, "current_item": None, "new_items": []}
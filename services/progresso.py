@@ -0,0 +1,221 @@
+# services/progresso.py — histórico de pesagens (data/progresso.csv) e análises para a página Progresso
+# O CSV só cresce: a leitura guarda o offset em bytes e, a cada refresh, lê apenas as linhas novas
+# (um stat() quando nada mudou). Arquivo truncado ou substituído volta a ser lido inteiro.
+# As análises trabalham sobre os arrays (dias, pesos) já carregados; gráficos recebem séries reduzidas
+# à largura do gráfico por LTTB.
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+COLUNAS = ("dia", "peso")
+JANELA_MEDIA_DIAS = 7
+JANELA_TENDENCIA_DIAS = 28  # a tendência (e o ETA) usa só as pesagens recentes
+MIN_PONTOS_TENDENCIA = 3
+HORIZONTE_ETA_DIAS = 3650   # além disso, "sem previsão"
+
+
+class HistoricoPeso:
+    def __init__(self, path):
+        self.path = path
+        self.dias = np.array([], dtype="datetime64[D]")
+        self.pesos = np.array([], dtype=np.float64)
+        self.versao = 0  # muda sempre que dias/pesos mudam: serve de chave de cache para as análises
+        self._offset = 0
+        self._ident = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.pesos)
+
+    def refresh(self):
+        # devolve True se algo mudou desde a última leitura
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                if self._ident is None and not len(self.pesos):
+                    return False
+                self._reset()
+                self.versao += 1
+                return True
+            ident = (st.st_dev, st.st_ino)
+            if ident != self._ident or st.st_size < self._offset:
+                self._reset()
+                self._ident = ident
+            if st.st_size == self._offset:
+                return False
+            novos = self._ler_a_partir(self._offset)
+            if novos is None:
+                return False
+            self._anexar(*novos)
+            self.versao += 1
+            return True
+
+    def _reset(self):
+        self.dias = self.dias[:0]
+        self.pesos = self.pesos[:0]
+        self._offset = 0
+        self._ident = None
+
+    def _ler_a_partir(self, offset):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            bloco = f.read()
+        fim = bloco.rfind(b"\n") + 1  # linha ainda sendo escrita fica para o próximo refresh
+        if fim == 0:
+            return None
+        bloco = bloco[:fim]
+        self._offset = offset + fim
+        header = 0 if offset == 0 else None
+        df = pd.read_csv(io.BytesIO(bloco), header=header, names=None if header == 0 else list(COLUNAS),
+                         usecols=list(COLUNAS), skip_blank_lines=True)
+        df = df.dropna()
+        return (pd.to_datetime(df["dia"]).to_numpy().astype("datetime64[D]"),
+                df["peso"].to_numpy(dtype=np.float64))
+
+    def _anexar(self, dias, pesos):
+        if not len(dias):
+            return
+        fora_de_ordem = len(self.dias) and dias.min() < self.dias[-1]
+        self.dias = np.concatenate([self.dias, dias])
+        self.pesos = np.concatenate([self.pesos, pesos])
+        if fora_de_ordem or np.any(np.diff(dias) < np.timedelta64(0, "D")):
+            ordem = np.argsort(self.dias, kind="stable")
+            self.dias, self.pesos = self.dias[ordem], self.pesos[ordem]
+        # arrays novos a cada mudança e somente leitura: quem guardou os anteriores (snapshot) não os vê mudar
+        self.dias.flags.writeable = self.pesos.flags.writeable = False
+
+    def registrar(self, dia, peso):
+        # acrescenta uma pesagem ao CSV (cria com cabeçalho se preciso); o próximo refresh a carrega
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock, open(self.path, "a", encoding="utf-8", newline="") as f:
+            if f.tell() == 0:
+                f.write(",".join(COLUNAS) + "\n")
+            f.write(f"{pd.Timestamp(dia).date().isoformat()},{float(peso):.1f}\n")
+
+    def registrar_lote(self, pesagens):
+        # pesagens: iterável de (dia, peso), gravadas numa única abertura do arquivo -> quantas foram gravadas
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        n = 0
+        with self._lock, open(self.path, "a", encoding="utf-8", newline="") as f:
+            if f.tell() == 0:
+                f.write(",".join(COLUNAS) + "\n")
+            for dia, peso in pesagens:
+                f.write(f"{pd.Timestamp(dia).date().isoformat()},{float(peso):.1f}\n")
+                n += 1
+        return n
+
+    def serie(self):
+        return self.dias, self.pesos
+
+    def snapshot(self):
+        # (versao, dias, pesos) lidos juntos: os arrays são os daquela versão mesmo que um refresh venha depois
+        with self._lock:
+            return self.versao, self.dias, self.pesos
+
+
+# ---------- análises ----------
+def _dias_desde(dias, origem):
+    return (dias - origem).astype(np.float64)
+
+
+def media_movel(dias, pesos, janela_dias=JANELA_MEDIA_DIAS):
+    # média das pesagens nos últimos `janela_dias` dias corridos (não em nº de linhas: dias sem pesagem contam)
+    if not len(pesos):
+        return pesos.copy()
+    s = pd.Series(pesos, index=pd.DatetimeIndex(dias))
+    return s.rolling(f"{janela_dias}D").mean().to_numpy()
+
+
+def tendencia(dias, pesos, janela_dias=JANELA_TENDENCIA_DIAS):
+    # reta (kg/dia, kg no último dia) ajustada às pesagens dos últimos `janela_dias`; None se há poucos pontos
+    if not len(pesos):
+        return None
+    recentes = dias >= dias[-1] - np.timedelta64(janela_dias - 1, "D")
+    x = _dias_desde(dias[recentes], dias[-1])
+    if len(x) < MIN_PONTOS_TENDENCIA or np.ptp(x) == 0:
+        return None
+    inclinacao, intercepto = np.polyfit(x, pesos[recentes], 1)
+    return float(inclinacao), float(intercepto)
+
+
+def eta_meta(dias, pesos, meta_alvo, janela_dias=JANELA_TENDENCIA_DIAS):
+    # data estimada em que a tendência cruza a meta; None se a tendência não vai na direção da meta
+    ajuste = tendencia(dias, pesos, janela_dias)
+    if ajuste is None:
+        return None
+    inclinacao, atual = ajuste
+    falta = meta_alvo - atual
+    if abs(falta) < 0.05:  # as pesagens têm 0,1 kg de resolução: a reta ajustada nunca bate exatamente na meta
+        return pd.Timestamp(dias[-1]).date()
+    if inclinacao == 0 or np.sign(falta) != np.sign(inclinacao):
+        return None
+    em_dias = falta / inclinacao
+    if em_dias > HORIZONTE_ETA_DIAS:
+        return None
+    return (pd.Timestamp(dias[-1]) + pd.Timedelta(days=int(np.ceil(em_dias)))).date()
+
+
+def pct_meta(meta_inicial, meta_alvo, atual):
+    # fração do caminho percorrido, para perda ou ganho de peso (RN-010: >= 1.0 é meta atingida)
+    total = meta_alvo - meta_inicial
+    if abs(total) < 0.0001:
+        return 1.0
+    return (atual - meta_inicial) / total
+
+
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: índices de até n_out pontos que preservam a forma visual da série
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    bordas = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 baldes entre o 1º e o último ponto
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        ini, fim = bordas[i], max(bordas[i + 1], bordas[i] + 1)
+        prox_ini, prox_fim = bordas[i + 1], bordas[i + 2] if i + 2 < len(bordas) else n
+        if prox_fim <= prox_ini:
+            prox_fim = prox_ini + 1
+        mx, my = x[prox_ini:prox_fim].mean(), y[prox_ini:prox_fim].mean()
+        area = np.abs((x[a] - mx) * (y[ini:fim] - y[a]) - (x[a] - x[ini:fim]) * (my - y[a]))
+        a = ini + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def resumo(dias, pesos, meta_inicial, meta_alvo, pontos=None):
+    # tudo o que a página mostra, num dict; `pontos` limita o tamanho das séries do gráfico
+    if not len(pesos):
+        return None
+    media = media_movel(dias, pesos)
+    ajuste = tendencia(dias, pesos)
+    idx = lttb(_dias_desde(dias, dias[0]), pesos, pontos) if pontos else np.arange(len(pesos))
+    grafico = pd.DataFrame({"peso": pesos[idx], f"média {JANELA_MEDIA_DIAS}d": media[idx]},
+                           index=pd.DatetimeIndex(dias[idx], name="dia"))
+    if ajuste is not None:
+        inclinacao, atual = ajuste
+        grafico["tendência"] = np.where(
+            dias[idx] >= dias[-1] - np.timedelta64(JANELA_TENDENCIA_DIAS - 1, "D"),
+            atual + inclinacao * _dias_desde(dias[idx], dias[-1]), np.nan)
+    semanal = pd.Series(pesos, index=pd.DatetimeIndex(dias)).resample("W").mean().diff().dropna()
+    return {
+        "atual": float(pesos[-1]),
+        "media": float(media[-1]),
+        "kg_por_semana": ajuste[0] * 7 if ajuste else None,
+        "pct_meta": pct_meta(meta_inicial, meta_alvo, float(pesos[-1])),
+        "eta": eta_meta(dias, pesos, meta_alvo),
+        "pesagens": len(pesos),
+        "primeiro_dia": pd.Timestamp(dias[0]).date(),
+        "grafico": grafico,
+        "variacao_semanal": semanal.rename("variação semanal (kg)"),
+    }
+
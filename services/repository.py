@@ -0,0 +1,447 @@
+# services/repository.py — persistência em SQLite (mesmo banco de Config.SQLALCHEMY_DATABASE_URI)
+# Planos, itens, feed, fotos, curtidas e grupos ficam em tabelas indexadas. O banco roda em WAL para que
+# leituras não esperem escritas; ações frequentes (curtidas, check-off de itens, atividade) passam por um
+# write-behind que agrupa os comandos e grava em lote numa única transação.
+import atexit
+import contextlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+
+FLUSH_INTERVAL_SECONDS = 0.5
+FLUSH_MAX_BATCH = 500
+MAX_FALHAS_GUARDADAS = 100  # comandos com erro guardados até o próximo flush()
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    target_calories INTEGER NOT NULL,
+    days INTEGER NOT NULL,
+    meals_per_day INTEGER NOT NULL,
+    objetivo TEXT,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    done_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_plans_user_created ON plans (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS plan_items (
+    plan_id TEXT NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    meal_name TEXT NOT NULL,
+    food_name TEXT NOT NULL,
+    portion_g REAL, kcal REAL, protein_g REAL, carbs_g REAL, fats_g REAL,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (plan_id, idx)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS community_groups (
+    name TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS group_members (
+    group_name TEXT NOT NULL REFERENCES community_groups (name) ON DELETE CASCADE,
+    user TEXT NOT NULL,
+    joined_at TEXT NOT NULL,
+    PRIMARY KEY (group_name, user)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS feed_items (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    author TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    group_name TEXT,
+    title TEXT,
+    body TEXT,
+    tags TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_feed_created ON feed_items (created_at);
+CREATE INDEX IF NOT EXISTS ix_feed_type_created ON feed_items (type, created_at);
+CREATE INDEX IF NOT EXISTS ix_feed_author_created ON feed_items (author, created_at);
+CREATE INDEX IF NOT EXISTS ix_feed_group_created ON feed_items (group_name, created_at);
+
+CREATE TABLE IF NOT EXISTS photos (
+    id TEXT PRIMARY KEY,
+    feed_id TEXT NOT NULL REFERENCES feed_items (id) ON DELETE CASCADE,
+    uploader TEXT NOT NULL,
+    caption TEXT,
+    image TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    group_name TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_photos_feed ON photos (feed_id);
+
+CREATE TABLE IF NOT EXISTS likes (
+    feed_id TEXT NOT NULL REFERENCES feed_items (id) ON DELETE CASCADE,
+    user TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (feed_id, user)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS user_activity (
+    user TEXT PRIMARY KEY,
+    last_at REAL NOT NULL,          -- epoch (s) da última atividade
+    source TEXT,
+    alerted INTEGER NOT NULL DEFAULT 0  -- 1 = já notificado por esta inatividade
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    rule TEXT,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_activity REAL,
+    read_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_notifications_user_unread ON notifications (user, read_at);
+CREATE TABLE IF NOT EXISTS repo_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+PLAN_COLUMNS = ("id", "user_id", "target_calories", "days", "meals_per_day", "objetivo", "created_at",
+                "status", "progress", "item_count", "done_count")
+ITEM_COLUMNS = ("day", "meal_name", "food_name", "portion_g", "kcal", "protein_g", "carbs_g", "fats_g", "done")
+
+
+def sqlite_path(uri):
+    # "sqlite:////abs/path.db" / "sqlite:///rel.db" -> caminho de arquivo
+    if not uri.startswith("sqlite:///"):
+        raise ValueError(f"Repositório suporta apenas SQLite, recebido: {uri}")
+    return uri[len("sqlite:///"):]
+
+
+_shared = {}  # caminho absoluto -> Repository (Repository.shared)
+_shared_lock = threading.Lock()
+
+
+class WriteBehindError(RuntimeError):
+    # levantada por flush() quando comandos do write-behind falharam desde o último flush
+    def __init__(self, falhas):
+        self.falhas = falhas  # [(sql, params, exceção)]
+        sql, _, exc = falhas[0]
+        super().__init__(f"{len(falhas)} comando(s) do write-behind falharam; primeiro: {exc!r} em {sql!r}")
+
+
+class WriteBehind:
+    # fila de comandos gravados em lote por uma thread; flush() força a gravação do que está pendente.
+    # Um lote que falha é desfeito e refeito comando a comando: só os comandos com erro se perdem, a thread
+    # continua viva e o erro é registrado no log e entregue a quem chamar flush()
+    def __init__(self, connect, interval=FLUSH_INTERVAL_SECONDS, max_batch=FLUSH_MAX_BATCH):
+        self._connect = connect
+        self._interval = interval
+        self._max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._falhas = []
+        self._falhas_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="repo-write-behind", daemon=True)
+        self._thread.start()
+
+    def put(self, sql, params):
+        self._queue.put((sql, params))
+
+    def _drain(self, first=None):
+        batch = [first] if first else []
+        while len(batch) < self._max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, conn, batch):
+        # agrupa comandos iguais consecutivos em executemany, preservando a ordem
+        with conn:
+            run_sql, run = None, []
+            for sql, params in batch:
+                if sql != run_sql and run:
+                    conn.executemany(run_sql, run)
+                    run = []
+                run_sql = sql
+                run.append(params)
+            if run:
+                conn.executemany(run_sql, run)
+
+    def _write_one_by_one(self, conn, batch):
+        for sql, params in batch:
+            try:
+                with conn:
+                    conn.execute(sql, params)
+            except Exception as exc:  # noqa: BLE001 — qualquer erro do comando não pode matar a thread
+                log.error("write-behind: comando descartado (%r): %s %r", exc, sql, params)
+                self._falhou([(sql, params, exc)])
+
+    def _falhou(self, falhas):
+        with self._falhas_lock:
+            self._falhas.extend(falhas[:MAX_FALHAS_GUARDADAS - len(self._falhas)])
+
+    def _loop(self):
+        conn = self._connect()
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self._interval)
+            except queue.Empty:
+                continue
+            batch = self._drain(first)
+            try:
+                self._write(conn, batch)
+            except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError) as exc:
+                # erro de algum comando (o `with conn` já desfez o lote): refaz um a um, perde só os ruins
+                log.warning("write-behind: lote de %d comandos falhou (%r); refazendo um a um", len(batch), exc)
+                self._write_one_by_one(conn, batch)
+            except Exception as exc:  # noqa: BLE001 — banco travado/indisponível: o lote inteiro se perde
+                log.error("write-behind: lote de %d comandos descartado (%r)", len(batch), exc)
+                self._falhou([(sql, params, exc) for sql, params in batch])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        # espera a fila esvaziar; WriteBehindError se algum comando falhou desde o último flush()
+        self._queue.join()
+        with self._falhas_lock:
+            falhas, self._falhas = self._falhas, []
+        if falhas:
+            raise WriteBehindError(falhas)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class Repository:
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+        self.behind = WriteBehind(self._connect)
+        atexit.register(self.close)
+
+    @classmethod
+    def from_uri(cls, uri):
+        return cls(sqlite_path(uri))
+
+    @classmethod
+    def shared(cls, uri):
+        # uma instância (e uma thread de write-behind) por arquivo e processo, para quem não tem cache próprio
+        path = os.path.abspath(sqlite_path(uri))
+        with _shared_lock:
+            repo = _shared.get(path)
+            if repo is None:
+                repo = _shared[path] = cls(path)
+        return repo
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _conn(self):
+        # uma conexão por thread (threads de script do Streamlit, workers de job)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _execute(self, sql, params=()):
+        with self._write_lock, self._conn() as conn:
+            conn.execute(sql, params)
+
+    def close(self):
+        self.behind.close()
+
+    @contextlib.contextmanager
+    def read_snapshot(self):
+        # conexão própria numa transação de leitura: várias consultas longas (exportação) veem o mesmo estado
+        # do banco sem segurar a conexão da thread nem bloquear quem escreve (WAL); o write-behind é
+        # esvaziado antes, para o retrato incluir curtidas e marcações já aceitas (WriteBehindError se alguma
+        # gravação pendente falhou: o retrato não a teria)
+        self.behind.flush()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            conn.rollback()
+            conn.close()
+
+    def write_batch(self, commands):
+        # commands: [(sql, [params])] numa única transação -> linhas alteradas por comando
+        changed = []
+        with self._write_lock, self._conn() as conn:
+            for sql, rows in commands:
+                before = conn.total_changes
+                conn.executemany(sql, rows)
+                changed.append(conn.total_changes - before)
+        return changed
+
+    def bump_counter(self, name):
+        # contador persistente entre processos (ex.: importações em massa, para caches de outros processos)
+        self._execute("INSERT INTO repo_counters (name, value) VALUES (?, 1) "
+                      "ON CONFLICT (name) DO UPDATE SET value = value + 1", (name,))
+
+    def counter(self, name):
+        row = self._conn().execute("SELECT value FROM repo_counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    # ---------- planos ----------
+    def save_plan(self, plan, items):
+        row = dict(plan, item_count=len(items), done_count=getattr(items, "done_count", 0))
+        with self._write_lock, self._conn() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO plans ({', '.join(PLAN_COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * len(PLAN_COLUMNS))})", [row.get(c) for c in PLAN_COLUMNS])
+            conn.executemany(
+                f"INSERT OR REPLACE INTO plan_items (plan_id, idx, {', '.join(ITEM_COLUMNS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(ITEM_COLUMNS))})",
+                ((plan["id"], i, *[int(it.get(c, 0)) if c == "done" else it.get(c) for c in ITEM_COLUMNS])
+                 for i, it in enumerate(items)))
+
+    def list_plans(self, user_id, limit=20, before=None, before_id=None):
+        # mais recentes primeiro, paginado por (created_at, id) do último plano da página anterior
+        # (índice (user_id, created_at)); before_id desempata planos criados no mesmo instante
+        sql = f"SELECT {', '.join(PLAN_COLUMNS)} FROM plans WHERE user_id = ?"
+        params = [user_id]
+        if before and before_id is not None:
+            sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [before, before, before_id]
+        elif before:
+            sql += " AND created_at < ?"
+            params.append(before)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(r) for r in self._conn().execute(sql, params)]
+
+    def plan_items(self, plan_id):
+        cur = self._conn().execute(
+            f"SELECT {', '.join(ITEM_COLUMNS)} FROM plan_items WHERE plan_id = ? ORDER BY idx", (plan_id,))
+        return [dict(r) for r in cur]
+
+    def set_items_done(self, plan_id, changes, done_count):
+        # changes: [(idx, done)]; alta frequência -> write-behind
+        for idx, done in changes:
+            self.behind.put("UPDATE plan_items SET done = ? WHERE plan_id = ? AND idx = ?", (int(done), plan_id, idx))
+        self.behind.put("UPDATE plans SET done_count = ? WHERE id = ?", (done_count, plan_id))
+
+    def set_all_items_done(self, plan_id, done, done_count):
+        self.behind.put("UPDATE plan_items SET done = ? WHERE plan_id = ?", (int(done), plan_id))
+        self.behind.put("UPDATE plans SET done_count = ? WHERE id = ?", (done_count, plan_id))
+
+    # ---------- comunidade ----------
+    def add_group(self, name, gid, created_at):
+        self._execute("INSERT INTO community_groups (name, id, created_at) VALUES (?, ?, ?)", (name, gid, created_at))
+
+    def add_member(self, group_name, user, joined_at):
+        self._execute("INSERT OR IGNORE INTO group_members (group_name, user, joined_at) VALUES (?, ?, ?)",
+                      (group_name, user, joined_at))
+
+    def add_feed_item(self, item, group=None, photo=None):
+        data = item["data"]
+        with self._write_lock, self._conn() as conn:
+            conn.execute(
+                "INSERT INTO feed_items (id, type, author, created_at, group_name, title, body, tags) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (item["id"], item["type"], item["author"], item["created_at"], group,
+                 data.get("title"), data.get("body"), json.dumps(data.get("tags", []), ensure_ascii=False)))
+            if photo:
+                conn.execute(
+                    "INSERT INTO photos (id, feed_id, uploader, caption, image, created_at, group_name) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (photo["id"], item["id"], photo["uploader"], photo["caption"], json.dumps(photo["image"]),
+                     photo["created_at"], photo["group"]))
+
+    def add_like(self, feed_id, user, created_at):
+        self.behind.put("INSERT OR IGNORE INTO likes (feed_id, user, created_at) VALUES (?, ?, ?)",
+                        (feed_id, user, created_at))
+
+    def load_groups(self):
+        conn = self._conn()
+        groups = {r["name"]: {"id": r["id"], "members": [], "photos": [], "created_at": r["created_at"]}
+                  for r in conn.execute("SELECT name, id, created_at FROM community_groups ORDER BY created_at")}
+        for r in conn.execute("SELECT group_name, user FROM group_members ORDER BY joined_at"):
+            groups[r["group_name"]]["members"].append(r["user"])
+        return groups
+
+    def iter_feed(self):
+        # feed completo em ordem de criação, com fotos e curtidas, para hidratar os índices em memória
+        conn = self._conn()
+        likes = {}
+        for r in conn.execute("SELECT feed_id, user, created_at FROM likes ORDER BY created_at"):
+            likes.setdefault(r["feed_id"], []).append((r["user"], r["created_at"]))
+        photos = {r["feed_id"]: dict(r) for r in conn.execute(
+            "SELECT id, feed_id, uploader, caption, image, created_at, group_name FROM photos")}
+        for r in conn.execute("SELECT * FROM feed_items ORDER BY created_at, rowid"):
+            item = {
+                "id": r["id"],
+                "type": r["type"],
+                "author": r["author"],
+                "created_at": r["created_at"],
+                "data": {"title": r["title"], "body": r["body"], "tags": json.loads(r["tags"] or "[]")},
+            }
+            photo = photos.get(r["id"])
+            if photo:
+                item["data"] = {"photo_id": photo["id"]}
+                photo = {
+                    "id": photo["id"],
+                    "uploader": photo["uploader"],
+                    "caption": photo["caption"],
+                    "image": json.loads(photo["image"]),
+                    "created_at": photo["created_at"],
+                    "group": photo["group_name"],
+                    "feed_id": r["id"],
+                }
+            yield item, photo, likes.get(r["id"], [])
+
+    # ---------- atividade e notificações ----------
+    def record_activity(self, user, at, source=None):
+        # alta frequência -> write-behind; nova atividade rearma o alerta de inatividade
+        self.behind.put("INSERT INTO user_activity (user, last_at, source, alerted) VALUES (?, ?, ?, 0) "
+                        "ON CONFLICT (user) DO UPDATE SET last_at = excluded.last_at, source = excluded.source, "
+                        "alerted = 0 WHERE excluded.last_at >= user_activity.last_at", (user, at, source))
+
+    def load_activity(self):
+        # [(user, last_at, alerted)]
+        return [tuple(r) for r in self._conn().execute("SELECT user, last_at, alerted FROM user_activity")]
+
+    def add_notifications(self, notifications):
+        # notifications: dicts com as colunas da tabela; marca os usuários como já alertados.
+        # Pelo write-behind, para ficar na mesma ordem que as atividades ainda na fila
+        for n in notifications:
+            self.behind.put("INSERT OR IGNORE INTO notifications (id, user, kind, rule, message, created_at, "
+                            "last_activity) VALUES (:id, :user, :kind, :rule, :message, :created_at, :last_activity)", n)
+        for n in notifications:
+            self.behind.put("UPDATE user_activity SET alerted = 1 WHERE user = ? AND last_at <= ?",
+                            (n["user"], n["last_activity"]))
+
+    def pending_notifications(self):
+        cur = self._conn().execute(
+            "SELECT id, user, kind, rule, message, created_at, last_activity FROM notifications "
+            "WHERE read_at IS NULL ORDER BY created_at")
+        return [dict(r) for r in cur]
+
+    def mark_notifications_read(self, ids, at):
+        for nid in ids:
+            self.behind.put("UPDATE notifications SET read_at = ? WHERE id = ?", (at, nid))
@@ -0,0 +1,13 @@
+# services/texto.py — normalização de texto compartilhada (busca de alimentos, tags, conteúdo)
+import unicodedata
+
+
+def sem_acentos(texto):
+    # "Refeição" -> "refeicao": minúsculas e sem diacríticos, para comparar sem depender de acentuação
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def normalizar_tag(tag):
+    # "Low Carb" / "low-carb" / " LOW_CARB " -> "low-carb"
+    return "-".join(sem_acentos(tag).replace("_", " ").replace("-", " ").split())
@@ -1,3 +1,12 @@
+# services/treino.py — sugestões de treino e programas periodizados de N semanas (RN-007, RN-008, RN-019)
+# O programa de cada usuário sai de tabelas de rodízio pré-calculadas (frequência semanal × dia da semana
+# inicial × fase do rodízio → grupo de cada dia): gerar programas para milhares de usuários é indexação NumPy
+# sobre essas tabelas mais a progressão de volume por semana, sem laço por usuário ou por dia.
+import zlib
+from datetime import date, timedelta
+
+import numpy as np
+
 
 def sugestoes_por_nivel(nivel):
     if nivel == "Iniciante":
@@ -14,3 +23,201 @@ def variar_grupo_muscular(ultimo_grupo, hoje):
 
 def hidratacao_extra(duracao_min):
     return 500 if duracao_min > 60 else 0  # RN-008
+
+
+NIVEIS = ("Iniciante", "Intermediário", "Avançado")
+INTENSIDADES = ("baixa", "moderada", "alta")
+GRUPOS = ("Pernas", "Peito", "Costas", "Ombros", "Mobilidade/Alongamento")
+MUSCULARES = 4          # GRUPOS[:4] entram no rodízio; mobilidade é recuperação ativa (fora da RN-019)
+MOBILIDADE = 4
+DESCANSO = -1
+
+# exercícios por grupo com a intensidade mínima que exigem: nível/RN-007 limitam quais entram
+EXERCICIOS = {
+    "Pernas": [("Leg press", 0), ("Cadeira extensora", 0), ("Panturrilha em pé", 0), ("Agachamento livre", 1),
+               ("Afundo", 1), ("Agachamento livre pesado", 2), ("Levantamento terra", 2)],
+    "Peito": [("Flexão inclinada", 0), ("Crucifixo", 0), ("Supino reto", 1), ("Supino inclinado com halteres", 1),
+              ("Supino pesado", 2), ("Flexão com carga", 2)],
+    "Costas": [("Puxada frontal", 0), ("Remada baixa", 0), ("Remada curvada", 1), ("Remada unilateral", 1),
+               ("Barra fixa", 2), ("Levantamento terra", 2)],
+    "Ombros": [("Elevação lateral", 0), ("Face pull", 0), ("Desenvolvimento com halteres", 1), ("Arnold press", 1),
+               ("Desenvolvimento militar", 2)],
+    "Mobilidade/Alongamento": [("Caminhada leve", 0), ("Mobilidade de quadril", 0), ("Alongamento geral", 0),
+                               ("Liberação miofascial", 0), ("Yoga", 0)],
+}
+REPETICOES = ("12-15", "8-12", "5-8")  # por intensidade
+
+# por nível: treinos por semana, exercícios por treino, séries por exercício, intensidade
+FREQUENCIA = (3, 4, 5)
+EXERCICIOS_POR_TREINO = (3, 4, 5)
+SERIES_BASE = (3, 4, 5)
+INTENSIDADE_NIVEL = (0, 1, 2)
+# RN-007: condição -> (intensidade máxima, duração máxima em min, treinos por semana); várias = o mais restrito
+LIMITES_RN007 = {
+    "Diabetes": (1, 60, 5),
+    "Hipertensão": (1, 45, 5),
+    "Problemas cardíacos": (0, 30, 3),
+    "Outros": (1, 45, 4),
+}
+SEM_LIMITE = (2, 120, 6)
+
+# mesociclo de 4 semanas: volume crescente e uma semana de descarga; o ciclo se repete no horizonte
+PROGRESSAO = np.array([1.0, 1.15, 1.3, 0.7])
+AQUECIMENTO_MIN = 10
+MIN_POR_SERIE = 2.5
+DURACAO_MOBILIDADE = 20
+SERIES_MOBILIDADE = 2
+MAX_SEMANAS = 26
+SEMANAS_PADRAO = 8
+
+# semana (segunda..domingo) por frequência: 1 treino, 2 mobilidade, 0 descanso
+SEMANAS_TIPO = {
+    2: (1, 0, 0, 1, 0, 2, 0),
+    3: (1, 0, 1, 0, 1, 2, 0),
+    4: (1, 1, 0, 1, 1, 2, 0),
+    5: (1, 1, 1, 0, 1, 1, 2),
+    6: (1, 1, 1, 1, 1, 1, 0),
+}
+
+
+def _tabelas_rodizio():
+    # -> int8 (frequência, dia da semana do início, fase, dia do programa) com o índice em GRUPOS ou DESCANSO.
+    # Os dias de treino seguem o ciclo dos grupos musculares sem reiniciar na virada da semana: dois treinos
+    # seguidos nunca repetem grupo (RN-019) em todo o horizonte
+    dias = MAX_SEMANAS * 7
+    tab = np.full((max(SEMANAS_TIPO) + 1, 7, MUSCULARES, dias), DESCANSO, dtype=np.int8)
+    for freq, semana in SEMANAS_TIPO.items():
+        tipo = np.tile(np.array(semana), MAX_SEMANAS + 1)
+        treino = tipo == 1
+        ordem = np.cumsum(treino) - 1
+        for fase in range(MUSCULARES):
+            grupos = np.where(treino, (ordem + fase) % MUSCULARES, np.where(tipo == 2, MOBILIDADE, DESCANSO))
+            for inicio in range(7):
+                tab[freq, inicio, fase] = grupos[inicio:inicio + dias]
+    return tab
+
+
+RODIZIO = _tabelas_rodizio()
+
+
+def _exercicios_por_intensidade():
+    # (grupo, intensidade) -> nomes permitidos
+    return {(g, i): tuple(nome for nome, minima in EXERCICIOS[nome_g] if minima <= i)
+            for g, nome_g in enumerate(GRUPOS) for i in range(len(INTENSIDADES))}
+
+
+PERMITIDOS = _exercicios_por_intensidade()
+
+
+def limites_rn007(condicoes):
+    # -> (intensidade máxima, duração máxima, treinos por semana) para as condições de saúde do Perfil
+    lim = [LIMITES_RN007.get(c, LIMITES_RN007["Outros"]) for c in condicoes or () if c != "Nenhum"]
+    return tuple(min(v) for v in zip(SEM_LIMITE, *lim)) if lim else SEM_LIMITE
+
+
+def segunda_feira(dia=None):
+    dia = dia or date.today()
+    return dia - timedelta(days=dia.weekday())
+
+
+class Programas:
+    # programas de vários usuários em arrays (usuário × dia); o de um usuário só é um lote de 1
+    __slots__ = ("inicio", "grupos", "series", "duracao", "intensidade", "n_exercicios")
+
+    def __init__(self, inicio, grupos, series, duracao, intensidade, n_exercicios):
+        self.inicio = inicio
+        self.grupos = grupos              # (n, dias) int8: índice em GRUPOS ou DESCANSO
+        self.series = series              # (n, dias) séries por exercício
+        self.duracao = duracao            # (n, dias) minutos
+        self.intensidade = intensidade    # (n,) índice em INTENSIDADES
+        self.n_exercicios = n_exercicios  # (n,)
+
+    def __len__(self):
+        return len(self.grupos)
+
+    @property
+    def dias(self):
+        return self.grupos.shape[1]
+
+    def dia(self, data, i=0):
+        # treino do usuário i na data -> dict no formato de sugestoes_por_nivel (+ grupo, semana...), ou None
+        # fora do horizonte
+        d = (data - self.inicio).days
+        if not 0 <= d < self.dias:
+            return None
+        g = int(self.grupos[i, d])
+        semana = d // 7
+        base = {"data": data, "semana": semana + 1, "descarga": bool(PROGRESSAO[semana % len(PROGRESSAO)] < 1)}
+        if g == DESCANSO:
+            return dict(base, grupo="Descanso", duracao_min=0, intensidade="-", series=0, exercicios=[],
+                        hidratacao_ml=0)
+        intensidade = 0 if g == MOBILIDADE else int(self.intensidade[i])
+        series = int(self.series[i, d])
+        nomes = PERMITIDOS[g, intensidade]
+        k = min(len(nomes), 3 if g == MOBILIDADE else int(self.n_exercicios[i]))
+        # a lista gira uma posição por semana: o mesmo grupo não repete a mesma sequência de exercícios
+        escolhidos = [nomes[(semana + j) % len(nomes)] for j in range(k)]
+        if g == MOBILIDADE:
+            exercicios = escolhidos
+        else:
+            exercicios = [f"{nome} {series}x{REPETICOES[intensidade]}" for nome in escolhidos]
+        duracao = int(self.duracao[i, d])
+        return dict(base, grupo=GRUPOS[g], duracao_min=duracao, intensidade=INTENSIDADES[intensidade],
+                    series=series, exercicios=exercicios, hidratacao_ml=hidratacao_extra(duracao))
+
+    def semana(self, data, i=0):
+        # os 7 dias (segunda a domingo) da semana de `data` que caem no horizonte
+        seg = segunda_feira(data)
+        return [t for t in (self.dia(seg + timedelta(days=k), i) for k in range(7)) if t is not None]
+
+
+def violacoes_rn019(grupos):
+    # grupos: (n, dias) -> nº de dias, por usuário, que repetem o grupo muscular do dia anterior
+    g = np.asarray(grupos)
+    return ((g[:, 1:] == g[:, :-1]) & (g[:, 1:] >= 0) & (g[:, 1:] < MUSCULARES)).sum(axis=1)
+
+
+def gerar_programas(perfis, semanas=SEMANAS_PADRAO, inicio=None):
+    # perfis: [{"nivel", "condicoes" (RN-007), "user" (opcional: espalha a fase do rodízio), "grupo_ontem"
+    # (opcional: o 1º dia não repete o último treino)}] -> Programas com semanas × 7 dias a partir de `inicio`
+    if not 1 <= semanas <= MAX_SEMANAS:
+        raise ValueError(f"semanas deve estar entre 1 e {MAX_SEMANAS}")
+    inicio = inicio or segunda_feira()
+    dias = semanas * 7
+    n = len(perfis)
+    nivel = np.array([NIVEIS.index(p.get("nivel") or NIVEIS[0]) for p in perfis], dtype=np.int64).reshape(n)
+    cache = {}
+    lim = np.array([cache.get(c) or cache.setdefault(c, limites_rn007(c))
+                    for c in (frozenset(p.get("condicoes") or ()) for p in perfis)], dtype=np.int64).reshape(n, 3)
+    fase = np.array([zlib.crc32(p["user"].encode("utf-8")) % MUSCULARES if p.get("user") else 0 for p in perfis],
+                    dtype=np.int64).reshape(n)
+    ontem = np.array([GRUPOS.index(p["grupo_ontem"]) if p.get("grupo_ontem") in GRUPOS else DESCANSO
+                      for p in perfis], dtype=np.int64).reshape(n)
+
+    freq = np.minimum(np.take(FREQUENCIA, nivel), lim[:, 2])
+    intensidade = np.minimum(np.take(INTENSIDADE_NIVEL, nivel), lim[:, 0])
+    n_ex = np.take(EXERCICIOS_POR_TREINO, nivel)
+    wd = inicio.weekday()
+
+    # RN-019 na emenda com o treino de ontem: se o 1º dia repetiria o grupo, a fase avança um
+    primeiro = RODIZIO[freq, wd, fase, 0]
+    fase = np.where((primeiro == ontem) & (ontem < MUSCULARES), (fase + 1) % MUSCULARES, fase)
+    grupos = RODIZIO[freq[:, None], wd, fase[:, None], np.arange(dias)]
+
+    # volume: séries da semana pela progressão, cortadas para a duração caber no limite RN-007
+    prog = PROGRESSAO[(np.arange(dias) // 7) % len(PROGRESSAO)]
+    series = np.maximum(np.rint(np.take(SERIES_BASE, nivel)[:, None] * prog), 1)
+    teto = np.maximum((lim[:, 1] - AQUECIMENTO_MIN) // (n_ex * MIN_POR_SERIE), 1)
+    series = np.minimum(series, teto[:, None])
+    treino = (grupos >= 0) & (grupos < MUSCULARES)
+    mobilidade = grupos == MOBILIDADE
+    duracao = np.where(treino, AQUECIMENTO_MIN + series * n_ex[:, None] * MIN_POR_SERIE, 0)
+    duracao = np.where(mobilidade, np.minimum(DURACAO_MOBILIDADE, lim[:, 1:2]), duracao)
+    series = np.where(treino, series, np.where(mobilidade, SERIES_MOBILIDADE, 0))
+    return Programas(inicio, grupos, series.astype(np.int8), np.rint(duracao).astype(np.int16),
+                     intensidade.astype(np.int8), n_ex.astype(np.int8))
+
+
+def gerar_programa(nivel, condicoes=(), semanas=SEMANAS_PADRAO, inicio=None, user=None, grupo_ontem=None):
+    return gerar_programas([{"nivel": nivel, "condicoes": condicoes, "user": user, "grupo_ontem": grupo_ontem}],
+                           semanas, inicio)
@@ -0,0 +1,60 @@
+import pytest
+
+from config import Config
+from flask_app import create_app
+from models import db
+from services.repository import Repository
+
+ADMIN_EMAIL = "admin@power.test"
+PASSWORD = "segredo1"
+
+
+def save_plan(repo, plan_id, user_id, created_at="2024-05-01T12:00:00", n_items=3):
+    plan = {"id": plan_id, "user_id": str(user_id), "target_calories": 2000, "days": 1, "meals_per_day": n_items,
+            "objetivo": "Manutenção", "created_at": created_at, "status": "generated_local", "progress": 100}
+    items = [{"day": 1, "meal_name": f"Refeição {i + 1}", "food_name": "Tofu", "portion_g": 100, "kcal": 76.0,
+              "protein_g": 8.0, "carbs_g": 1.9, "fats_g": 4.8, "done": False} for i in range(n_items)]
+    repo.save_plan(plan, items)
+    return plan
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # one SQLite file per test; password hashing in the test thread with a cheap pbkdf2
+    monkeypatch.setattr(Config, "SECRET_KEY", "test-secret-key-with-at-least-32-bytes")
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'api.db'}")
+    monkeypatch.setattr(Config, "PROGRESSO_CSV", str(tmp_path / "progresso.csv"))
+    monkeypatch.setattr(Config, "EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(Config, "AUTH_HASH_WORKERS", 0)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_ROUNDS", 1000)
+    monkeypatch.setattr(Config, "ADMIN_EMAILS", ADMIN_EMAIL)
+    app = create_app()
+    app.config["TESTING"] = True
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    # registers (if needed) and logs in -> (name, i.e. the app user key of the account; Authorization header)
+    def _login(email, name="Ana"):
+        r = client.post("/api/auth/register", json={"name": name, "email": email, "password": PASSWORD})
+        assert r.status_code in (201, 409)
+        r = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        assert r.status_code == 200
+        headers = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+        return client.get("/api/auth/me", headers=headers).get_json()["name"], headers
+    return _login
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = Repository(str(tmp_path / "repo.db"))
+    yield repo
+    repo.close()
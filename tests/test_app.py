@@ -0,0 +1,217 @@
+import gzip
+import json
+import os
+import threading
+import time
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from config import Config
+from conftest import PASSWORD, save_plan
+from flask_app import create_app
+import resources
+from models import db
+from services import plano_alimentar
+from services.exportacao import CONTADOR_IMPORTACOES
+from services.mudancas import FEED
+from services.jobs import QUEUED, RUNNING, JobManager
+from services.repository import Repository
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+DADOS = os.path.join(ROOT, "pages", "06_Dados.py")
+
+
+@pytest.fixture
+def uri(tmp_path, monkeypatch):
+    uri = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", uri)
+    monkeypatch.setattr(Config, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(Config, "PROGRESSO_CSV", str(tmp_path / "progresso.csv"))
+    monkeypatch.setattr(Config, "EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(Config, "PLAN_JOBS_POLL_SECONDS", 0.1)
+    st.cache_resource.clear()  # repository, job manager etc. built again from the patched Config
+    yield uri
+    st.cache_resource.clear()
+
+
+@pytest.fixture
+def at(uri):
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.session_state["display_name"] = "ana"
+    return at
+
+
+@pytest.fixture
+def api(uri, monkeypatch):
+    # the Flask API on the same database as the app
+    monkeypatch.setattr(Config, "SECRET_KEY", "test-secret-key-with-at-least-32-bytes")
+    monkeypatch.setattr(Config, "AUTH_HASH_WORKERS", 0)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_ROUNDS", 1000)
+    app = create_app()
+    yield app.test_client()
+    with app.app_context():
+        db.engine.dispose()
+
+
+def button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def generate(at):
+    at.run()
+    assert not at.exception
+    button(at, "Gerar Plano Agora").click().run()
+    assert not at.exception
+    # the progress fragment reruns the whole page (st.rerun) once the job is done; the page then saves the plan
+    for _ in range(100):
+        if "plan_job" not in at.session_state:
+            break
+        time.sleep(0.05)
+        at.run()
+        assert not at.exception
+    assert "plan_job" not in at.session_state
+
+
+def test_generate_plan_polls_until_saved(at, uri):
+    generate(at)
+    plans = Repository.shared(uri).list_plans("ana")
+    assert [(p["status"], p["item_count"]) for p in plans] == [("generated_local", 7 * 3 * 2)]
+    assert [p["id"] for p in at.session_state["plans"]] == [plans[0]["id"]]
+
+
+def test_progress_fragment_reruns_the_page_when_the_job_ends(at, uri, monkeypatch):
+    # the generator waits for the test, so the job is still running while the page polls it
+    liberar = threading.Event()
+    real_generate = plano_alimentar.generate_plan
+
+    def generate_plan(*args, **kwargs):
+        liberar.wait(10)
+        yield from real_generate(*args, **kwargs)
+
+    monkeypatch.setattr(plano_alimentar, "generate_plan", generate_plan)
+    managers = []
+    real_get = JobManager.get
+
+    def get(self, job_id):
+        managers.append(self)
+        return real_get(self, job_id)
+
+    monkeypatch.setattr(JobManager, "get", get)
+    at.run()
+    button(at, "Gerar Plano Agora").click().run()
+    at.run()
+    assert not at.exception
+    assert at.get("progress")
+    job_id = at.session_state["plan_job"]
+    liberar.set()
+    while real_get(managers[-1], job_id)["status"] in (QUEUED, RUNNING):
+        time.sleep(0.01)
+
+    # the job ends between the page's check and the fragment's poll: the page still renders the fragment,
+    # which sees the finished job and reruns the page (st.rerun) to save the plan
+    stale = [True]
+
+    def get_stale_once(self, job_id):
+        job = real_get(self, job_id)
+        if job and stale:
+            stale.pop()
+            return dict(job, status=RUNNING)
+        return job
+
+    monkeypatch.setattr(JobManager, "get", get_stale_once)
+    at.run()
+    assert not at.exception
+    assert not stale
+    assert "plan_job" not in at.session_state
+    assert len(Repository.shared(uri).list_plans("ana")) == 1
+
+
+def test_plan_history_loads_older_pages(at, uri):
+    repo = Repository.shared(uri)
+    for i in range(25):
+        save_plan(repo, f"p{i:02d}", "ana", created_at=f"2024-05-{1 + i:02d}T12:00:00", n_items=1)
+    at.run()
+    assert len(at.session_state["plans"]) == 20
+    button(at, "Carregar planos mais antigos").click().run()
+    assert not at.exception
+    assert [p["id"] for p in at.session_state["plans"]] == [f"p{i:02d}" for i in range(24, -1, -1)]
+    assert not [b for b in at.button if b.label == "Carregar planos mais antigos"]
+
+
+def test_dados_page_only_moves_the_users_plans(uri, tmp_path):
+    repo = Repository.shared(uri)
+    save_plan(repo, "p-ana", "ana")
+    save_plan(repo, "p-bob", "bob")
+    at = AppTest.from_file(DADOS, default_timeout=30).run()
+    assert not at.button  # no user chosen yet: nothing to export or import
+    at.session_state["display_name"] = "ana"
+    at.run()
+    assert not at.exception
+    assert at.selectbox == [] or set(at.selectbox[0].options) <= {"plano", "item_plano"}
+    button(at, "Gerar arquivo").click().run()
+    assert not at.exception
+    nome = at.session_state["export_file"]
+    with gzip.open(tmp_path / "exports" / nome, "rt", encoding="utf-8") as f:
+        linhas = [json.loads(l) for l in f]
+    assert linhas[0]["secoes"] == ["planos"]
+    assert {(l["tipo"], l.get("user_id", l.get("plan_id"))) for l in linhas[1:]} == {("plano", "ana"),
+                                                                                        ("item_plano", "p-ana")}
+
+
+def test_plan_from_the_app_round_trips_through_the_api(at, uri, api):
+    # the app keys plans by the name typed in the sidebar; the API account with that name owns them
+    generate(at)
+    plan_id = at.session_state["plans"][0]["id"]
+    assert api.post("/api/auth/register", json={"name": "ana", "email": "ana@power.test",
+                                                "password": PASSWORD}).status_code == 201
+    token = api.post("/api/auth/login", json={"email": "ana@power.test", "password": PASSWORD}).get_json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    exportado = api.get("/api/dados/export", headers=headers)
+    assert exportado.status_code == 200
+    linhas = [json.loads(l) for l in gzip.decompress(exportado.data).decode("utf-8").splitlines()]
+    assert [l["id"] for l in linhas if l["tipo"] == "plano"] == [plan_id]
+    assert sum(l["tipo"] == "item_plano" for l in linhas) == 7 * 3 * 2
+
+    repo = Repository.shared(uri)
+    with repo._conn() as conn:
+        conn.execute("DELETE FROM plans WHERE id = ?", (plan_id,))
+    r = api.post("/api/dados/import", data=exportado.data, headers=headers, content_type="application/gzip")
+    assert r.get_json()["stats"]["plano"] == {"lidos": 1, "inseridos": 1}
+    assert r.get_json()["stats"]["item_plano"]["inseridos"] == 7 * 3 * 2
+
+    fresh = AppTest.from_file(APP, default_timeout=30)
+    fresh.session_state["display_name"] = "ana"
+    fresh.run()
+    assert [p["id"] for p in fresh.session_state["plans"]] == [plan_id]
+
+
+def test_feed_panel_requeries_only_when_the_bus_moves(at, uri, monkeypatch):
+    lookups = []
+    real_counter = Repository.counter
+
+    def counter(self, name):
+        if name == CONTADOR_IMPORTACOES:
+            lookups.append(name)
+        return real_counter(self, name)
+
+    monkeypatch.setattr(Repository, "counter", counter)
+    at.run()
+    at.sidebar.selectbox[0].set_value("Feed").run()
+    assert not at.exception
+    assert len(lookups) == 2  # one get_community() per script run
+    community = resources.get_community()
+    assert at.session_state["seen_versions"]["feed"][0] == community.mudancas.origem
+
+    # an item inserted without a bus publication: the panel redraws the ids it already had
+    item = community.feed.new_article("Sem aviso", "corpo", "bob")
+    community.feed.insert(item)
+    at.run()
+    assert "Sem aviso" not in [s.value for s in at.subheader]
+    community.mudancas.publicar(FEED)
+    at.run()
+    assert not at.exception
+    assert "Sem aviso" in [s.value for s in at.subheader]
@@ -0,0 +1,70 @@
+import jwt
+
+from config import Config
+from services import auth
+from conftest import ADMIN_EMAIL, PASSWORD
+
+
+def register(client, email, password=PASSWORD, name="Ana"):
+    return client.post("/api/auth/register", json={"name": name, "email": email, "password": password})
+
+
+def test_register_validates_and_rejects_duplicates(client):
+    assert register(client, "ana@power.test", password="123").status_code == 400
+    assert register(client, "", name="").status_code == 400
+    r = register(client, " Ana@Power.test ")
+    assert r.status_code == 201
+    assert r.get_json()["email"] == "ana@power.test"
+    assert register(client, "ana@power.test").status_code == 409
+    # the name is the account's user key in the app: taken by another email is a conflict too
+    assert register(client, "outra@power.test").status_code == 409
+    assert register(client, "outra@power.test", name="Outra").status_code == 201
+
+
+def test_login_and_me(client):
+    register(client, "ana@power.test")
+    assert client.post("/api/auth/login", json={"email": "ana@power.test", "password": "errada"}).status_code == 401
+    assert client.post("/api/auth/login", json={"email": "ninguem@power.test", "password": PASSWORD}).status_code == 401
+
+    r = client.post("/api/auth/login", json={"email": "ANA@power.test", "password": PASSWORD})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["token_type"] == "Bearer"
+    me = client.get("/api/auth/me", headers={"Authorization": f"Bearer {body['access_token']}"})
+    assert me.status_code == 200
+    assert me.get_json()["email"] == "ana@power.test"
+
+
+def test_unknown_email_pays_for_a_password_check(client, monkeypatch):
+    register(client, "ana@power.test")
+    checks = []
+    real_verify = auth.verify_password
+
+    def verify_password(password, hash_, rounds=None):
+        checks.append(hash_)
+        return real_verify(password, hash_, rounds)
+
+    monkeypatch.setattr(auth, "verify_password", verify_password)
+    for email in ("ninguem@power.test", "outro@power.test", "ana@power.test"):
+        r = client.post("/api/auth/login", json={"email": email, "password": "errada"})
+        assert r.status_code == 401 and r.get_json() == {"error": "credenciais inválidas"}
+    # one pbkdf2 verify per attempt, against a dummy hash of the same cost when there is no account
+    assert len(checks) == 3 and checks[0] == checks[1] != checks[2]
+    assert checks[0].split("$")[2] == checks[2].split("$")[2]  # rounds
+
+
+def test_me_requires_a_valid_token(client):
+    assert client.get("/api/auth/me").status_code == 401
+    assert client.get("/api/auth/me", headers={"Authorization": "Bearer lixo"}).status_code == 401
+    forged = jwt.encode({"sub": "1"}, "another-secret-key-with-at-least-32-bytes", algorithm=Config.JWT_ALGORITHM)
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+
+
+def test_admin_claim_only_for_configured_emails(client):
+    def claims(email, name):
+        assert register(client, email, name=name).status_code == 201
+        token = client.post("/api/auth/login", json={"email": email, "password": PASSWORD}).get_json()["access_token"]
+        return jwt.decode(token, Config.SECRET_KEY, algorithms=[Config.JWT_ALGORITHM])
+
+    assert claims(ADMIN_EMAIL, "Admin").get("admin") is True
+    assert "admin" not in claims("ana@power.test", "Ana")
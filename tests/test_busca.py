@@ -0,0 +1,62 @@
+import sys
+import threading
+
+from services.busca import IndiceBusca, tokens
+
+
+def test_tokens_drop_accents_case_and_stopwords():
+    assert tokens("Refeição pós-treino com Proteína") == ["refeicao", "pos", "treino", "proteina"]
+    assert tokens(None) == []
+
+
+def test_ranking_weights_and_prefix():
+    idx = IndiceBusca()
+    idx.add(0, [("Nutrição esportiva", 2.0), ("carboidratos", 1.0)])
+    idx.add(1, [("Treino", 2.0), ("nutrição antes do treino", 1.0)])
+    idx.add(2, [("Nutricionista", 2.0), ("", 1.0)])
+    idx.add(0, [("outra coisa", 1.0)])  # already indexed: ignored
+    assert len(idx) == 3
+    assert [d for d, _ in idx.buscar("nutricao")] == [0, 1]  # title weighs more than the body
+    assert sorted(d for d, _ in idx.buscar("nutric")) == [0, 1, 2]
+    assert [d for d, _ in idx.buscar("nutricao treino")] == [1]  # every term must match
+    idx.add(3, [("nutric", 1.0)])
+    assert idx.buscar("nutric")[0][0] == 3  # exact beats prefix-only
+    assert idx.buscar("inexistente") == []
+    assert idx.buscar("de") == []
+
+
+def test_scopes_and_limit():
+    idx = IndiceBusca()
+    for i in range(30):
+        idx.add(i, [("treino de perna", 1.0)], escopos=[("type", "photo" if i % 3 else "article")])
+    hits = [d for d, _ in idx.buscar("perna", limite=5, escopo=("type", "article"))]
+    assert len(hits) == 5 and all(d % 3 == 0 for d in hits)
+    assert hits == sorted(hits, reverse=True)  # ties: newest first
+    assert len(idx.buscar("perna", limite=100, escopo=("type", "photo"))) == 20
+    assert idx.buscar("perna", escopo=("group", "nenhum")) == []
+
+
+def test_vocabulary_keeps_terms_added_while_searching():
+    # adds from one thread, prefix searches (which merge the new terms) from others
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        idx = IndiceBusca()
+        parar = threading.Event()
+
+        def buscar():
+            while not parar.is_set():
+                idx.buscar("termo1")
+
+        leitores = [threading.Thread(target=buscar) for _ in range(3)]
+        for t in leitores:
+            t.start()
+        for i in range(5_000):
+            idx.add(i, [(f"termo{i}", 1.0)])
+        parar.set()
+        for t in leitores:
+            t.join()
+    finally:
+        sys.setswitchinterval(old)
+    assert idx._vocabulario() == sorted(f"termo{i}" for i in range(5_000))
+    assert sorted(d for d, _ in idx.buscar("termo499")) == [499] + list(range(4990, 5000))
@@ -0,0 +1,89 @@
+import sys
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from services.community import Community
+from services.mudancas import CURTIDAS, GRUPOS
+
+IMAGE = {"thumb": "t.webp", "feed": "f.webp", "full": "o.jpg"}
+
+
+@contextmanager
+def switch_often():
+    # thread switches every microsecond, so check-then-act races show up
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(old)
+
+
+def together(n, fn):
+    # n threads start fn(i) at the same time -> their return values
+    barreira = threading.Barrier(n)
+    resultados = [None] * n
+
+    def run(i):
+        barreira.wait()
+        resultados[i] = fn(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resultados
+
+
+@pytest.fixture
+def community(repo):
+    c = Community(repo)
+    c.create_group("Time A", "ana")
+    return c
+
+
+def test_concurrent_likes_count_once_per_user(community, repo):
+    community.add_photo("ana", "Agachamento", IMAGE, group="Time A")
+    feed_id = community.feed.photos(uploader="ana")[0]["feed_id"]
+    users = [f"u{i}" for i in range(40)]
+    with switch_often():
+        # 8 sessions, each liking as every user: only the first like of each user counts
+        oks = together(8, lambda _: sum(community.like(feed_id, u) for u in users))
+    assert sum(oks) == 40
+    assert community.feed.get(feed_id)["likes"] == 40
+    assert community.leaderboard.stats("Time A")["likes"] == 40
+    assert community.mudancas.versao(CURTIDAS, "Time A") == 40
+    repo.behind.flush()
+    assert repo._conn().execute("SELECT COUNT(*) FROM likes").fetchone()[0] == 40
+    # rebuilt from the tables: same counts
+    copia = Community(repo)
+    assert copia.feed.get(feed_id)["likes"] == 40 and copia.leaderboard.top() == community.leaderboard.top()
+
+
+def test_concurrent_joins_and_group_creation(community, repo):
+    with switch_often():
+        # the same 30 users joining from 6 threads: each one enters once
+        entradas = together(6, lambda _: [community.join_group("Time A", f"u{i}") for i in range(30)])
+        criados = together(6, lambda _: community.create_group("Time B", "bob"))
+    assert [sum(e[i] for e in entradas) for i in range(30)] == [1] * 30
+    membros = community.groups["Time A"]["members"]
+    assert len(membros) == len(set(membros)) == 31
+    assert community.leaderboard.stats("Time A")["members"] == 31
+    assert community.mudancas.versao(GRUPOS, "Time A") == 1 + 30
+    assert criados.count(True) == 1 and community.group_names() == ["Time A", "Time B"]
+    assert community.join_group("Time C", "ana") is None
+
+
+def test_photos_and_joins_on_one_group_do_not_lose_updates(community):
+    def posta_e_entra(i):
+        community.add_photo(f"u{i}", f"foto {i}", IMAGE, group="Time A")
+        return community.join_group("Time A", f"u{i}")
+
+    with switch_often():
+        assert all(together(12, posta_e_entra))
+    grupo = community.groups["Time A"]
+    assert len(grupo["photos"]) == 12 and len(set(grupo["photos"])) == 12
+    assert community.leaderboard.stats("Time A") == {"likes": 0, "photos": 12, "members": 13}
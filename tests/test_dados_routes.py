@@ -0,0 +1,101 @@
+import gzip
+import json
+
+import pytest
+
+from conftest import ADMIN_EMAIL, save_plan
+from services.exportacao import CONTADOR_IMPORTACOES, SECOES
+from services.repository import Repository
+
+
+@pytest.fixture
+def shared_repo(app):
+    # the instance the /api/dados routes use
+    return Repository.shared(app.config["SQLALCHEMY_DATABASE_URI"])
+
+
+def ndjson(r):
+    assert r.status_code == 200
+    return [json.loads(l) for l in gzip.decompress(r.data).decode("utf-8").splitlines()]
+
+
+def header():
+    return json.dumps({"tipo": "cabecalho", "formato": "power_routine.export", "versao": 1}) + "\n"
+
+
+def test_requires_token(client):
+    assert client.get("/api/dados/export").status_code == 401
+    assert client.post("/api/dados/import", data=header()).status_code == 401
+
+
+def test_export_is_scoped_to_the_caller(client, login, shared_repo):
+    ana, headers = login("ana@power.test")
+    bob, _ = login("bob@power.test", name="Bob")
+    save_plan(shared_repo, "p-ana", ana)
+    save_plan(shared_repo, "p-bob", bob)
+
+    linhas = ndjson(client.get("/api/dados/export", headers=headers))
+    assert [l["id"] for l in linhas if l["tipo"] == "plano"] == ["p-ana"]
+    assert {l["plan_id"] for l in linhas if l["tipo"] == "item_plano"} == {"p-ana"}
+    # user_id of someone else is ignored without the admin claim
+    linhas = ndjson(client.get(f"/api/dados/export?user_id={bob}", headers=headers))
+    assert [l["id"] for l in linhas if l["tipo"] == "plano"] == ["p-ana"]
+
+    assert client.get("/api/dados/export?secoes=comunidade", headers=headers).status_code == 403
+    assert client.get("/api/dados/export/foto.csv", headers=headers).status_code == 403
+    assert client.get("/api/dados/export?secoes=outra", headers=headers).status_code == 400
+    csv_linhas = gzip.decompress(client.get("/api/dados/export/plano.csv", headers=headers).data).decode().splitlines()
+    assert len(csv_linhas) == 2 and csv_linhas[1].startswith("p-ana,")
+
+
+def test_admin_exports_everything(client, login, shared_repo):
+    ana, _ = login("ana@power.test")
+    _, headers = login(ADMIN_EMAIL, name="Admin")
+    save_plan(shared_repo, "p-ana", ana)
+    save_plan(shared_repo, "p-bob", "Bob")
+    linhas = ndjson(client.get("/api/dados/export", headers=headers))
+    assert sorted(l["id"] for l in linhas if l["tipo"] == "plano") == ["p-ana", "p-bob"]
+    assert linhas[0]["secoes"] == list(SECOES)
+    linhas = ndjson(client.get(f"/api/dados/export?secoes=planos&user_id={ana}", headers=headers))
+    assert [l["id"] for l in linhas if l["tipo"] == "plano"] == ["p-ana"]
+
+
+def test_import_only_writes_the_callers_records(client, login, shared_repo):
+    ana, headers = login("ana@power.test")
+    plano = {"tipo": "plano", "target_calories": 1800, "days": 1, "meals_per_day": 1, "objetivo": "Cutting",
+             "created_at": "2024-05-02T08:00:00", "status": "generated_local", "progress": 100, "item_count": 1,
+             "done_count": 0}
+    corpo = header() + "".join(json.dumps(r) + "\n" for r in (
+        dict(plano, id="meu", user_id=str(ana)),
+        dict(plano, id="alheio", user_id="bob"),
+        {"tipo": "item_plano", "plan_id": "meu", "idx": 0, "day": 1, "meal_name": "Café", "food_name": "Ovo",
+         "portion_g": 50, "kcal": 73, "done": 0},
+        {"tipo": "grupo", "name": "Time A", "id": "g1", "created_at": "2024-05-01T00:00:00"},
+    ))
+    antes = shared_repo.counter(CONTADOR_IMPORTACOES)
+    r = client.post("/api/dados/import", data=gzip.compress(corpo.encode()), headers=headers,
+                    content_type="application/gzip")
+    assert r.status_code == 200
+    stats = r.get_json()["stats"]
+    assert stats["plano"] == {"lidos": 2, "inseridos": 1}
+    assert stats["item_plano"] == {"lidos": 1, "inseridos": 1}
+    assert stats["grupo"] == {"lidos": 1, "inseridos": 0}
+    assert [p["id"] for p in shared_repo.list_plans(str(ana))] == ["meu"]
+    assert shared_repo.list_plans("bob") == []
+    # the Streamlit app rebuilds its cached Community when this counter moves
+    assert shared_repo.counter(CONTADOR_IMPORTACOES) == antes + 1
+
+    # same file again: nothing new
+    r = client.post("/api/dados/import", data=corpo, headers=headers)
+    assert r.get_json()["stats"]["plano"] == {"lidos": 2, "inseridos": 0}
+    assert client.post("/api/dados/import?tipo=grupo", data="name,id,created_at\n", headers=headers).status_code == 403
+
+
+def test_import_rejects_bad_files(client, login):
+    _, headers = login("ana@power.test")
+    assert client.post("/api/dados/import", data="isto não é json\n", headers=headers).status_code == 400
+    assert client.post("/api/dados/import", data=b"\x1f\x8b\x08\x00truncado", headers=headers,
+                       content_type="application/gzip").status_code == 400
+    outro = json.dumps({"tipo": "cabecalho", "formato": "outro", "versao": 1}) + "\n"
+    assert client.post("/api/dados/import", data=outro, headers=headers).status_code == 400
+    assert client.post("/api/dados/import?tipo=nada", data="", headers=headers).status_code == 400
@@ -0,0 +1,126 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from conftest import save_plan
+from services.exportacao import (CONTADOR_IMPORTACOES, Importacao, exportar_csv, exportar_ndjson, gravar,
+                                 importar_csv, importar_ndjson)
+from services.progresso import HistoricoPeso
+from services.repository import Repository
+
+COMUNIDADE = ("grupo", "membro", "feed_item", "foto", "curtida")
+
+
+@pytest.fixture
+def origem(repo, tmp_path):
+    # a bit of everything: group + member, article, photo in the group, likes, two users' plans, weigh-ins
+    repo.add_group("Time A", "g1", "2024-05-01T08:00:00")
+    repo.add_member("Time A", "ana", "2024-05-01T08:01:00")
+    artigo = {"id": "a-1", "type": "article", "author": "ana", "created_at": "2024-05-01T09:00:00",
+              "data": {"title": "Proteína", "body": "Texto com \"aspas\"\ne quebra", "tags": ["nutrição"]}}
+    repo.add_feed_item(artigo)
+    foto = {"id": "p-1", "type": "photo", "author": "bob", "created_at": "2024-05-01T10:00:00",
+            "data": {"photo_id": "f1"}}
+    repo.add_feed_item(foto, group="Time A", photo={"id": "f1", "uploader": "bob", "caption": "Agachamento",
+                                                    "image": {"thumb": "ab/cd.webp"}, "created_at": foto["created_at"],
+                                                    "group": "Time A"})
+    repo.add_like("a-1", "bob", "2024-05-01T11:00:00")
+    repo.add_like("p-1", "ana", "2024-05-01T11:05:00")
+    save_plan(repo, "p-ana", "ana", n_items=4)
+    save_plan(repo, "p-bob", "bob", n_items=2)
+    historico = HistoricoPeso(str(tmp_path / "progresso.csv"))
+    historico.registrar_lote([("2024-05-01", 80.0), ("2024-05-08", 79.4)])
+    return repo, historico
+
+
+def exportado(repo, historico, **kw):
+    return gzip.decompress(b"".join(exportar_ndjson(repo, progresso_path=historico.path, **kw)))
+
+
+def test_ndjson_round_trip_and_reimport(origem, tmp_path):
+    repo, historico = origem
+    arquivo = tmp_path / "export.ndjson.gz"
+    gravar(exportar_ndjson(repo, progresso_path=historico.path), arquivo)
+
+    destino = Repository(str(tmp_path / "destino.db"))
+    hist_destino = HistoricoPeso(str(tmp_path / "destino.csv"))
+    try:
+        stats = importar_ndjson(destino, str(arquivo), historico=hist_destino, lote=3)
+        assert {t: s["inseridos"] for t, s in stats.items()} == {
+            "grupo": 1, "membro": 1, "feed_item": 2, "foto": 1, "curtida": 2, "plano": 2, "item_plano": 6,
+            "pesagem": 2}
+        assert destino.counter(CONTADOR_IMPORTACOES) > 0
+        # the copy exports to the same records (the header carries the time of the export)
+        assert exportado(destino, hist_destino).splitlines()[1:] == exportado(repo, historico).splitlines()[1:]
+        assert [dict(i, plan_id=None) for i in destino.plan_items("p-ana")] == \
+            [dict(i, plan_id=None) for i in repo.plan_items("p-ana")]
+
+        # same file again: everything read, nothing inserted
+        stats = importar_ndjson(destino, str(arquivo), historico=hist_destino)
+        assert all(s["inseridos"] == 0 and s["lidos"] for s in stats.values())
+    finally:
+        destino.close()
+
+
+def test_user_scope(origem, tmp_path):
+    repo, historico = origem
+    linhas = [json.loads(l) for l in exportado(repo, historico, secoes=("planos",), usuario="ana").splitlines()]
+    assert {l["tipo"] for l in linhas[1:]} == {"plano", "item_plano"}
+    assert {l.get("user_id", l.get("plan_id")) for l in linhas[1:]} == {"ana", "p-ana"}
+
+    # restricted import: only ana's plans and their items get in
+    destino = Repository(str(tmp_path / "destino.db"))
+    try:
+        stats = importar_ndjson(destino, io.BytesIO(exportado(repo, historico)), usuario="ana")
+        assert stats["plano"] == {"lidos": 2, "inseridos": 1}
+        assert stats["item_plano"] == {"lidos": 6, "inseridos": 4}
+        assert all(stats[t]["inseridos"] == 0 for t in COMUNIDADE)
+        assert [p["id"] for p in destino.list_plans("ana")] == ["p-ana"]
+    finally:
+        destino.close()
+
+
+def test_csv_round_trip(origem, tmp_path):
+    repo, historico = origem
+    destino = Repository(str(tmp_path / "destino.db"))
+    try:
+        for tipo in ("feed_item", "foto", "plano", "item_plano"):
+            csv_gz = io.BytesIO(b"".join(exportar_csv(repo, tipo)))
+            assert importar_csv(destino, tipo, csv_gz)[tipo]["inseridos"] > 0
+        item = next(i for i, _, _ in destino.iter_feed() if i["id"] == "a-1")
+        assert item["data"] == {"title": "Proteína", "body": "Texto com \"aspas\"\ne quebra", "tags": ["nutrição"]}
+        _, foto, _ = next(f for f in destino.iter_feed() if f[1])
+        assert foto["image"] == {"thumb": "ab/cd.webp"}
+        assert len(destino.plan_items("p-bob")) == 2
+    finally:
+        destino.close()
+
+
+def test_bad_input_raises_value_error(repo, tmp_path):
+    cabecalho = '{"tipo":"cabecalho","formato":"power_routine.export","versao":1}\n'
+    for corpo in ("nao e json\n", '{"sem_tipo": 1}\n', '{"tipo":"cabecalho","formato":"outro"}\n',
+                  cabecalho + '{"tipo":"pesagem","dia":"2024-05-01"}\n'):
+        with pytest.raises(ValueError):
+            importar_ndjson(repo, io.BytesIO(corpo.encode()), historico=HistoricoPeso(str(tmp_path / "p.csv")))
+    with pytest.raises(ValueError):
+        importar_ndjson(repo, io.BytesIO(gzip.compress(cabecalho.encode())[:-6]))
+    with pytest.raises(ValueError):
+        importar_csv(repo, "nada", io.BytesIO(b""))
+    # a parent that does not exist: skipped, not an error
+    stats = importar_ndjson(repo, io.BytesIO((cabecalho + '{"tipo":"curtida","feed_id":"x","user":"ana",'
+                                                          '"created_at":"2024-05-01"}\n').encode()))
+    assert stats["curtida"] == {"lidos": 1, "inseridos": 0}
+
+
+def test_failed_batch_writes_no_weigh_ins(repo, tmp_path):
+    historico = HistoricoPeso(str(tmp_path / "p.csv"))
+    imp = Importacao(repo, historico)
+    imp.add("pesagem", {"dia": "2024-05-01", "peso": 80.0})
+    imp.add("plano", {"id": {"não": "é um valor"}, "user_id": "ana"})  # the database refuses the batch
+    with pytest.raises(ValueError):
+        imp.flush()
+    historico.refresh()
+    assert len(historico) == 0
+    assert repo.list_plans("ana") == []
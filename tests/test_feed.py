@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.feed import ORDER_HOT, ORDER_LIKES, FeedStore, SortedKeys
+
+
+@pytest.fixture
+def store():
+    store = FeedStore()
+    for i in range(5):
+        store.add_article(f"Artigo {i}", "proteína e treino" if i % 2 else "descanso", "ana")
+    for i in range(3):
+        store.add_photo("bob", f"Treino de perna {i}", {}, group="Time A")
+    return store
+
+
+def walk(store, **kw):
+    out, cursor = [], None
+    while True:
+        items, cursor = store.page(cursor=cursor, limit=3, **kw)
+        out += items
+        if cursor is None:
+            return out
+
+
+def test_sorted_keys_stays_ordered_across_chunks(monkeypatch):
+    monkeypatch.setattr(SortedKeys, "CHUNK", 4)
+    keys = SortedKeys()
+    for k in (5, 1, 9, 3, 7, 2, 8, 6, 4, 0, 11, 10):
+        keys.add(k)
+    keys.remove(6)
+    assert keys.after(None, 100) == [0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 11]
+    assert keys.after(4, 3) == [5, 7, 8]
+    assert len(keys) == 11
+
+
+def test_recent_pages_cover_each_item_once(store):
+    items = walk(store)
+    assert len(items) == len(store) == 8
+    assert len({i["id"] for i in items}) == 8
+    assert [i["type"] for i in items[:3]] == ["photo"] * 3  # newest first
+    assert [i["data"]["title"] for i in walk(store, type_="article")] == [f"Artigo {i}" for i in range(4, -1, -1)]
+    assert len(walk(store, group="Time A")) == 3
+    assert store.page(type_="article", group="Time A") == ([], None)
+
+
+def test_likes_count_once_per_user_and_reorder(store):
+    oldest = walk(store)[-1]
+    assert store.like(oldest["id"], "carla")
+    assert not store.like(oldest["id"], "carla")
+    assert store.like(oldest["id"], "davi")
+    assert not store.like("nao-existe", "carla")
+    assert oldest["likes"] == 2
+    top = walk(store, order=ORDER_LIKES)
+    assert top[0]["id"] == oldest["id"]
+    assert len(top) == 8
+
+
+def test_hot_order_prefers_recent_likes():
+    store = FeedStore()
+    antigo = store.new_article("Antigo", "", "ana")
+    antigo["created_at"] = (datetime.now() - timedelta(days=3)).isoformat()
+    store.load(antigo)
+    novo = store.add_article("Novo", "", "ana")
+    items, _ = store.page(order=ORDER_HOT)
+    assert [i["id"] for i in items] == [novo, antigo["id"]]
+    # several likes now outweigh three days of decay
+    for user in "abcdefghij":
+        store.like(antigo["id"], user)
+    items, _ = store.page(order=ORDER_HOT)
+    assert items[0]["id"] == antigo["id"]
+
+
+def test_search_catches_up_with_new_items(store):
+    items, _ = store.search("proteina")
+    assert sorted(i["data"]["title"] for i in items) == ["Artigo 1", "Artigo 3"]
+    store.add_article("Proteína vegetal", "tofu", "carla")
+    items, _ = store.search("protein")
+    assert items[0]["data"]["title"] == "Proteína vegetal"  # title weighs more than the body
+    assert len(items) == 3
+    photos, _ = store.search("perna", group="Time A")
+    assert len(photos) == 3
+    assert store.search("perna", type_="article") == ([], None)
+
+
+def test_filter_combinations_match_a_scan():
+    store = FeedStore()
+    for i in range(60):
+        author = ("ana", "bob", "carla")[i % 3]
+        if i % 4:
+            store.add_photo(author, f"foto {i}", {}, group=("Time A", "Time B", None)[i % 5 % 3])
+        else:
+            store.add_article(f"Artigo {i}", "", author)
+    todos = store.filter()
+    for type_ in (None, "photo", "article"):
+        for group in (None, "Time A", "Time B", "nenhum"):
+            for author in (None, "ana", "bob", "ninguém"):
+                esperado = [i for i in todos if (type_ is None or i["type"] == type_)
+                            and (author is None or i["author"] == author)
+                            and (group is None or (store.photo_of(i) or {}).get("group") == group)]
+                assert store.filter(type_, group, author) == esperado, (type_, group, author)
+    assert [p["uploader"] for p in store.photos("bob")] == [i["author"] for i in store.filter("photo", author="bob")]
+    assert len(store.photos()) == 45
+
+
+def test_hot_cursor_walks_the_top_once_while_likes_arrive():
+    store = FeedStore()
+    agora = datetime.now()
+    ids = []
+    for i in range(30):
+        item = store.new_article(f"Artigo {i}", "", "ana")
+        item["created_at"] = (agora - timedelta(hours=i)).isoformat()
+        store.load(item)
+        ids.append(item["id"])
+    for i, feed_id in enumerate(ids):
+        for u in range(i % 7):
+            store.like(feed_id, f"u{u}", agora)
+    esperado = sorted(ids, key=lambda f: (-store.get(f)["hot"], -store.get(f)["seq"]))
+    assert [i["id"] for i in walk(store, order=ORDER_HOT)] == esperado
+
+    # likes between pages: an item that moves above the cursor is not repeated, the rest keep their order
+    primeira, cursor = store.page(order=ORDER_HOT, limit=10)
+    assert [i["id"] for i in primeira] == esperado[:10]
+    subiu = esperado[25]
+    for u in range(50):
+        store.like(subiu, f"fã{u}", agora)
+    resto = []
+    while cursor is not None:
+        items, cursor = store.page(order=ORDER_HOT, cursor=cursor, limit=10)
+        resto += [i["id"] for i in items]
+    assert resto == [f for f in esperado[10:] if f != subiu]
+    assert store.page(order=ORDER_HOT, limit=1)[0][0]["id"] == subiu
+    # the top-K of a scope: only that scope's keys
+    assert store.page(type_="photo", order=ORDER_HOT) == ([], None)
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from config import Config
+from flask_app import create_app
+from models import Food, Tag, db, upgrade_schema
+from routes.food_routes import prefix_successor
+
+FOODS = [
+    ("Peito de Frango", 165, 31.0, ["Low Carb", "proteína"]),
+    ("Pêssego", 39, 0.9, ["fruta", "vegano"]),
+    ("Pão integral", 253, 9.4, ["vegano"]),
+    ("Patinho moído", 219, 35.9, ["low-carb"]),
+    ("Tofu", 76, 8.0, ["vegano", "LOW_CARB"]),
+]
+
+
+@pytest.fixture
+def foods(app):
+    with app.app_context():
+        for name, kcal, protein, tags in FOODS:
+            food = Food(name=name, calories=kcal, protein=protein)
+            food.set_tags(tags)
+            db.session.add(food)
+        db.session.commit()
+
+
+def names(r):
+    assert r.status_code == 200
+    return [f["name"] for f in r.get_json()["items"]]
+
+
+def test_prefix_ignores_accents_and_case(client, foods):
+    assert names(client.get("/api/foods/search?q=PES")) == ["Pêssego"]
+    assert names(client.get("/api/foods/search?q=pa")) == ["Pão integral", "Patinho moído"]
+
+
+def test_prefix_range_covers_non_bmp_next_characters(app, client, foods):
+    with app.app_context():
+        for name in ("Tofu🥑", "Tofu\U0010ffff", "Tofv", "Tog"):
+            db.session.add(Food(name=name, calories=80))
+        db.session.commit()
+    assert names(client.get("/api/foods/search?q=tofu")) == ["Tofu", "Tofu🥑", "Tofu\U0010ffff"]
+    assert names(client.get("/api/foods/search?q=tofu🥑")) == ["Tofu🥑"]
+    assert names(client.get("/api/foods/search?q=tofu\U0010ffff")) == ["Tofu\U0010ffff"]
+    assert prefix_successor("a\U0010ffff") == "b" and prefix_successor("\ud7ff") == "\ue000"
+    assert prefix_successor("\U0010ffff") is None
+
+
+def test_tags_are_normalized_and_all_must_match(client, foods):
+    assert names(client.get("/api/foods/search?tags=low carb")) == ["Patinho moído", "Peito de Frango", "Tofu"]
+    assert names(client.get("/api/foods/search?tags=Vegano,low-carb")) == ["Tofu"]
+    assert names(client.get("/api/foods/search?tags=inexistente")) == []
+    r = client.get("/api/foods/search?q=tofu")
+    assert r.get_json()["items"][0]["tags"] == ["low-carb", "vegano"]
+
+
+def test_range_filters(client, foods):
+    assert names(client.get("/api/foods/search?min_protein=20&max_kcal=200")) == ["Peito de Frango"]
+    assert client.get("/api/foods/search?min_kcal=abc").status_code == 400
+
+
+def test_cursor_walks_every_food_once(client, foods):
+    seen, cursor = [], None
+    while True:
+        r = client.get("/api/foods/search", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen += names(r)
+        cursor = r.get_json()["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["Pão integral", "Patinho moído", "Peito de Frango", "Pêssego", "Tofu"]
+
+
+def test_bad_limit_and_cursor(client, foods):
+    assert client.get("/api/foods/search?limit=x").status_code == 400
+    assert client.get("/api/foods/search?cursor=nao-e-cursor").status_code == 400
+    assert len(names(client.get("/api/foods/search?limit=0"))) == 1
+
+
+def test_startup_migrates_legacy_tags_and_name_key(app, tmp_path, monkeypatch):
+    # database from before normalized tags: free-form foods.tags string and no name_key
+    legacy = tmp_path / "legacy.db"
+    with sqlite3.connect(legacy) as conn:
+        conn.execute("CREATE TABLE foods (id INTEGER PRIMARY KEY, name VARCHAR(150) NOT NULL, calories FLOAT NOT NULL, "
+                     "protein FLOAT, carbs FLOAT, fats FLOAT, tags VARCHAR(200))")
+        conn.executemany("INSERT INTO foods (name, calories, protein, tags) VALUES (?, ?, ?, ?)",
+                         [("Açaí", 58, 0.8, "Vegano, fruta"), ("Ovo", 146, 13.3, "low carb"), ("Arroz", 128, 2.5, "")])
+    conn.close()
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{legacy}")
+    legacy_app = create_app()
+    client = legacy_app.test_client()
+    assert names(client.get("/api/foods/search?q=acai")) == ["Açaí"]
+    assert names(client.get("/api/foods/search?tags=vegano")) == ["Açaí"]
+    assert names(client.get("/api/foods/search?tags=low-carb")) == ["Ovo"]
+    with legacy_app.app_context():
+        upgrade_schema()  # every startup runs it: nothing left to migrate
+        assert sorted(t.name for t in Tag.query.all()) == ["fruta", "low-carb", "vegano"]
+        db.engine.dispose()
@@ -0,0 +1,98 @@
+import threading
+import time
+
+from services import jobs as jobs_module
+from services.jobs import CANCELLED, DONE, FAILED, JobManager
+from services.plano_alimentar import generate_plan
+
+
+def wait(manager, job_id):
+    for _ in range(500):
+        job = manager.get(job_id)
+        if job["status"] in (DONE, FAILED, CANCELLED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_runs_steps_and_collects_items():
+    manager = JobManager(max_workers=1)
+    job_id = manager.submit(generate_plan, 2000, 3, 3, seed=1, meta={"id": "p1"})
+    job = wait(manager, job_id)
+    assert (job["status"], job["progress"], job["item_count"], job["meta"]) == (DONE, 100, 3 * 3 * 2, {"id": "p1"})
+    assert len(manager.items(job_id)) == 18
+    manager.release(job_id)
+    assert manager.get(job_id) is None and manager.items(job_id) is None and not manager.cancel(job_id)
+
+
+def test_cancel_stops_the_solve_before_the_first_step():
+    manager = JobManager(max_workers=1)
+    solving, checks = threading.Event(), []
+
+    def steps(cancelado):
+        def check():
+            checks.append(1)
+            solving.set()
+            time.sleep(0.005)
+            return cancelado()
+        # a year of plans: seconds of solving before the first step without the cancel check
+        return generate_plan(2000, 365, 6, seed=1, cancelado=check)
+
+    job_id = manager.submit(steps, cancel_arg="cancelado")
+    assert solving.wait(5)
+    assert manager.cancel(job_id)
+    job = wait(manager, job_id)
+    assert (job["status"], job["item_count"]) == (CANCELLED, 0)
+    assert len(checks) < 365  # stopped inside the first pass over the days
+
+
+def test_failed_and_queued_cancel():
+    manager = JobManager(max_workers=1)
+    liberar = threading.Event()
+
+    def bloqueia():
+        liberar.wait(5)
+        yield {"progress": 100, "current_item": None, "new_items": []}
+
+    def falha():
+        raise RuntimeError("sem catálogo")
+        yield
+
+    primeiro = manager.submit(bloqueia)
+    na_fila = manager.submit(falha)
+    assert manager.get(na_fila)["status"] == "queued" and manager.active() == 2
+    assert manager.cancel(na_fila) and manager.get(na_fila)["status"] == CANCELLED
+    liberar.set()
+    assert wait(manager, primeiro)["status"] == DONE
+    erro = wait(manager, manager.submit(falha))
+    assert (erro["status"], erro["error"]) == (FAILED, "sem catálogo")
+
+
+def test_lookups_while_submit_purges(monkeypatch):
+    # every finished job is already past its TTL: each submit deletes from _jobs while readers iterate it
+    monkeypatch.setattr(jobs_module, "JOB_TTL_SECONDS", -1)
+    manager = JobManager(max_workers=4)
+    ids, erros, parar = [], [], threading.Event()
+
+    def ler():
+        try:
+            while not parar.is_set():
+                manager.active()
+                for job_id in ids[-20:]:
+                    manager.get(job_id)
+                    manager.items(job_id)
+        except Exception as e:  # reported by the assertion below
+            erros.append(e)
+
+    def vazio():
+        yield {"progress": 100, "current_item": None, "new_items": [1]}
+
+    leitores = [threading.Thread(target=ler) for _ in range(3)]
+    for t in leitores:
+        t.start()
+    for _ in range(2000):
+        ids.append(manager.submit(vazio))
+    parar.set()
+    for t in leitores:
+        t.join()
+    assert erros == []
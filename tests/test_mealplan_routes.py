@@ -0,0 +1,71 @@
+import json
+
+from models import MealPlan, MealPlanItem, db
+from routes import mealplan_routes
+from services.plano_alimentar import generate_plan
+
+PEDIDO = {"user_id": "ana", "target_calories": 2000, "days": 3, "meals_per_day": 2, "objetivo": "Cutting"}
+
+
+def stream(client, **pedido):
+    r = client.post("/api/mealplans/stream", json=dict(PEDIDO, **pedido), buffered=False)
+    assert r.status_code == 200 and r.mimetype == "application/x-ndjson"
+    return r
+
+
+def linhas(r):
+    # one JSON object per line, as the app's ApiClient reads them
+    pendente = b""
+    for bloco in r.response:
+        pendente += bloco
+        while b"\n" in pendente:
+            linha, pendente = pendente.split(b"\n", 1)
+            yield json.loads(linha)
+    assert pendente == b""
+
+
+def saved(app, plan_id):
+    with app.app_context():
+        plan = db.session.get(MealPlan, plan_id)
+        n = db.session.query(MealPlanItem).filter(MealPlanItem.plan_id == plan_id).count()
+        return plan.status, n
+
+
+def test_stream_persists_each_day_before_sending_it(app, client):
+    r = stream(client)
+    msgs = linhas(r)
+    cabecalho = next(msgs)
+    plan_id = cabecalho["plan_id"]
+    assert cabecalho["plan"]["objetivo"] == "Cutting"
+    enviados = []
+    for msg in msgs:
+        if msg.get("done"):
+            break
+        enviados += msg["new_items"]
+        assert {i["day"] for i in msg["new_items"]} == {len(enviados) // (2 * 2)}
+        # the day is already committed when its line arrives
+        assert saved(app, plan_id) == ("generating", len(enviados))
+    assert msg == {"progress": 100, "done": True, "status": "generated", "item_count": 3 * 2 * 2}
+    assert list(msgs) == []
+    assert saved(app, plan_id) == ("generated", 12)
+    assert client.get(f"/api/mealplans/{plan_id}/items").get_json() == \
+        [{k: i[k] for k in MealPlanItem.FIELDS} for i in enviados]
+
+
+def test_generation_error_is_reported_in_the_stream(app, client, monkeypatch):
+    def quebra(*args, **kwargs):
+        passos = generate_plan(*args, **kwargs)
+        yield next(passos)
+        raise RuntimeError("catálogo corrompido")
+
+    monkeypatch.setattr(mealplan_routes, "generate_plan", quebra)
+    msgs = list(linhas(stream(client)))
+    assert [sorted(m) for m in msgs[:2]] == [["plan", "plan_id"], ["current_item", "new_items", "progress"]]
+    assert msgs[2:] == [{"error": "catálogo corrompido"}]
+    # the day sent before the failure stays; the plan is marked failed
+    assert saved(app, msgs[0]["plan_id"]) == ("failed", 4)
+
+
+def test_bad_request_is_a_plain_400(client):
+    r = client.post("/api/mealplans/stream", json=dict(PEDIDO, days=0))
+    assert r.status_code == 400 and "days" in r.get_json()["error"]
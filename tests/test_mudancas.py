@@ -0,0 +1,51 @@
+import threading
+
+from services.community import Community
+from services.mudancas import CURTIDAS, FEED, GRUPOS, RANKING, BarramentoMudancas
+
+
+def test_versions_per_topic_and_key():
+    bus = BarramentoMudancas()
+    assert bus.versao(FEED) == 0
+    assert bus.publicar(FEED, "Time A") == 1
+    assert bus.publicar(FEED, None) == 2  # no key: only the topic moves
+    assert (bus.versao(FEED), bus.versao(FEED, "Time A"), bus.versao(FEED, "Time B")) == (2, 1, 0)
+    assinatura = (FEED, (FEED, "Time A"), RANKING)
+    assert bus.versoes(assinatura) == (bus.origem, 2, 1, 0)
+    visto = bus.versoes(assinatura)
+    bus.publicar(FEED, "Time B")
+    assert bus.versoes(((FEED, "Time A"),)) == (bus.origem, 1)  # another group's post: no change for Time A
+    assert bus.versoes(assinatura) != visto
+    # a new bus (cache cleared) never compares equal to versions seen on the old one
+    assert BarramentoMudancas().versoes(()) != bus.versoes(())
+
+
+def test_concurrent_publishes_are_all_counted():
+    bus = BarramentoMudancas()
+
+    def publicar():
+        for _ in range(2000):
+            bus.publicar(CURTIDAS, "Time A")
+
+    threads = [threading.Thread(target=publicar) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert bus.versao(CURTIDAS) == bus.versao(CURTIDAS, "Time A") == 8000
+
+
+def test_community_publishes_each_change(repo):
+    c = Community(repo)
+    bus = c.mudancas
+    c.add_article("Título", "corpo", "ana")
+    assert (bus.versao(FEED), bus.versao(RANKING)) == (1, 0)
+    assert c.create_group("Time A", "ana")
+    assert (bus.versao(GRUPOS, "Time A"), bus.versao(RANKING)) == (1, 1)
+    assert c.join_group("Time A", "bob") and not c.join_group("Time A", "bob")
+    assert (bus.versao(GRUPOS, "Time A"), bus.versao(RANKING)) == (2, 2)
+    c.add_photo("bob", "Agachamento", {"thumb": "t", "feed": "f", "full": "o"}, group="Time A")
+    assert (bus.versao(FEED), bus.versao(FEED, "Time A"), bus.versao(RANKING)) == (2, 1, 3)
+    feed_id = c.feed.photos(uploader="bob")[0]["feed_id"]
+    assert c.like(feed_id, "ana") and not c.like(feed_id, "ana")
+    assert (bus.versao(CURTIDAS), bus.versao(CURTIDAS, "Time A"), bus.versao(RANKING)) == (1, 1, 4)
@@ -0,0 +1,68 @@
+from services.notificacoes import DIA_SECONDS, PERSISTIR_A_CADA_SECONDS, TIPO_INATIVIDADE, MotorNotificacoes
+
+DIA = DIA_SECONDS
+T0 = 1_700_000_000.0
+
+
+def test_scan_alerts_only_users_past_the_limit_once():
+    motor = MotorNotificacoes(limite_dias=14)
+    motor.registrar_atividade("ana", T0)
+    motor.registrar_atividade("bob", T0 + 5 * DIA)
+    motor.registrar_atividade("ana", T0 + 10 * DIA)  # only the index moves; ana's heap entry keeps T0
+    assert motor.varrer(T0 + 13 * DIA) == []
+    # ana's old entry is due, but her newer activity reschedules it instead of alerting
+    assert motor.varrer(T0 + 15 * DIA) == []
+    assert motor._heap == sorted(motor._heap) and {u for _, u in motor._heap} == {"ana", "bob"}
+    novas = motor.varrer(T0 + 20 * DIA)
+    assert [(n["user"], n["kind"], n["last_activity"]) for n in novas] == [("bob", TIPO_INATIVIDADE, T0 + 5 * DIA)]
+    assert "15 dias" in novas[0]["message"]
+    assert motor.varrer(T0 + 30 * DIA)[0]["user"] == "ana"
+    # both alerted: neither is in the heap, so later scans find nothing
+    assert motor._heap == [] and motor.varrer(T0 + 60 * DIA) == []
+
+
+def test_activity_resolves_the_alert_and_rearms_it():
+    motor = MotorNotificacoes(limite_dias=14)
+    motor.registrar_atividade("ana", T0)
+    [alerta] = motor.varrer(T0 + 15 * DIA)
+    assert motor.pendentes("ana") == [alerta]
+    motor.registrar_atividade("ana", T0 + 16 * DIA)
+    assert motor.pendentes("ana") == []
+    assert motor.ultima_atividade("ana") == T0 + 16 * DIA
+    assert motor.varrer(T0 + 29 * DIA) == []
+    assert [n["last_activity"] for n in motor.varrer(T0 + 31 * DIA)] == [T0 + 16 * DIA]
+    # an older activity (out of order) changes nothing
+    motor.registrar_atividade("ana", T0 + DIA)
+    assert motor.ultima_atividade("ana") == T0 + 16 * DIA and len(motor.pendentes("ana")) == 1
+
+
+def test_marcar_lidas():
+    motor = MotorNotificacoes(limite_dias=1)
+    for user in ("ana", "bob"):
+        motor.registrar_atividade(user, T0)
+    motor.varrer(T0 + 2 * DIA)
+    assert motor.marcar_lidas("ana", ids={"outro-id"}) == 0
+    assert motor.marcar_lidas("ana") == 1
+    assert motor.pendentes("ana") == [] and len(motor.pendentes("bob")) == 1
+    assert motor.marcar_lidas("ana") == 0
+    # read, but still alerted: no second alert until ana is active again
+    assert motor.varrer(T0 + 5 * DIA) == []
+
+
+def test_state_survives_a_restart(repo):
+    motor = MotorNotificacoes(repo, limite_dias=14)
+    motor.registrar_atividade("ana", T0, origem="item")
+    motor.registrar_atividade("ana", T0 + PERSISTIR_A_CADA_SECONDS / 2)  # too close: not written
+    motor.registrar_atividade("bob", T0)
+    motor.varrer(T0 + 15 * DIA)
+    motor.marcar_lidas("bob")
+    repo.behind.flush()
+
+    outro = MotorNotificacoes(repo, limite_dias=14)
+    assert outro.ultima_atividade("ana") == T0
+    assert [n["user"] for n in outro.pendentes("ana")] == ["ana"] and outro.pendentes("bob") == []
+    # both were alerted before the restart: nothing new until they come back
+    assert outro.varrer(T0 + 40 * DIA) == []
+    outro.registrar_atividade("ana", T0 + 41 * DIA)
+    repo.behind.flush()
+    assert MotorNotificacoes(repo).pendentes("ana") == []
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.nutri import (OBJ_BULKING, OBJ_CUTTING, OBJ_MANUTENCAO, alertas_dieta, alertas_dieta_lote,
+                            calorias_alvo, calorias_alvo_lote, codigos_objetivo, macros_por_objetivo,
+                            macros_por_objetivo_lote, metas_dataframe, metas_lote, tmb_mifflin, tmb_mifflin_lote)
+
+MENSAGENS = {"alerta_rn020": "RN-020", "alerta_rn018": "RN-018", "alerta_rn016": "RN-016"}
+
+
+def pessoas(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "altura_cm": rng.uniform(140, 210, n).round(1),
+        "peso_kg": rng.uniform(40, 160, n).round(1),
+        "idade": rng.integers(14, 90, n),
+        "sexo": rng.choice(["M", "F", "m", "outro"], n),
+        "objetivo": rng.choice(["Cutting", "BULKING", "manutenção", "cutting", "Recomposição", ""], n),
+    })
+
+
+def escalar(p, fibras_pct=30):
+    # o caminho da página Dieta, uma pessoa por vez
+    tmb = tmb_mifflin(p.altura_cm, p.peso_kg, p.idade, p.sexo)
+    kcal = calorias_alvo(tmb, p.objetivo)
+    mac = macros_por_objetivo(kcal, p.objetivo)
+    alertas = alertas_dieta(int(tmb), kcal, mac["carbo_pct"], fibras_pct)
+    return {"tmb": tmb, "kcal_alvo": kcal, **mac, "proteina_g": mac["proteina_kcal"] // 4,
+            "carbo_g": mac["carbo_kcal"] // 4, "gordura_g": mac["gordura_kcal"] // 9,
+            **{k: any(rn in m for m in alertas) for k, rn in MENSAGENS.items()}}
+
+
+@pytest.mark.parametrize("fibras_pct", [30, 10])
+def test_batch_matches_scalar_row_by_row(fibras_pct):
+    df = pessoas()
+    lote = metas_lote(df["altura_cm"].to_numpy(), df["peso_kg"].to_numpy(), df["idade"].to_numpy(),
+                      df["sexo"], df["objetivo"], fibras_pct)
+    for i, p in enumerate(df.itertuples()):
+        assert {k: v[i].item() for k, v in lote.items()} == escalar(p, fibras_pct)
+    assert lote["alerta_rn016"].all() == (fibras_pct < 30)
+
+
+def test_each_batch_function_matches_its_scalar():
+    df = pessoas(50, seed=1)
+    tmb = tmb_mifflin_lote(df["altura_cm"], df["peso_kg"], df["idade"], df["sexo"])
+    assert tmb.tolist() == [tmb_mifflin(p.altura_cm, p.peso_kg, p.idade, p.sexo) for p in df.itertuples()]
+    assert tmb_mifflin_lote(170, 70, 30, "F") == tmb_mifflin(170, 70, 30, "F")
+    kcal = calorias_alvo_lote(tmb, df["objetivo"])
+    assert kcal.tolist() == [calorias_alvo(t, o) for t, o in zip(tmb, df["objetivo"])]
+    macros = macros_por_objetivo_lote(kcal, df["objetivo"])
+    for i, (k, o) in enumerate(zip(kcal.tolist(), df["objetivo"])):
+        assert {m: v[i].item() for m, v in macros.items()} == macros_por_objetivo(k, o)
+    alertas = alertas_dieta_lote([2000, 2000, 2000], [1300, 1500, 1500], [40, 55, 40], [30, 30, 20])
+    assert [[k for k, v in alertas.items() if v[i]] for i in range(3)] == \
+        [["alerta_rn020"], ["alerta_rn018"], ["alerta_rn016"]]
+    assert len(alertas_dieta(2000, 1300, 40)) == 1
+
+
+def test_categorical_columns_give_the_same_result():
+    df = pessoas(200, seed=2)
+    categorico = df.astype({"sexo": "category", "objetivo": "category"})
+    pd.testing.assert_frame_equal(metas_dataframe(categorico), metas_dataframe(df))
+    # a category with no rows and an unused one do not shift the codes
+    objetivo = pd.Categorical(["bulking", "Cutting"], categories=["nada", "Cutting", "bulking"])
+    assert codigos_objetivo(objetivo).tolist() == [OBJ_BULKING, OBJ_CUTTING]
+
+
+def test_objetivo_is_case_insensitive_and_unknown_means_maintenance():
+    objetivos = ["CUTTING", "Bulking", "bUlKiNg", "Manutenção", "hipertrofia", ""]
+    assert codigos_objetivo(objetivos).tolist() == [OBJ_CUTTING, OBJ_BULKING, OBJ_BULKING] + [OBJ_MANUTENCAO] * 3
+    assert calorias_alvo_lote([2000.0] * 6, objetivos).tolist() == [calorias_alvo(2000.0, o) for o in objetivos]
+
+
+def test_missing_values():
+    # missing objetivo (NaN, None or a category code -1) follows the unknown-objetivo rule
+    assert codigos_objetivo([np.nan, None, "cutting"]).tolist() == [OBJ_MANUTENCAO, OBJ_MANUTENCAO, OBJ_CUTTING]
+    assert codigos_objetivo(pd.Series(["bulking", None], dtype="category")).tolist() == [OBJ_BULKING, OBJ_MANUTENCAO]
+    # a NaN measure stays NaN in the TMB and, like int(nan) in the scalar path, refuses to become kcal
+    tmb = tmb_mifflin_lote([170.0, np.nan], [70.0, 80.0], [30, 40], ["M", "F"])
+    assert tmb[0] == tmb_mifflin(170.0, 70.0, 30) and np.isnan(tmb[1])
+    with pytest.raises(ValueError):
+        calorias_alvo(tmb[1], "cutting")
+    with pytest.raises(ValueError):
+        calorias_alvo_lote(tmb, ["cutting", "cutting"])
+    df = pessoas(3)
+    df.loc[1, "peso_kg"] = np.nan
+    with pytest.raises(ValueError):
+        metas_dataframe(df)
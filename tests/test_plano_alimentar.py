@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from services.plano_alimentar import (ALIMENTOS_POR_REFEICAO, JANELA_VARIEDADE, PORCAO_MAX_G, Catalogo,
+                                      catalogo_padrao, gerar_itens, generate_plan, resolver_plano)
+
+
+def test_meals_hit_the_calorie_target():
+    cat = catalogo_padrao()
+    escolhas, porcoes = resolver_plano(cat, 2100, days=7, meals_per_day=3, seed=1)
+    assert escolhas.shape == porcoes.shape == (7, 3, ALIMENTOS_POR_REFEICAO)
+    kcal_refeicao = (porcoes * cat.kcal[escolhas] / 100).sum(axis=-1)
+    # portions are rounded to 5 g: each meal stays close to 700 kcal
+    assert np.abs(kcal_refeicao - 700).max() < 60
+    assert (porcoes >= 5).all() and (porcoes <= PORCAO_MAX_G * 2).all()
+
+
+def test_variety_rules():
+    escolhas, _ = resolver_plano(catalogo_padrao(), 2000, days=10, meals_per_day=4, seed=2)
+    # no repeated food inside a meal, nor in the same meal within the window
+    assert all(len(set(escolhas[d, m])) == ALIMENTOS_POR_REFEICAO for d in range(10) for m in range(4))
+    for d in range(10):
+        for dd in range(max(0, d - JANELA_VARIEDADE), d):
+            for m in range(4):
+                assert not set(escolhas[d, m]) & set(escolhas[dd, m])
+
+
+def test_seed_makes_plans_reproducible():
+    a = resolver_plano(catalogo_padrao(), 1800, 3, 3, "Cutting", seed=7)
+    b = resolver_plano(catalogo_padrao(), 1800, 3, 3, "Cutting", seed=7)
+    assert all((x == y).all() for x, y in zip(a, b))
+
+
+def test_catalog_skips_zero_kcal_and_rejects_empty():
+    cat = Catalogo.de_linhas([("Água", 0, 0, 0, 0), ("Arroz", 128, 2.5, 28.1, 0.2)])
+    assert cat.nomes == ["Arroz"]
+    with pytest.raises(ValueError):
+        resolver_plano(Catalogo.de_linhas([]), 2000, 1, 3)
+
+
+def test_generate_plan_streams_one_day_per_step():
+    passos = list(generate_plan(2000, days=4, meals_per_day=3, seed=3))
+    assert [p["progress"] for p in passos] == [25, 50, 75, 100, 100]
+    itens = [i for p in passos for i in p["new_items"]]
+    assert len(itens) == 4 * 3 * ALIMENTOS_POR_REFEICAO
+    assert [i["day"] for i in itens[::6]] == [1, 2, 3, 4]
+    assert passos[-1]["current_item"] is None
+    cat = catalogo_padrao()
+    escolhas, porcoes = resolver_plano(cat, 2000, 4, 3, seed=3)
+    assert itens == gerar_itens(cat, escolhas, porcoes)
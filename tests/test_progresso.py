@@ -0,0 +1,96 @@
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from services.progresso import HORIZONTE_ETA_DIAS, HistoricoPeso, eta_meta, lttb, pct_meta, resumo, tendencia
+
+
+def dias_de(inicio, n):
+    return np.datetime64(inicio) + np.arange(n).astype("timedelta64[D]")
+
+
+def test_reader_appends_then_rereads_a_rewritten_file(tmp_path):
+    path = str(tmp_path / "progresso.csv")
+    h = HistoricoPeso(path)
+    assert not h.refresh() and len(h) == 0
+    h.registrar_lote([("2024-05-01", 80.0), ("2024-05-02", 79.8)])
+    assert h.refresh() and h.pesos.tolist() == [80.0, 79.8]
+    versao = h.versao
+    assert not h.refresh() and h.versao == versao  # nothing new: only a stat()
+
+    # a line still being written waits for its newline; an older day is sorted into place
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2024-04-30,81.0\n2024-05-03,79")
+    assert h.refresh()
+    assert h.pesos.tolist() == [81.0, 80.0, 79.8]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(".5\n")
+    assert h.refresh() and h.pesos[-1] == 79.5 and str(h.dias[-1]) == "2024-05-03"
+
+    # truncated and rewritten (shorter): read again from the start
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("dia,peso\n2024-06-01,75.0\n")
+    assert h.refresh() and h.pesos.tolist() == [75.0]
+    # replaced by another file (new inode), even a longer one
+    novo = tmp_path / "novo.csv"
+    novo.write_text("dia,peso\n" + "".join(f"2024-07-{d:02d},{70 + d / 10}\n" for d in range(1, 20)))
+    os.replace(novo, path)
+    assert h.refresh() and len(h) == 19 and h.pesos[0] == 70.1
+    os.remove(path)
+    assert h.refresh() and len(h) == 0
+
+
+def test_snapshot_keeps_its_arrays_across_refreshes(tmp_path):
+    h = HistoricoPeso(str(tmp_path / "p.csv"))
+    h.registrar("2024-05-01", 80.0)
+    h.refresh()
+    versao, dias, pesos = h.snapshot()
+    h.registrar("2024-04-01", 82.0)  # out of order: the reader re-sorts into new arrays
+    h.refresh()
+    assert h.versao > versao and h.pesos.tolist() == [82.0, 80.0]
+    assert pesos.tolist() == [80.0] and str(dias[0]) == "2024-05-01"
+    with pytest.raises(ValueError):
+        pesos[0] = 0.0
+
+
+def test_lttb_keeps_the_ends_and_the_point_count():
+    rng = np.random.default_rng(0)
+    x = np.arange(5000, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=5000))
+    y[1234] = 1000.0  # a spike is always kept
+    idx = lttb(x, y, 400)
+    assert len(idx) == 400
+    assert idx[0] == 0 and idx[-1] == 4999
+    assert (np.diff(idx) > 0).all()
+    assert 1234 in idx
+    assert lttb(x[:10], y[:10], 400).tolist() == list(range(10))
+    assert len(lttb(x[:401], y[:401], 400)) == 400
+
+
+def test_trend_and_eta():
+    dias = dias_de("2024-01-01", 60)
+    pesos = 90.0 - 0.1 * np.arange(60)  # -0.7 kg/week, exactly
+    inclinacao, atual = tendencia(dias, pesos)
+    assert inclinacao == pytest.approx(-0.1) and atual == pytest.approx(84.1)
+    assert eta_meta(dias, pesos, 80.0) == date(2024, 4, 10)  # 4.1 kg at 0.1 kg/day: 41 days after 29/02
+    assert eta_meta(dias, pesos, 84.1) == date(2024, 2, 29)
+    assert eta_meta(dias, pesos, 90.0) is None  # trend goes the other way
+    assert eta_meta(dias, pesos, 84.1 - 0.1 * (HORIZONTE_ETA_DIAS + 1)) is None
+    # only the last 28 days count: an old plateau does not flatten the recent trend
+    velhos = np.concatenate([np.full(200, 95.0), pesos])
+    assert tendencia(dias_de("2023-06-15", 260), velhos)[0] == pytest.approx(-0.1)
+    assert tendencia(dias[:2], pesos[:2]) is None
+    assert pct_meta(90.0, 80.0, 85.0) == 0.5 and pct_meta(60.0, 70.0, 71.0) > 1.0 and pct_meta(70, 70, 50) == 1.0
+
+
+def test_resumo_reduces_the_chart():
+    dias = dias_de("2023-01-01", 1000)
+    pesos = 90.0 - 0.01 * np.arange(1000)
+    r = resumo(dias, pesos, 90.0, 80.0, pontos=200)
+    assert r["pesagens"] == 1000 and len(r["grafico"]) == 200
+    assert r["grafico"].index[0] == dias[0] and r["grafico"].index[-1] == dias[-1]
+    assert r["atual"] == pesos[-1] and r["pct_meta"] == pytest.approx(0.999)
+    assert r["kg_por_semana"] == pytest.approx(-0.07)
+    assert resumo(dias[:0], pesos[:0], 90.0, 80.0) is None
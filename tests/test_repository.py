@@ -0,0 +1,57 @@
+import pytest
+
+from conftest import save_plan
+from services.repository import Repository, WriteBehindError
+
+
+def test_write_behind_keeps_good_commands_and_reports_bad_ones(repo):
+    repo.add_feed_item({"id": "a-1", "type": "article", "author": "ana", "created_at": "2024-05-01T09:00:00",
+                        "data": {"title": "t", "body": "b"}})
+    repo.add_like("a-1", "bob", "2024-05-01T10:00:00")
+    # plain INSERT on a feed item that does not exist: foreign key violation inside the batch
+    repo.behind.put("INSERT INTO likes (feed_id, user, created_at) VALUES (?, ?, ?)", ("nao-existe", "x", "2024"))
+    repo.add_like("a-1", "carla", "2024-05-01T10:01:00")
+    with pytest.raises(WriteBehindError) as erro:
+        repo.behind.flush()
+    assert [p for _, p, _ in erro.value.falhas] == [("nao-existe", "x", "2024")]
+    likes = repo._conn().execute("SELECT user FROM likes ORDER BY user").fetchall()
+    assert [r[0] for r in likes] == ["bob", "carla"]
+
+    # the thread is still alive and the failure was reported only once
+    repo.add_like("a-1", "davi", "2024-05-01T10:02:00")
+    repo.behind.flush()
+    assert repo._conn().execute("SELECT COUNT(*) FROM likes").fetchone()[0] == 3
+
+
+def test_list_plans_pages_by_created_at_and_id(repo):
+    # five plans share a timestamp: the id breaks the tie, so no page skips or repeats one
+    for i in range(12):
+        save_plan(repo, f"p{i:02d}", "ana", created_at=f"2024-05-{1 + min(i, 7):02d}T12:00:00", n_items=1)
+    save_plan(repo, "outro", "bob")
+    vistos, before, before_id = [], None, None
+    while True:
+        page = repo.list_plans("ana", limit=5, before=before, before_id=before_id)
+        vistos += [p["id"] for p in page]
+        if len(page) < 5:
+            break
+        before, before_id = page[-1]["created_at"], page[-1]["id"]
+    assert vistos == [f"p{i:02d}" for i in range(11, -1, -1)]
+
+
+def test_items_done_and_counters(repo):
+    save_plan(repo, "p1", "ana", n_items=3)
+    repo.set_items_done("p1", [(0, True), (2, True)], 2)
+    repo.behind.flush()
+    assert [i["done"] for i in repo.plan_items("p1")] == [1, 0, 1]
+    assert repo.list_plans("ana")[0]["done_count"] == 2
+    assert repo.counter("x") == 0
+    repo.bump_counter("x")
+    repo.bump_counter("x")
+    assert repo.counter("x") == 2
+
+
+def test_shared_returns_one_instance_per_file(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'shared.db'}"
+    assert Repository.shared(uri) is Repository.shared(f"sqlite:///{tmp_path}/./shared.db")
+    with pytest.raises(ValueError):
+        Repository.shared("postgresql://localhost/db")
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from services.treino import (GRUPOS, LIMITES_RN007, MAX_SEMANAS, MUSCULARES, NIVEIS, SEM_LIMITE, gerar_programa,
+                             gerar_programas, limites_rn007, segunda_feira, violacoes_rn019)
+
+INICIO = date(2024, 5, 6)  # segunda-feira
+
+
+def perfis():
+    condicoes = [(), ("Diabetes",), ("Problemas cardíacos",), ("Hipertensão", "Outros"), ("Nenhum",)]
+    return [{"nivel": nivel, "condicoes": c, "user": f"user-{i}", "grupo_ontem": GRUPOS[i % len(GRUPOS)]}
+            for i, (nivel, c) in enumerate((n, c) for n in NIVEIS for c in condicoes)]
+
+
+def test_rn007_limits_take_the_strictest():
+    assert limites_rn007([]) == limites_rn007(["Nenhum"]) == SEM_LIMITE
+    assert limites_rn007(["Diabetes", "Problemas cardíacos"]) == LIMITES_RN007["Problemas cardíacos"]
+    assert limites_rn007(["Hipertensão", "Outros"]) == (1, 45, 4)
+    assert limites_rn007(["desconhecida"]) == LIMITES_RN007["Outros"]
+
+
+def test_programs_follow_rn019_and_rn007():
+    ps = perfis()
+    prog = gerar_programas(ps, semanas=12, inicio=INICIO)
+    assert prog.grupos.shape == (len(ps), 12 * 7)
+    assert not violacoes_rn019(prog.grupos).any()
+    treino = (prog.grupos >= 0) & (prog.grupos < MUSCULARES)
+    for i, p in enumerate(ps):
+        intensidade, duracao, freq = limites_rn007(p["condicoes"])
+        assert prog.intensidade[i] <= intensidade
+        assert prog.duracao[i].max() <= duracao
+        assert treino[i].reshape(-1, 7).sum(axis=1).max() <= freq
+        # no repeat across the seam with yesterday's workout either
+        ontem = GRUPOS.index(p["grupo_ontem"])
+        assert not (ontem < MUSCULARES and prog.grupos[i, 0] == ontem)
+
+
+def test_batch_matches_single_program():
+    ps = perfis()
+    lote = gerar_programas(ps, semanas=4, inicio=INICIO)
+    p = ps[7]
+    um = gerar_programa(p["nivel"], p["condicoes"], semanas=4, inicio=INICIO, user=p["user"],
+                        grupo_ontem=p["grupo_ontem"])
+    assert np.array_equal(lote.grupos[7], um.grupos[0])
+    assert np.array_equal(lote.duracao[7], um.duracao[0])
+
+
+def test_day_and_week_views():
+    prog = gerar_programa("Avançado", semanas=4, inicio=INICIO, user="ana")
+    assert prog.dia(INICIO - timedelta(days=1)) is None
+    assert prog.dia(INICIO + timedelta(weeks=4)) is None
+    semana = prog.semana(INICIO + timedelta(days=3))
+    assert [d["data"] for d in semana] == [INICIO + timedelta(days=k) for k in range(7)]
+    treinos = [d for d in semana if d["grupo"] not in ("Descanso", "Mobilidade/Alongamento")]
+    assert len(treinos) == 5
+    assert all(d["exercicios"] and d["intensidade"] == "alta" for d in treinos)
+    assert prog.dia(INICIO + timedelta(weeks=3))["descarga"]  # 4th week of the mesocycle
+
+
+def test_validation_and_monday():
+    with pytest.raises(ValueError):
+        gerar_programa("Iniciante", semanas=MAX_SEMANAS + 1)
+    assert segunda_feira(date(2024, 5, 9)) == INICIO